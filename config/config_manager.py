@@ -40,7 +40,32 @@ class ConfigManager:
             "window_position": {"x": 100, "y": 100},
             "theme": "default",
             "auto_create_folders": True,
-            "overwrite_existing": False
+            "overwrite_existing": False,
+            "split_mode": "reencode",
+            "parallel_workers": 0,
+            "ffmpeg_threads": 2,
+            "window_step": 10,
+            "keyframe_tolerance": 0,
+            "scene_window": 0,
+            "silence_window": 0,
+            "analysis_proxy_mb": 1024,
+            "output_preset": "original",
+            "processing_backend": "ffmpeg",
+            "batch_workers": 0,
+            "scratch_prefer_ram": True,
+            "scratch_budget_mb": 2048,
+            "resume_jobs": False,
+            "clip_cache_mb": 4096,
+            "full_source_hash": False,
+            "disk_reserve_mb": 1024,
+            "disk_space_policy": "refuse",
+            "thumbnails": "off",
+            "url_workers": 0,
+            "url_host_connections": 4,
+            "url_encode_threads": 0,
+            "url_max_height": 1080,
+            "url_video_codec": "any",
+            "url_info_cache": "memory"
         }
     
     def _load_config(self) -> Dict[str, Any]:
@@ -101,6 +126,43 @@ class ConfigManager:
         """Get available duration options"""
         return self.get("available_durations", [15, 20, 30, 45, 60, 90, 120])
     
+    def get_split_mode(self) -> str:
+        """Get the selected split mode"""
+        return self.get("split_mode", "reencode")
+    
+    def set_split_mode(self, mode: str) -> bool:
+        """Set the selected split mode"""
+        return self.set("split_mode", mode)
+    
+    def get_processing_settings(self) -> Dict[str, Any]:
+        """Get settings passed to the video processors"""
+        return {
+            "parallel_workers": self.get("parallel_workers", 0),
+            "ffmpeg_threads": self.get("ffmpeg_threads", 2),
+            "window_step": self.get("window_step", 10),
+            "keyframe_tolerance": self.get("keyframe_tolerance", 0),
+            "scene_window": self.get("scene_window", 0),
+            "silence_window": self.get("silence_window", 0),
+            "analysis_proxy_mb": self.get("analysis_proxy_mb", 1024),
+            "output_preset": self.get("output_preset", "original"),
+            "processing_backend": self.get("processing_backend", "ffmpeg"),
+            "batch_workers": self.get("batch_workers", 0),
+            "scratch_prefer_ram": self.get("scratch_prefer_ram", True),
+            "scratch_budget_mb": self.get("scratch_budget_mb", 2048),
+            "resume_jobs": self.get("resume_jobs", False),
+            "clip_cache_mb": self.get("clip_cache_mb", 4096),
+            "full_source_hash": self.get("full_source_hash", False),
+            "disk_reserve_mb": self.get("disk_reserve_mb", 1024),
+            "disk_space_policy": self.get("disk_space_policy", "refuse"),
+            "thumbnails": self.get("thumbnails", "off"),
+            "url_workers": self.get("url_workers", 0),
+            "url_host_connections": self.get("url_host_connections", 4),
+            "url_encode_threads": self.get("url_encode_threads", 0),
+            "url_max_height": self.get("url_max_height", 1080),
+            "url_video_codec": self.get("url_video_codec", "any"),
+            "url_info_cache": self.get("url_info_cache", "memory")
+        }
+    
     def get_window_size(self) -> Dict[str, int]:
         """Get window size configuration"""
         return self.get("window_size", {"width": 800, "height": 600})
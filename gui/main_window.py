@@ -21,6 +21,10 @@ from PyQt5.QtGui import QFont, QIcon, QPixmap, QPalette, QColor
 
 from config.config_manager import ConfigManager
 from processor.video_splitter import VideoSplitter
+from processor.batch_processor import BatchProcessor
+from processor.output_presets import OutputPresets
+from processor.clip_backend import ClipBackend
+from processor.thumbnails import Thumbnails
 from utils.file_utils import FileUtils
 from utils.logger import get_global_logger, set_global_gui_callback
 from .url_window import URLWindow
@@ -30,15 +34,19 @@ class ProcessingThread(QThread):
     """Thread for video processing to avoid GUI freezing"""
     
     progress_updated = pyqtSignal(int)
+    file_status_changed = pyqtSignal(int, str, str)
     processing_finished = pyqtSignal(dict)
     error_occurred = pyqtSignal(str)
     
-    def __init__(self, video_path: str, output_path: Path, clip_duration: int):
+    def __init__(self, video_paths: List[str], output_path: Path, clip_duration: int,
+                 mode: str = VideoSplitter.DEFAULT_MODE, settings: Optional[dict] = None):
         super().__init__()
-        self.video_path = video_path
+        self.video_paths = list(video_paths)
         self.output_path = output_path
         self.clip_duration = clip_duration
-        self.splitter = VideoSplitter(self._progress_callback)
+        self.mode = mode
+        self.resume = bool((settings or {}).get('resume_jobs', False))
+        self.batch = BatchProcessor(self._progress_callback, self._status_callback, settings)
         self._stop_flag = False
     
     def _progress_callback(self, value):
@@ -55,14 +63,20 @@ class ProcessingThread(QThread):
         except Exception as e:
             print(f"Error in progress callback: {e}")
     
+    def _status_callback(self, index: int, status: str, detail: str):
+        """Callback for per-file status changes"""
+        self.file_status_changed.emit(index, status, detail)
+    
     def run(self):
         """Run video processing"""
         try:
             print("Starting video processing thread...")
-            result = self.splitter.process_video(
-                self.video_path, 
-                self.output_path, 
-                self.clip_duration
+            result = self.batch.process_files(
+                self.video_paths,
+                self.output_path,
+                self.clip_duration,
+                self.mode,
+                resume=self.resume
             )
             
             # Check if processing was stopped
@@ -80,13 +94,22 @@ class ProcessingThread(QThread):
     def stop(self):
         """Stop processing"""
         self._stop_flag = True
-        if self.splitter:
-            self.splitter.cancel_processing()
+        if self.batch:
+            self.batch.cancel_processing()
 
 
 class MainWindow(QMainWindow):
     """Main application window"""
     
+    # File list labels for batch job states
+    FILE_STATUS_LABELS = {
+        BatchProcessor.STATUS_QUEUED: "⏳ Queued",
+        BatchProcessor.STATUS_RUNNING: "▶️ Processing",
+        BatchProcessor.STATUS_DONE: "✅ Done",
+        BatchProcessor.STATUS_FAILED: "❌ Failed",
+        BatchProcessor.STATUS_CANCELLED: "🛑 Cancelled"
+    }
+    
     def __init__(self, config_manager: ConfigManager):
         super().__init__()
         self.config_manager = config_manager
@@ -233,19 +256,91 @@ class MainWindow(QMainWindow):
         self.duration_combo.addItems([f"{d}s" for d in self.config_manager.get_available_durations()])
         settings_layout.addWidget(self.duration_combo, 0, 1)
         
+        # Split mode
+        settings_layout.addWidget(QLabel("Split Mode:"), 1, 0)
+        self.mode_combo = QComboBox()
+        for mode, label in VideoSplitter.SPLIT_MODES.items():
+            self.mode_combo.addItem(label, mode)
+        settings_layout.addWidget(self.mode_combo, 1, 1)
+        
+        # Sliding window step (sliding mode)
+        settings_layout.addWidget(QLabel("Window Step:"), 2, 0)
+        self.window_step_spin = QSpinBox()
+        self.window_step_spin.setRange(0, 600)
+        self.window_step_spin.setSuffix("s")
+        self.window_step_spin.setSpecialValueText("Clip length")
+        self.window_step_spin.setToolTip("Start a new overlapping clip every this many seconds (sliding windows mode)")
+        settings_layout.addWidget(self.window_step_spin, 2, 1)
+        
+        # Keyframe snap tolerance (copy / smart modes)
+        settings_layout.addWidget(QLabel("Keyframe Snap:"), 3, 0)
+        self.keyframe_spin = QSpinBox()
+        self.keyframe_spin.setRange(0, 10)
+        self.keyframe_spin.setSuffix("s")
+        self.keyframe_spin.setSpecialValueText("Off")
+        self.keyframe_spin.setToolTip("Move cuts to the nearest keyframe within this many seconds (copy/smart modes)")
+        settings_layout.addWidget(self.keyframe_spin, 3, 1)
+        
+        # Scene-aware cuts (all modes)
+        settings_layout.addWidget(QLabel("Scene Snap:"), 4, 0)
+        self.scene_spin = QSpinBox()
+        self.scene_spin.setRange(0, 30)
+        self.scene_spin.setSuffix("s")
+        self.scene_spin.setSpecialValueText("Off")
+        self.scene_spin.setToolTip("Move cuts to the strongest scene change within this many seconds")
+        settings_layout.addWidget(self.scene_spin, 4, 1)
+        
+        # Silence-aware cuts (all modes)
+        settings_layout.addWidget(QLabel("Pause Snap:"), 5, 0)
+        self.silence_spin = QSpinBox()
+        self.silence_spin.setRange(0, 30)
+        self.silence_spin.setSuffix("s")
+        self.silence_spin.setSpecialValueText("Off")
+        self.silence_spin.setToolTip("Move cuts into the nearest pause in the audio within this many seconds")
+        settings_layout.addWidget(self.silence_spin, 5, 1)
+        
+        # Output size preset (re-encoding modes)
+        settings_layout.addWidget(QLabel("Output Size:"), 6, 0)
+        self.preset_combo = QComboBox()
+        for preset, spec in OutputPresets.PRESETS.items():
+            self.preset_combo.addItem(spec['name'], preset)
+        self.preset_combo.setToolTip("Resize or crop clips while they are encoded (not available in stream copy mode)")
+        settings_layout.addWidget(self.preset_combo, 6, 1)
+        
+        # Encoding engine (re-encode mode and URL clips)
+        settings_layout.addWidget(QLabel("Engine:"), 7, 0)
+        self.backend_combo = QComboBox()
+        for backend, label in ClipBackend.get_backends().items():
+            self.backend_combo.addItem(label, backend)
+        self.backend_combo.setToolTip("Engine used to encode clips one by one (re-encode mode and URL clips)")
+        settings_layout.addWidget(self.backend_combo, 7, 1)
+        
+        # Clip thumbnails and contact sheet
+        settings_layout.addWidget(QLabel("Thumbnails:"), 8, 0)
+        self.thumbnails_combo = QComboBox()
+        for fmt, label in Thumbnails.FORMATS.items():
+            self.thumbnails_combo.addItem(label, fmt)
+        self.thumbnails_combo.setToolTip("Save a poster frame per clip and a contact sheet per video")
+        settings_layout.addWidget(self.thumbnails_combo, 8, 1)
+        
+        # Resume interrupted jobs
+        self.resume_check = QCheckBox("Resume unfinished jobs")
+        self.resume_check.setToolTip("Continue in the previous output folder and only encode missing or corrupt clips")
+        settings_layout.addWidget(self.resume_check, 9, 1)
+        
         # Output path
-        settings_layout.addWidget(QLabel("Output Path:"), 1, 0)
+        settings_layout.addWidget(QLabel("Output Path:"), 10, 0)
         self.output_path_edit = QLineEdit()
         self.output_path_edit.setReadOnly(True)
-        settings_layout.addWidget(self.output_path_edit, 1, 1)
+        settings_layout.addWidget(self.output_path_edit, 10, 1)
         
         self.browse_output_btn = QPushButton("Browse")
-        settings_layout.addWidget(self.browse_output_btn, 1, 2)
+        settings_layout.addWidget(self.browse_output_btn, 10, 2)
         
         # Video info
         self.video_info_label = QLabel("No video selected")
         self.video_info_label.setWordWrap(True)
-        settings_layout.addWidget(self.video_info_label, 2, 0, 1, 3)
+        settings_layout.addWidget(self.video_info_label, 11, 0, 1, 3)
         
         layout.addWidget(settings_group)
         
@@ -319,6 +414,15 @@ class MainWindow(QMainWindow):
         self.process_btn.clicked.connect(self.start_processing)
         self.file_list.itemSelectionChanged.connect(self.update_video_info)
         self.duration_combo.currentTextChanged.connect(self.on_duration_changed)
+        self.mode_combo.currentIndexChanged.connect(self.on_mode_changed)
+        self.window_step_spin.valueChanged.connect(self.on_window_step_changed)
+        self.keyframe_spin.valueChanged.connect(self.on_keyframe_tolerance_changed)
+        self.scene_spin.valueChanged.connect(self.on_scene_window_changed)
+        self.silence_spin.valueChanged.connect(self.on_silence_window_changed)
+        self.preset_combo.currentIndexChanged.connect(self.on_output_preset_changed)
+        self.backend_combo.currentIndexChanged.connect(self.on_backend_changed)
+        self.thumbnails_combo.currentIndexChanged.connect(self.on_thumbnails_changed)
+        self.resume_check.toggled.connect(self.on_resume_changed)
     
     def load_config(self):
         """Load configuration settings"""
@@ -333,6 +437,41 @@ class MainWindow(QMainWindow):
         if index >= 0:
             self.duration_combo.setCurrentIndex(index)
         
+        # Load split mode
+        index = self.mode_combo.findData(self.config_manager.get_split_mode())
+        if index >= 0:
+            self.mode_combo.setCurrentIndex(index)
+        
+        # Load sliding window step
+        self.window_step_spin.setValue(int(self.config_manager.get("window_step", 10)))
+        
+        # Load keyframe snap tolerance
+        self.keyframe_spin.setValue(int(self.config_manager.get("keyframe_tolerance", 0)))
+        
+        # Load scene snap window
+        self.scene_spin.setValue(int(self.config_manager.get("scene_window", 0)))
+        
+        # Load pause snap window
+        self.silence_spin.setValue(int(self.config_manager.get("silence_window", 0)))
+        
+        # Load output size preset
+        index = self.preset_combo.findData(self.config_manager.get("output_preset", OutputPresets.DEFAULT_PRESET))
+        if index >= 0:
+            self.preset_combo.setCurrentIndex(index)
+        
+        # Load encoding engine
+        index = self.backend_combo.findData(self.config_manager.get("processing_backend", ClipBackend.DEFAULT_BACKEND))
+        if index >= 0:
+            self.backend_combo.setCurrentIndex(index)
+        
+        # Load thumbnail format
+        index = self.thumbnails_combo.findData(self.config_manager.get("thumbnails", Thumbnails.DEFAULT_FORMAT))
+        if index >= 0:
+            self.thumbnails_combo.setCurrentIndex(index)
+        
+        # Load resume option
+        self.resume_check.setChecked(bool(self.config_manager.get("resume_jobs", False)))
+        
         # Load window size and position
         window_size = self.config_manager.get_window_size()
         self.resize(window_size['width'], window_size['height'])
@@ -378,6 +517,24 @@ class MainWindow(QMainWindow):
             item.setToolTip(file_path)
             self.file_list.addItem(item)
     
+    def update_file_status(self, index: int, status: str, detail: str):
+        """Show a batch job state next to its file in the list"""
+        item = self.file_list.item(index)
+        if item is None or index >= len(self.video_files):
+            return
+        
+        filename = Path(self.video_files[index]).name
+        label = self.FILE_STATUS_LABELS.get(status, status)
+        if status == BatchProcessor.STATUS_DONE and detail:
+            label += f" ({detail})"
+        item.setText(f"{filename} - {label}")
+        item.setToolTip(f"{self.video_files[index]}\n{detail}" if detail else self.video_files[index])
+        
+        if status == BatchProcessor.STATUS_DONE:
+            self.log_message(f"{label}: {filename}")
+        elif status == BatchProcessor.STATUS_FAILED:
+            self.log_message(f"{label}: {filename} - {detail}")
+    
     def browse_output_path(self):
         """Browse for output directory"""
         current_path = self.output_path_edit.text()
@@ -426,6 +583,50 @@ class MainWindow(QMainWindow):
         except ValueError:
             pass
     
+    def on_mode_changed(self, index: int):
+        """Handle split mode selection change"""
+        mode = self.mode_combo.itemData(index)
+        if mode:
+            self.config_manager.set_split_mode(mode)
+    
+    def on_window_step_changed(self, value: int):
+        """Handle sliding window step change"""
+        self.config_manager.set("window_step", value)
+    
+    def on_keyframe_tolerance_changed(self, value: int):
+        """Handle keyframe snap tolerance change"""
+        self.config_manager.set("keyframe_tolerance", value)
+    
+    def on_scene_window_changed(self, value: int):
+        """Handle scene snap window change"""
+        self.config_manager.set("scene_window", value)
+    
+    def on_silence_window_changed(self, value: int):
+        """Handle pause snap window change"""
+        self.config_manager.set("silence_window", value)
+    
+    def on_output_preset_changed(self, index: int):
+        """Handle output size preset change"""
+        preset = self.preset_combo.itemData(index)
+        if preset:
+            self.config_manager.set("output_preset", preset)
+    
+    def on_backend_changed(self, index: int):
+        """Handle encoding engine change"""
+        backend = self.backend_combo.itemData(index)
+        if backend:
+            self.config_manager.set("processing_backend", backend)
+    
+    def on_thumbnails_changed(self, index: int):
+        """Handle thumbnail format change"""
+        fmt = self.thumbnails_combo.itemData(index)
+        if fmt:
+            self.config_manager.set("thumbnails", fmt)
+    
+    def on_resume_changed(self, checked: bool):
+        """Handle resume option change"""
+        self.config_manager.set("resume_jobs", checked)
+    
     def start_processing(self):
         """Start video processing"""
         if not self.video_files:
@@ -443,6 +644,7 @@ class MainWindow(QMainWindow):
         # Get duration
         duration_text = self.duration_combo.currentText()
         duration = int(duration_text.replace('s', ''))
+        mode = self.mode_combo.currentData() or VideoSplitter.DEFAULT_MODE
         
         # Disable controls
         self.process_btn.setEnabled(False)
@@ -459,17 +661,21 @@ class MainWindow(QMainWindow):
         QApplication.processEvents()
         
         # Start processing thread
+        self.update_file_list()
         self.processing_thread = ProcessingThread(
-            self.video_files[0],  # Process first file for now
+            self.video_files,
             output_path,
-            duration
+            duration,
+            mode,
+            self.config_manager.get_processing_settings()
         )
         self.processing_thread.progress_updated.connect(self.update_progress)
+        self.processing_thread.file_status_changed.connect(self.update_file_status)
         self.processing_thread.processing_finished.connect(self.processing_finished)
         self.processing_thread.error_occurred.connect(self.processing_error)
         self.processing_thread.start()
         
-        self.log_message(f"Started processing: {Path(self.video_files[0]).name}")
+        self.log_message(f"Started processing {len(self.video_files)} file(s)")
     
     def stop_processing(self):
         """Stop video processing"""
@@ -521,12 +727,19 @@ class MainWindow(QMainWindow):
         self.select_files_btn.setEnabled(True)
         self.clear_files_btn.setEnabled(True)
         
+        self.show_processing_results(result)
         if result['success']:
             self.log_message("Processing completed successfully!")
-            self.show_processing_results(result)
+        elif result['successful_files']:
+            self.log_message(f"Processing finished: {result['successful_files']}/{result['total_files']} files succeeded")
+            QMessageBox.warning(self, "Warning",
+                                f"{result['failed_files']} of {result['total_files']} files failed. "
+                                "See the results panel for details.")
         else:
-            self.log_message(f"Processing failed: {result['error']}")
-            QMessageBox.critical(self, "Error", f"Processing failed: {result['error']}")
+            errors = [r['error'] for r in result['results'] if not r['success']]
+            error = errors[0] if errors else "No files were processed"
+            self.log_message(f"Processing failed: {error}")
+            QMessageBox.critical(self, "Error", f"Processing failed: {error}")
         
         self.status_bar.showMessage("Ready")
     
@@ -561,13 +774,44 @@ class MainWindow(QMainWindow):
     def show_processing_results(self, result: dict):
         """Show processing results"""
         results_text = f"Processing Results:\n\n"
-        results_text += f"Input File: {Path(result['input_file']).name}\n"
-        results_text += f"Output Folder: {result['output_folder']}\n"
+        results_text += f"Files Processed: {result['successful_files']}/{result['total_files']}\n"
         results_text += f"Clips Created: {result['clips_count']}\n"
+        if result.get('cache_hits'):
+            results_text += f"Clips From Cache: {result['cache_hits']}\n"
         results_text += f"Input Duration: {FileUtils.format_duration(result['input_duration'])}\n"
         results_text += f"Clip Duration: {result['clip_duration']}s\n"
         results_text += f"Input Size: {FileUtils.format_file_size(result['input_size'])}\n"
-        results_text += f"Output Size: {FileUtils.format_file_size(result['output_size'])}\n"
+        results_text += f"Output Size: {FileUtils.format_file_size(result['output_size'])}"
+        if result.get('estimated_size'):
+            results_text += f" (estimated {FileUtils.format_file_size(result['estimated_size'])})"
+        results_text += "\n"
+        results_text += f"Split Mode: {VideoSplitter.SPLIT_MODES.get(result.get('mode'), result.get('mode'))}\n"
+        results_text += f"Total Time: {FileUtils.format_duration(result['elapsed_time'])}\n"
+        
+        for file_result in result['results']:
+            results_text += f"\n{Path(file_result['input_file']).name}:\n"
+            if not file_result['success']:
+                results_text += f"  ❌ {file_result['error']}\n"
+                continue
+            
+            results_text += f"  Output Folder: {file_result['output_folder']}\n"
+            results_text += f"  Clips Created: {file_result['clips_count']}\n"
+            if file_result.get('resumed_clips'):
+                results_text += f"  Resumed Clips: {file_result['resumed_clips']}\n"
+            if file_result.get('thumbnails'):
+                results_text += f"  Thumbnails: {len(file_result['thumbnails'])} in "
+                results_text += f"{Path(file_result['thumbnails'][0]).parent}\n"
+            if file_result.get('contact_sheet'):
+                results_text += f"  Contact Sheet: {file_result['contact_sheet']}\n"
+            
+            report = file_result.get('smart_cut_report')
+            if report:
+                results_text += f"  Smart Cut: {report['copied_seconds']:.1f}s copied, "
+                results_text += f"{report['reencoded_seconds']:.1f}s re-encoded "
+                results_text += f"({report['copied_ratio'] * 100:.0f}% copied)\n"
+            
+            for clip in file_result.get('clips', []):
+                results_text += f"  {Path(clip['path']).name}: {clip['start']:.2f}s - {clip['end']:.2f}s\n"
         
         self.results_text.setText(results_text)
     
@@ -12,12 +12,14 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, 
     QLineEdit, QPushButton, QComboBox, QProgressBar, QTextEdit,
     QGroupBox, QMessageBox, QFrame, QSplitter, QListWidget,
-    QListWidgetItem, QApplication, QStyle
+    QListWidgetItem, QApplication, QStyle, QCheckBox
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
 from PyQt5.QtGui import QFont, QPixmap, QIcon
 
 from processor.url_clip_processor_v8 import URLClipProcessorV8
+from processor.output_presets import OutputPresets
+from processor.format_selector import FormatSelector
 from utils.file_utils import FileUtils
 from utils.logger import get_global_logger, set_global_gui_callback
 
@@ -26,17 +28,21 @@ class URLProcessingThread(QThread):
     """Thread for URL video processing"""
     
     progress_updated = pyqtSignal(int)
+    clips_updated = pyqtSignal(int, int, object)
     processing_finished = pyqtSignal(dict)
     error_occurred = pyqtSignal(str)
     preview_ready = pyqtSignal(dict)
     
-    def __init__(self, url: str, output_path: Path, clip_duration: int, mode: str = 'process'):
+    def __init__(self, url: str, output_path: Path, clip_duration: int, mode: str = 'process',
+                 settings: Optional[dict] = None):
         super().__init__()
         self.url = url
         self.output_path = output_path
         self.clip_duration = clip_duration
         self.mode = mode  # 'preview' or 'process'
-        self.processor = URLClipProcessorV8(self.progress_updated.emit)
+        self.resume = bool((settings or {}).get('resume_jobs', False))
+        self.processor = URLClipProcessorV8(self.progress_updated.emit, settings,
+                                            self.clips_updated.emit)
         self._stop_flag = False
     
     def run(self):
@@ -52,7 +58,8 @@ class URLProcessingThread(QThread):
                 result = self.processor.process_url_video(
                     self.url, 
                     self.output_path, 
-                    self.clip_duration
+                    self.clip_duration,
+                    resume=self.resume
                 )
                 
                 # Check if processing was stopped
@@ -77,6 +84,7 @@ class URLWindow(QWidget):
         self.config_manager = config_manager
         self.processing_thread = None
         self.current_url = ""
+        self.clip_status = ""
         
         self.init_ui()
         self.setup_connections()
@@ -173,9 +181,38 @@ class URLWindow(QWidget):
         self.browse_output_btn = QPushButton("📁 Explorar")
         settings_layout.addWidget(self.browse_output_btn, 1, 2)
         
+        # Output size preset
+        settings_layout.addWidget(QLabel("Tamaño de Salida:"), 2, 0)
+        self.preset_combo = QComboBox()
+        for preset, spec in OutputPresets.PRESETS.items():
+            self.preset_combo.addItem(spec['name'], preset)
+        self.preset_combo.setToolTip("Redimensiona o recorta los clips mientras se codifican")
+        settings_layout.addWidget(self.preset_combo, 2, 1)
+        
+        # Source quality: best video up to this height, audio from its own format
+        settings_layout.addWidget(QLabel("Calidad Máxima:"), 3, 0)
+        self.max_height_combo = QComboBox()
+        for height in FormatSelector.MAX_HEIGHTS:
+            self.max_height_combo.addItem(f"{height}p" if height else "Sin límite", height)
+        self.max_height_combo.setToolTip("Altura máxima del video de origen; el audio se toma del mejor formato de audio y se copia sin recodificar")
+        settings_layout.addWidget(self.max_height_combo, 3, 1)
+        
+        settings_layout.addWidget(QLabel("Códec de Video:"), 4, 0)
+        self.video_codec_combo = QComboBox()
+        codec_names = {'any': "Cualquiera", 'avc1': "H.264 (avc1)", 'vp9': "VP9", 'av01': "AV1"}
+        for codec in FormatSelector.VIDEO_CODECS:
+            self.video_codec_combo.addItem(codec_names.get(codec, codec), codec)
+        self.video_codec_combo.setToolTip("Códec preferido entre formatos de la misma calidad (el video de los clips siempre se recodifica)")
+        settings_layout.addWidget(self.video_codec_combo, 4, 1)
+        
+        # Resume interrupted jobs
+        self.resume_check = QCheckBox("Reanudar trabajos")
+        self.resume_check.setToolTip("Continúa en la carpeta anterior y solo genera los clips que faltan o están dañados")
+        settings_layout.addWidget(self.resume_check, 5, 1)
+        
         # Estimated time
         self.estimated_time_label = QLabel("Tiempo estimado: -")
-        settings_layout.addWidget(self.estimated_time_label, 2, 0, 1, 2)
+        settings_layout.addWidget(self.estimated_time_label, 6, 0, 1, 2)
         
         main_layout.addWidget(settings_group)
         
@@ -251,6 +288,10 @@ class URLWindow(QWidget):
         self.browse_output_btn.clicked.connect(self.browse_output_path)
         self.process_btn.clicked.connect(self.start_processing)
         self.duration_combo.currentTextChanged.connect(self.update_estimated_time)
+        self.resume_check.toggled.connect(self.on_resume_changed)
+        self.preset_combo.currentIndexChanged.connect(self.on_output_preset_changed)
+        self.max_height_combo.currentIndexChanged.connect(self.on_max_height_changed)
+        self.video_codec_combo.currentIndexChanged.connect(self.on_video_codec_changed)
         self.url_input.textChanged.connect(self.on_url_changed)
     
     def load_config(self):
@@ -265,6 +306,44 @@ class URLWindow(QWidget):
         index = self.duration_combo.findText(duration_text)
         if index >= 0:
             self.duration_combo.setCurrentIndex(index)
+        
+        # Load resume option
+        self.resume_check.setChecked(bool(self.config_manager.get("resume_jobs", False)))
+        
+        # Load output size preset
+        index = self.preset_combo.findData(self.config_manager.get("output_preset", OutputPresets.DEFAULT_PRESET))
+        if index >= 0:
+            self.preset_combo.setCurrentIndex(index)
+        
+        # Load source format choice
+        index = self.max_height_combo.findData(self.config_manager.get("url_max_height", FormatSelector.DEFAULT_MAX_HEIGHT))
+        if index >= 0:
+            self.max_height_combo.setCurrentIndex(index)
+        index = self.video_codec_combo.findData(self.config_manager.get("url_video_codec", FormatSelector.DEFAULT_VIDEO_CODEC))
+        if index >= 0:
+            self.video_codec_combo.setCurrentIndex(index)
+    
+    def on_resume_changed(self, checked: bool):
+        """Handle resume option change"""
+        self.config_manager.set("resume_jobs", checked)
+    
+    def on_output_preset_changed(self, index: int):
+        """Handle output size preset change"""
+        preset = self.preset_combo.itemData(index)
+        if preset:
+            self.config_manager.set("output_preset", preset)
+    
+    def on_max_height_changed(self, index: int):
+        """Handle maximum source height change"""
+        height = self.max_height_combo.itemData(index)
+        if height is not None:
+            self.config_manager.set("url_max_height", height)
+    
+    def on_video_codec_changed(self, index: int):
+        """Handle preferred video codec change"""
+        codec = self.video_codec_combo.itemData(index)
+        if codec:
+            self.config_manager.set("url_video_codec", codec)
     
     def on_url_changed(self):
         """Handle URL input changes"""
@@ -292,7 +371,8 @@ class URLWindow(QWidget):
             url, 
             Path(self.output_path_edit.text()), 
             30,  # Default duration for preview
-            'preview'
+            'preview',
+            self.config_manager.get_processing_settings()
         )
         self.processing_thread.preview_ready.connect(self.show_video_preview)
         self.processing_thread.error_occurred.connect(self.preview_error)
@@ -388,6 +468,7 @@ class URLWindow(QWidget):
         # Show progress bar
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
+        self.clip_status = ""
         QApplication.processEvents()  # Force initial GUI update
         
         # Start processing thread
@@ -395,9 +476,11 @@ class URLWindow(QWidget):
             url, 
             output_path, 
             duration,
-            'process'
+            'process',
+            self.config_manager.get_processing_settings()
         )
         self.processing_thread.progress_updated.connect(self.update_progress)
+        self.processing_thread.clips_updated.connect(self.update_clip_status)
         self.processing_thread.processing_finished.connect(self.processing_finished)
         self.processing_thread.error_occurred.connect(self.processing_error)
         self.processing_thread.start()
@@ -427,7 +510,7 @@ class URLWindow(QWidget):
                 progress_value = int(value)
                 progress_value = max(0, min(100, progress_value))
                 self.progress_bar.setValue(progress_value)
-                self.status_label.setText(f"Procesando... {progress_value}%")
+                self.status_label.setText(f"Procesando... {progress_value}%{self.clip_status}")
                 QApplication.processEvents()  # Force GUI update
                 print(f"GUI Progress updated: {progress_value}%")
             else:
@@ -437,6 +520,12 @@ class URLWindow(QWidget):
             self.progress_bar.setValue(0)
             self.status_label.setText("Procesando...")
     
+    def update_clip_status(self, completed: int, total: int, bytes_read: int):
+        """Show finished clips and bytes downloaded next to the progress"""
+        self.clip_status = (f" ({completed}/{total} clips, "
+                            f"{FileUtils.format_file_size(bytes_read)} descargados)")
+        self.status_label.setText(f"Procesando... {self.progress_bar.value()}%{self.clip_status}")
+    
     def processing_finished(self, result: dict):
         """Handle processing completion"""
         self.progress_bar.setVisible(False)
@@ -473,9 +562,16 @@ class URLWindow(QWidget):
         results_text += f"Título: {result.get('video_title', 'N/A')}\n"
         results_text += f"Carpeta de Salida: {result.get('output_folder', 'N/A')}\n"
         results_text += f"Clips Creados: {result.get('clips_created', 0)}/{result.get('total_clips_attempted', 0)}\n"
+        if result.get('resumed_clips'):
+            results_text += f"Clips Reanudados: {result['resumed_clips']}\n"
         results_text += f"Duración del Video: {FileUtils.format_duration(result.get('input_duration', 0))}\n"
         results_text += f"Duración de Clips: {result.get('clip_duration', 0)}s\n"
         results_text += f"Tamaño Total: {FileUtils.format_file_size(result.get('output_size', 0))}\n"
+        stream_stats = result.get('stream_stats')
+        if stream_stats and stream_stats.get('clips'):
+            results_text += (f"Sesión de Stream: {stream_stats['opens']} apertura(s), "
+                             f"{FileUtils.format_file_size(stream_stats['bytes_read'])} descargados, "
+                             f"{stream_stats['overhead_per_clip']:.2f}s de sobrecarga por clip\n")
         results_text += f"Creador: {result.get('uploader', 'N/A')}\n"
         results_text += f"Vistas: {result.get('view_count', 0):,}\n"
         
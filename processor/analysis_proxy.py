@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analysis Proxy for ClipForge
+Decodes a source once into a small memory-mappable frame and audio store shared by every analysis
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Dict, Any, Optional, Callable
+from utils.file_utils import FileUtils
+from utils.ffmpeg_utils import FFmpegUtils
+from utils.fingerprint import Fingerprint
+from utils.media_probe import MediaProbe
+
+
+class AnalysisProxy:
+    """Size-bounded LRU cache of low-resolution analysis proxies
+    
+    A source is decoded once, in a single ffmpeg run, into a 64x36 grayscale
+    frame store at a fixed rate and a mono 8 kHz PCM track. Both are saved as
+    .npy files and opened as read-only memory maps, so scene, silence and any
+    later analyses read the same proxy without copying it and without touching
+    the source again. Proxies are keyed by the content fingerprint.
+    """
+    
+    FPS = 10
+    WIDTH = 64
+    HEIGHT = 36
+    SAMPLE_RATE = 8000
+    DEFAULT_MAX_SIZE_MB = 1024
+    INDEX_FILENAME = "proxy_cache.json"
+    FRAMES_FILENAME = "frames.npy"
+    AUDIO_FILENAME = "audio.npy"
+    COPY_CHUNK_SIZE = 4 * 1024 * 1024
+    VERSION = 1
+    
+    # Shared by all instances (per cache directory): batch jobs run concurrently against one index
+    _indexes: Dict[Path, Dict[str, Dict[str, Any]]] = {}
+    # One build per proxy at a time; other jobs wait for it and then read it
+    _build_locks: Dict[str, threading.Lock] = {}
+    _lock = threading.Lock()
+    
+    def __init__(self, max_size_mb: Optional[int] = None, cache_dir: Optional[Path] = None):
+        """Initialize analysis proxy cache (max_size_mb 0 disables it)"""
+        if max_size_mb is None:
+            max_size_mb = self.DEFAULT_MAX_SIZE_MB
+        self.max_size_bytes = max(0, int(max_size_mb)) * 1024 * 1024
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+    
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> 'AnalysisProxy':
+        """Create a proxy cache from processing settings"""
+        settings = settings or {}
+        return cls(settings.get('analysis_proxy_mb', cls.DEFAULT_MAX_SIZE_MB))
+    
+    @property
+    def enabled(self) -> bool:
+        """Check whether proxies are stored at all"""
+        return self.max_size_bytes > 0
+    
+    def _get_cache_dir(self) -> Path:
+        """Get (and create) the cache directory"""
+        if self.cache_dir is None:
+            self.cache_dir = FileUtils.get_cache_directory("proxy")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        return self.cache_dir
+    
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """Load the index once per process (caller holds the lock)"""
+        cache_dir = self._get_cache_dir()
+        if cache_dir not in AnalysisProxy._indexes:
+            try:
+                with open(cache_dir / self.INDEX_FILENAME, 'r', encoding='utf-8') as f:
+                    AnalysisProxy._indexes[cache_dir] = json.load(f)
+            except (OSError, ValueError):
+                AnalysisProxy._indexes[cache_dir] = {}
+        return AnalysisProxy._indexes[cache_dir]
+    
+    def _save_index(self):
+        """Write the index atomically (caller holds the lock)"""
+        index_file = self._get_cache_dir() / self.INDEX_FILENAME
+        temp_file = index_file.with_suffix('.tmp')
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._load_index(), f)
+            os.replace(temp_file, index_file)
+        except OSError as e:
+            print(f"⚠️ Could not save analysis proxy index: {e}")
+    
+    def get_key(self, source: str) -> str:
+        """Get the cache key of a source (fingerprint + proxy format)"""
+        key_data = (f"{Fingerprint.get_fingerprint(source)}|v{self.VERSION}|{self.FPS}"
+                    f"|{self.WIDTH}x{self.HEIGHT}|{self.SAMPLE_RATE}")
+        return hashlib.sha1(key_data.encode('utf-8')).hexdigest()
+    
+    def get(self, source: str,
+            stop_check: Optional[Callable] = None) -> Optional[Dict[str, np.ndarray]]:
+        """Get the proxy of a source, decoding it first if it is not cached
+        
+        Returns {'frames': (n, HEIGHT, WIDTH) uint8, 'audio': (m,) int16} as
+        read-only memory maps (frame i is at i / FPS seconds, sample j at
+        j / SAMPLE_RATE), or None when disabled or stopped.
+        """
+        if not self.enabled:
+            return None
+        
+        key = self.get_key(source)
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        
+        with build_lock:
+            store = self._open(key)
+            if store is None:
+                if not self._build(source, key, stop_check):
+                    return None
+                store = self._open(key)
+        return store
+    
+    def get_frames(self, source: str, stop_check: Optional[Callable] = None) -> Optional[np.ndarray]:
+        """Get the grayscale frame store of a source"""
+        store = self.get(source, stop_check)
+        return store['frames'] if store else None
+    
+    def get_audio(self, source: str, stop_check: Optional[Callable] = None) -> Optional[np.ndarray]:
+        """Get the mono PCM track of a source (empty when it has no audio)"""
+        store = self.get(source, stop_check)
+        return store['audio'] if store else None
+    
+    def _open(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """Memory-map a cached proxy and mark it as used"""
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                return None
+            index[key]['last_used'] = time.time()
+            self._save_index()
+        
+        proxy_dir = self._get_cache_dir() / key
+        try:
+            return {
+                'frames': np.load(proxy_dir / self.FRAMES_FILENAME, mmap_mode='r'),
+                'audio': np.load(proxy_dir / self.AUDIO_FILENAME, mmap_mode='r')
+            }
+        except (OSError, ValueError):
+            # Removed or damaged outside ClipForge
+            with self._lock:
+                self._load_index().pop(key, None)
+                self._save_index()
+            shutil.rmtree(proxy_dir, ignore_errors=True)
+            return None
+    
+    def _build(self, source: str, key: str, stop_check: Optional[Callable] = None) -> bool:
+        """Decode a source into a new proxy (False if stopped)"""
+        start_time = time.time()
+        cache_dir = self._get_cache_dir()
+        temp_dir = cache_dir / f"{key}.partial"
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        temp_dir.mkdir()
+        frames_raw = temp_dir / "frames.raw"
+        audio_raw = temp_dir / "audio.raw"
+        
+        info = MediaProbe.get_video_info(source)
+        has_audio = info.get('has_audio', True) if info else True
+        
+        print(f"Building analysis proxy for: {source}")
+        args = [
+            '-i', source,
+            '-map', '0:v:0', '-an', '-sn',
+            '-vf', f"fps={self.FPS},scale={self.WIDTH}:{self.HEIGHT}:flags=area,format=gray",
+            '-f', 'rawvideo', str(frames_raw)
+        ]
+        if has_audio:
+            # Second output of the same run, so the source is only decoded once
+            args += ['-map', '0:a:0', '-vn', '-sn',
+                     '-ac', '1', '-ar', str(self.SAMPLE_RATE), '-f', 's16le', str(audio_raw)]
+        
+        returncode, stderr = FFmpegUtils.run_ffmpeg(args, stop_check=stop_check)
+        if stop_check and stop_check():
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return False
+        if returncode != 0:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise RuntimeError(f"Could not build analysis proxy: {stderr.strip()[-300:]}")
+        
+        try:
+            self._write_npy(frames_raw, temp_dir / self.FRAMES_FILENAME, np.uint8, (self.HEIGHT, self.WIDTH))
+            self._write_npy(audio_raw, temp_dir / self.AUDIO_FILENAME, np.dtype('<i2'), ())
+            proxy_dir = cache_dir / key
+            shutil.rmtree(proxy_dir, ignore_errors=True)
+            os.replace(temp_dir, proxy_dir)
+        except OSError as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise RuntimeError(f"Could not save analysis proxy: {e}")
+        
+        size = sum(f.stat().st_size for f in proxy_dir.iterdir())
+        with self._lock:
+            index = self._load_index()
+            index[key] = {'size': size, 'last_used': time.time()}
+            self._evict(index, keep=key)
+            self._save_index()
+        
+        print(f"✅ Analysis proxy ready: {FileUtils.format_file_size(size)} "
+              f"in {time.time() - start_time:.1f}s")
+        return True
+    
+    @classmethod
+    def _write_npy(cls, raw_path: Path, npy_path: Path, dtype, item_shape: tuple):
+        """Wrap a raw ffmpeg output in an .npy header, streaming the data across"""
+        dtype = np.dtype(dtype)
+        item_size = dtype.itemsize * int(np.prod(item_shape, dtype=np.int64))
+        raw_size = raw_path.stat().st_size if raw_path.exists() else 0
+        count = raw_size // item_size
+        
+        with open(npy_path, 'wb') as out:
+            np.lib.format.write_array_header_1_0(out, {
+                'descr': np.lib.format.dtype_to_descr(dtype),
+                'fortran_order': False,
+                'shape': (count,) + tuple(item_shape)
+            })
+            if count:
+                remaining = count * item_size
+                with open(raw_path, 'rb') as raw:
+                    while remaining:
+                        chunk = raw.read(min(cls.COPY_CHUNK_SIZE, remaining))
+                        if not chunk:
+                            break
+                        out.write(chunk)
+                        remaining -= len(chunk)
+        raw_path.unlink(missing_ok=True)
+    
+    def _evict(self, index: Dict[str, Dict[str, Any]], keep: Optional[str] = None):
+        """Drop least recently used proxies until the cache fits its size limit (caller holds the lock)
+        
+        The proxy that was just built is always kept, even if it alone exceeds the limit.
+        """
+        total = sum(entry['size'] for entry in index.values())
+        for key in sorted(index, key=lambda k: index[k]['last_used']):
+            if total <= self.max_size_bytes:
+                break
+            if key == keep:
+                continue
+            entry = index.pop(key)
+            shutil.rmtree(self._get_cache_dir() / key, ignore_errors=True)
+            total -= entry['size']
+    
+    def get_size(self) -> int:
+        """Get the total size of cached proxies in bytes"""
+        with self._lock:
+            return sum(entry['size'] for entry in self._load_index().values())
+    
+    def clear(self):
+        """Remove every cached proxy"""
+        with self._lock:
+            index = self._load_index()
+            for key in index:
+                shutil.rmtree(self._get_cache_dir() / key, ignore_errors=True)
+            index.clear()
+            self._save_index()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch Processor for ClipForge
+Runs a queue of local video files through VideoSplitter, several at a time
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Callable, Dict, Any
+from .video_splitter import VideoSplitter
+from utils.file_utils import FileUtils
+
+
+class BatchProcessor:
+    """Job queue that splits many files concurrently within a CPU budget
+    
+    Files are scheduled shortest first, so small recordings finish early instead
+    of waiting behind long ones. The number of files processed at once is the CPU
+    count divided by the cores one job of the selected mode uses.
+    """
+    
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CANCELLED = 'cancelled'
+    
+    def __init__(self, progress_callback: Optional[Callable] = None,
+                 status_callback: Optional[Callable] = None,
+                 settings: Optional[Dict[str, Any]] = None):
+        """Initialize batch processor
+        
+        status_callback receives (file index, status, detail) whenever a file
+        changes state; indexes refer to the list passed to process_files.
+        """
+        self.progress_callback = progress_callback or (lambda x: None)
+        self.status_callback = status_callback or (lambda index, status, detail: None)
+        self.settings = settings or {}
+        self._stop_flag = False
+        self._lock = threading.Lock()
+        self._active_splitters = {}
+    
+    def get_job_cost(self, mode: str) -> int:
+        """Get the number of cores one file uses in the given split mode"""
+        if mode == 'copy':
+            return 1
+        if mode == 'parallel':
+            workers, threads = VideoSplitter(settings=self.settings).get_parallel_budget()
+            return workers * threads
+        return max(1, int(self.settings.get('ffmpeg_threads', 2)))
+    
+    def get_batch_budget(self, mode: str, file_count: int) -> int:
+        """Get how many files to process at once"""
+        workers = int(self.settings.get('batch_workers', 0))
+        if workers <= 0:
+            workers = max(1, (os.cpu_count() or 1) // self.get_job_cost(mode))
+        return max(1, min(workers, file_count))
+    
+    def get_durations(self, video_paths: List[str]) -> List[float]:
+        """Get file durations from the cached probe (0 for unreadable files)"""
+        durations = []
+        for video_path in video_paths:
+            info = FileUtils.get_video_info(video_path)
+            durations.append(info['duration'] if info else 0.0)
+        return durations
+    
+    def order_jobs(self, durations: List[float]) -> List[int]:
+        """Get file indexes in scheduling order (shortest duration first)
+        
+        Unreadable files have no duration and go first, so they fail fast
+        instead of holding a worker slot at the end.
+        """
+        return sorted(range(len(durations)), key=lambda i: durations[i])
+    
+    def process_files(self, video_paths: List[str], output_base_path: Path,
+                      clip_duration: int,
+                      mode: str = VideoSplitter.DEFAULT_MODE,
+                      resume: bool = False) -> Dict[str, Any]:
+        """Process all files and return a combined summary
+        
+        With resume, files with an earlier partial run continue in that folder.
+        """
+        self._stop_flag = False
+        start_time = time.time()
+        durations = self.get_durations(video_paths)
+        order = self.order_jobs(durations)
+        workers = self.get_batch_budget(mode, len(video_paths))
+        
+        job_settings = dict(self.settings)
+        if mode != 'parallel':
+            # Cap each job so concurrent encoders share the cores instead of oversubscribing
+            job_settings.setdefault('encode_threads', self.get_job_cost(mode))
+        
+        for index in order:
+            self.status_callback(index, self.STATUS_QUEUED, '')
+        
+        print(f"Processing {len(video_paths)} files, {workers} at a time ({mode} mode)...")
+        
+        # Weight overall progress by duration so long files count for more
+        total_duration = sum(durations)
+        if total_duration > 0:
+            weights = [d / total_duration for d in durations]
+        else:
+            weights = [1.0 / max(1, len(video_paths))] * len(video_paths)
+        file_progress = [0] * len(video_paths)
+        
+        def report_progress(index: int, value: int):
+            with self._lock:
+                file_progress[index] = value
+                progress = int(sum(p * w for p, w in zip(file_progress, weights)))
+            self.progress_callback(max(0, min(100, progress)))
+        
+        def run_job(index: int) -> Dict[str, Any]:
+            video_path = video_paths[index]
+            if self._stop_flag:
+                self.status_callback(index, self.STATUS_CANCELLED, '')
+                return {'success': False, 'error': 'Cancelled', 'input_file': video_path}
+            
+            splitter = VideoSplitter(lambda value: report_progress(index, value), job_settings)
+            with self._lock:
+                self._active_splitters[index] = splitter
+            self.status_callback(index, self.STATUS_RUNNING, '')
+            
+            try:
+                result = splitter.process_video(video_path, output_base_path, clip_duration,
+                                                mode, resume=resume)
+            finally:
+                with self._lock:
+                    self._active_splitters.pop(index, None)
+            
+            report_progress(index, 100)
+            if self._stop_flag:
+                self.status_callback(index, self.STATUS_CANCELLED, '')
+            elif result['success']:
+                self.status_callback(index, self.STATUS_DONE, f"{result['clips_count']} clips")
+            else:
+                self.status_callback(index, self.STATUS_FAILED, result['error'])
+            return result
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {index: executor.submit(run_job, index) for index in order}
+            results = [futures[index].result() for index in range(len(video_paths))]
+        
+        return self._build_summary(results, mode, clip_duration, time.time() - start_time)
+    
+    def _build_summary(self, results: List[Dict[str, Any]], mode: str,
+                       clip_duration: int, elapsed: float) -> Dict[str, Any]:
+        """Combine per-file results into one summary"""
+        successful = [r for r in results if r['success']]
+        return {
+            'success': len(successful) == len(results) and not self._stop_flag,
+            'cancelled': self._stop_flag,
+            'mode': mode,
+            'clip_duration': clip_duration,
+            'total_files': len(results),
+            'successful_files': len(successful),
+            'failed_files': len(results) - len(successful),
+            'clips_count': sum(r['clips_count'] for r in successful),
+            'resumed_clips': sum(r.get('resumed_clips', 0) for r in successful),
+            'cache_hits': sum(r.get('cache_hits', 0) for r in successful),
+            'cache_misses': sum(r.get('cache_misses', 0) for r in successful),
+            'input_size': sum(r['input_size'] for r in successful),
+            'output_size': sum(r['output_size'] for r in successful),
+            'estimated_size': sum(r.get('estimated_size', 0) for r in successful),
+            'input_duration': sum(r['input_duration'] for r in successful),
+            'elapsed_time': elapsed,
+            'results': results
+        }
+    
+    def cancel_processing(self):
+        """Cancel running files and skip the ones still queued"""
+        print("🛑 Canceling batch processing...")
+        self._stop_flag = True
+        with self._lock:
+            splitters = list(self._active_splitters.values())
+        for splitter in splitters:
+            splitter.cancel_processing()
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Clip Backends for ClipForge
+Engines that probe sources and write encoded clips, selectable per job
+"""
+
+import re
+import csv
+import time
+import shutil
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
+from utils.ffmpeg_utils import FFmpegUtils
+from utils.media_probe import MediaProbe
+from .thumbnails import Thumbnails
+
+
+class ClipBackend:
+    """Interface of the engines that read sources and write clips
+    
+    probe() describes a source, encode() cuts a time range out of it and
+    encodes it, encode_run() cuts a run of consecutive clips from a single
+    open of the source, and mux() joins a video-only clip with a slice of a
+    separate audio track without re-encoding. Processors only talk to this
+    interface, so the engine can be chosen per job with the
+    processing_backend setting. Sources can be local files or stream URLs.
+    
+    stats counts how often sources were opened, the bytes read from them and
+    the seconds spent before the first frame came out (connection, probe and
+    seek), since the last reset_stats(). CONCURRENT backends can run several
+    encodes from different threads at once.
+    """
+    
+    NAME = ''
+    LABEL = ''
+    DEFAULT_BACKEND = 'ffmpeg'
+    CONCURRENT = False
+    
+    def __init__(self):
+        """Initialize backend"""
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+    
+    @staticmethod
+    def get_backends() -> Dict[str, str]:
+        """Get the available backends (name -> display name)"""
+        return {name: backend.LABEL for name, backend in BACKENDS.items()}
+    
+    @staticmethod
+    def create(name: Optional[str] = None) -> 'ClipBackend':
+        """Create a backend by name"""
+        name = name or ClipBackend.DEFAULT_BACKEND
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown processing backend: {name}")
+        return BACKENDS[name]()
+    
+    @staticmethod
+    def from_settings(settings: Optional[Dict[str, Any]]) -> 'ClipBackend':
+        """Create the backend selected in processing settings"""
+        return ClipBackend.create((settings or {}).get('processing_backend'))
+    
+    def probe(self, source: str) -> Optional[Dict[str, Any]]:
+        """Get duration, fps, size (width, height) and has_audio of a source (None if unreadable)"""
+        raise NotImplementedError
+    
+    def encode(self, source: str, start: float, end: float, output_path: Path,
+               video_codec: str, preset: str, crf: int,
+               audio_codec: Optional[str] = None, audio_path: Optional[str] = None,
+               audio_offset: float = 0.0,
+               threads: int = 0, video_filter: Optional[str] = None,
+               work_dir: Optional[Path] = None,
+               thumbnail_path: Optional[Path] = None,
+               progress_callback: Optional[Callable] = None,
+               stop_check: Optional[Callable] = None) -> bool:
+        """Encode source[start:end] into output_path (False if stopped)
+        
+        With audio_path, the clip gets that audio track's slice of the same range
+        stream copied (audio_offset is where the source's time 0 falls in the
+        track); otherwise the source's own audio is encoded with audio_codec,
+        or left out when audio_codec is None. video_filter is an
+        ffmpeg filter chain applied in the encode; intermediate files go to
+        work_dir (default: next to the output). With thumbnail_path, the clip's
+        first frame is also written there as a JPEG/WebP poster (see
+        Thumbnails). Raises RuntimeError on failure.
+        """
+        raise NotImplementedError
+    
+    def encode_run(self, source: str, clips: List[Dict[str, float]], output_paths: List[Path],
+                   video_codec: str, preset: str, crf: int,
+                   audio_codec: Optional[str] = None, audio_path: Optional[str] = None,
+                   audio_offset: float = 0.0, threads: int = 0,
+                   video_filter: Optional[str] = None, work_dir: Optional[Path] = None,
+                   progress_callback: Optional[Callable] = None,
+                   stop_check: Optional[Callable] = None) -> List[Dict[str, Any]]:
+        """Encode consecutive clips of a source into output_paths, opening it once
+        
+        audio_path and audio_offset work as in encode(). Returns the written
+        clips in order ({'path', 'start', 'end'}); when stopped, the clips
+        finished before that. Raises RuntimeError on
+        failure. This default encodes clip by clip, which reads the source
+        once in backends that keep it open between clips.
+        """
+        written = []
+        total = sum(clip['duration'] for clip in clips) or 1.0
+        done = 0.0
+        for clip, output_path in zip(clips, output_paths):
+            def report(value: int, offset=done, weight=clip['duration']):
+                if progress_callback:
+                    progress_callback(int((offset + value / 100 * weight) / total * 100))
+            
+            if not self.encode(source, clip['start'], clip['end'], output_path,
+                               video_codec, preset, crf, audio_codec=audio_codec,
+                               audio_path=audio_path, audio_offset=audio_offset,
+                               threads=threads, video_filter=video_filter, work_dir=work_dir,
+                               progress_callback=report, stop_check=stop_check):
+                break
+            written.append({'path': Path(output_path), 'start': clip['start'], 'end': clip['end']})
+            done += clip['duration']
+        return written
+    
+    def mux(self, video_path: Path, audio_path: str, output_path: Path,
+            audio_start: float = 0.0, duration: Optional[float] = None,
+            stop_check: Optional[Callable] = None):
+        """Mux a video-only clip with a slice of an audio track (no re-encode)"""
+        args = ['-i', str(video_path)]
+        if audio_start > 0:
+            args += ['-ss', FFmpegUtils.format_time(audio_start)]
+        if duration is not None:
+            args += ['-t', FFmpegUtils.format_time(duration)]
+        args += ['-i', audio_path, '-map', '0:v:0', '-map', '1:a:0', '-c', 'copy', str(output_path)]
+        returncode, stderr = FFmpegUtils.run_ffmpeg(args, stop_check=stop_check)
+        if returncode != 0 and not (stop_check and stop_check()):
+            raise RuntimeError(f"ffmpeg audio mux failed: {stderr.strip()[-300:]}")
+    
+    def reset_stats(self):
+        """Start counting source opens, bytes read and startup time from zero"""
+        with self._stats_lock:
+            self.stats = {'opens': 0, 'bytes_read': 0, 'startup_seconds': 0.0}
+    
+    def _count_open(self, bytes_read: int, startup_seconds: float):
+        """Count one open of a source in stats"""
+        with self._stats_lock:
+            self.stats['opens'] += 1
+            self.stats['bytes_read'] += bytes_read
+            self.stats['startup_seconds'] += startup_seconds
+    
+    def close(self):
+        """Release any sources the backend keeps open between clips"""
+
+
+class FFmpegBackend(ClipBackend):
+    """Runs ffmpeg directly: one subprocess decodes, filters, encodes and muxes each clip
+    
+    Frames never leave ffmpeg, and the shared audio track is copied in the
+    same run, so there is no per-clip Python frame loop or extra remux.
+    """
+    
+    NAME = 'ffmpeg'
+    LABEL = 'FFmpeg (direct, fastest)'
+    CONCURRENT = True
+    
+    # Read statistics ffmpeg logs for every input it closes (verbose level)
+    READ_STATS_PATTERN = re.compile(r"Statistics: (\d+) bytes read")
+    
+    def probe(self, source: str) -> Optional[Dict[str, Any]]:
+        """Probe a source with MediaProbe (cached)"""
+        return MediaProbe.get_video_info(source)
+    
+    def encode(self, source: str, start: float, end: float, output_path: Path,
+               video_codec: str, preset: str, crf: int,
+               audio_codec: Optional[str] = None, audio_path: Optional[str] = None,
+               audio_offset: float = 0.0,
+               threads: int = 0, video_filter: Optional[str] = None,
+               work_dir: Optional[Path] = None,
+               thumbnail_path: Optional[Path] = None,
+               progress_callback: Optional[Callable] = None,
+               stop_check: Optional[Callable] = None) -> bool:
+        """Encode a clip with a single ffmpeg run"""
+        duration = end - start
+        seek = ['-ss', FFmpegUtils.format_time(start)] if start > 0 else []
+        args = seek + ['-i', source]
+        maps = ['-map', '0:v:0']
+        if audio_path:
+            audio_start = start + audio_offset
+            args += ['-ss', FFmpegUtils.format_time(audio_start)] if audio_start > 0 else []
+            args += ['-i', audio_path]
+            maps += ['-map', '1:a:0']
+            audio_args = ['-c:a', 'copy']
+        elif audio_codec:
+            maps += ['-map', '0:a:0?']
+            audio_args = ['-c:a', audio_codec]
+        else:
+            audio_args = ['-an']
+        
+        args += ['-t', FFmpegUtils.format_time(duration)] + maps + [
+            '-c:v', video_codec,
+            '-preset', preset,
+            '-crf', str(crf),
+            '-pix_fmt', 'yuv420p'
+        ] + audio_args
+        if video_filter:
+            args += ['-vf', video_filter]
+        if threads:
+            args += ['-threads', str(threads)]
+        args.append(str(output_path))
+        if thumbnail_path:
+            # Second output of the same run: the poster reuses the decoded first frame
+            args += Thumbnails.get_frame_output_args(thumbnail_path, video_filter)
+        
+        returncode, stderr = self._run(args, duration, progress_callback, stop_check)
+        if stop_check and stop_check():
+            Path(output_path).unlink(missing_ok=True)
+            return False
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg encode failed: {stderr.strip()[-300:]}")
+        return True
+    
+    def encode_run(self, source: str, clips: List[Dict[str, float]], output_paths: List[Path],
+                   video_codec: str, preset: str, crf: int,
+                   audio_codec: Optional[str] = None, audio_path: Optional[str] = None,
+                   audio_offset: float = 0.0, threads: int = 0,
+                   video_filter: Optional[str] = None, work_dir: Optional[Path] = None,
+                   progress_callback: Optional[Callable] = None,
+                   stop_check: Optional[Callable] = None) -> List[Dict[str, Any]]:
+        """Encode a run of consecutive clips with one ffmpeg run and the segment muxer
+        
+        The source is opened and probed once, seeked to the first clip (a
+        byte-range request for HTTP sources) and then read sequentially, with
+        keyframes forced at every clip boundary so cuts stay exact.
+        """
+        run_start = clips[0]['start']
+        run_duration = clips[-1]['end'] - run_start
+        work_dir = Path(work_dir) if work_dir else Path(output_paths[0]).parent
+        segment_list = work_dir / "run.csv"
+        boundaries = ','.join(FFmpegUtils.format_cut_time(c['start'] - run_start) for c in clips[1:])
+        
+        args = ['-ss', FFmpegUtils.format_time(run_start)] if run_start > 0 else []
+        args += ['-i', source]
+        if audio_path:
+            # Separate audio track, read in the same run from the same point
+            audio_start = run_start + audio_offset
+            args += ['-ss', FFmpegUtils.format_time(audio_start)] if audio_start > 0 else []
+            args += ['-i', audio_path]
+        args += ['-t', FFmpegUtils.format_time(run_duration), '-map', '0:v:0']
+        if audio_path:
+            args += ['-map', '1:a:0', '-c:a', 'copy']
+        elif audio_codec:
+            args += ['-map', '0:a:0?', '-c:a', audio_codec]
+        else:
+            args += ['-an']
+        args += [
+            '-c:v', video_codec,
+            '-preset', preset,
+            '-crf', str(crf),
+            '-pix_fmt', 'yuv420p'
+        ]
+        if video_filter:
+            args += ['-vf', video_filter]
+        if threads:
+            args += ['-threads', str(threads)]
+        if boundaries:
+            args += ['-force_key_frames', boundaries]
+        args += [
+            '-avoid_negative_ts', 'disabled',
+            '-f', 'segment',
+            '-segment_list', str(segment_list),
+            '-segment_list_type', 'csv',
+            '-reset_timestamps', '1'
+        ]
+        if boundaries:
+            args += ['-segment_times', boundaries]
+        else:
+            args += ['-segment_time', FFmpegUtils.format_time(run_duration + 1)]
+        args.append(str(work_dir / "run_%03d.mp4"))
+        
+        returncode, stderr = self._run(args, run_duration, progress_callback, stop_check)
+        if returncode != 0 and not (stop_check and stop_check()):
+            raise RuntimeError(f"ffmpeg encode run failed: {stderr.strip()[-300:]}")
+        
+        # Only finished segments are in the list; an unfinished last one is left in work_dir
+        rows = []
+        if segment_list.exists():
+            with open(segment_list, 'r', encoding='utf-8', newline='') as f:
+                rows = [row for row in csv.reader(f) if len(row) >= 3]
+            segment_list.unlink()
+        
+        written = []
+        for output_path, (segment_name, start, end) in zip(output_paths, rows):
+            # work_dir may be on another filesystem (e.g. tmpfs), so move, don't rename
+            shutil.move(str(work_dir / segment_name), str(output_path))
+            written.append({
+                'path': Path(output_path),
+                'start': run_start + float(start),
+                'end': run_start + float(end)
+            })
+        return written
+    
+    def _run(self, args: List[str], duration: float, progress_callback: Optional[Callable],
+             stop_check: Optional[Callable]):
+        """Run ffmpeg on one open of the source, counting it in stats"""
+        started = time.monotonic()
+        first_frame = []
+        
+        def report(value: int):
+            if not first_frame:
+                first_frame.append(time.monotonic() - started)
+            if progress_callback:
+                progress_callback(value)
+        
+        # Verbose logging adds the bytes read per input; frequent progress
+        # reports time the first frame closely
+        returncode, stderr = FFmpegUtils.run_ffmpeg(
+            ['-v', 'verbose', '-stats_period', '0.1'] + args,
+            duration=duration, progress_callback=report, stop_check=stop_check
+        )
+        self._count_open(sum(int(n) for n in self.READ_STATS_PATTERN.findall(stderr)),
+                         first_frame[0] if first_frame else time.monotonic() - started)
+        return returncode, stderr
+
+
+class MoviePyBackend(ClipBackend):
+    """Decodes with moviepy and pipes every frame through Python into ffmpeg
+    
+    Kept for compatibility with earlier versions. Sources stay open between
+    clips until close(). A write in progress cannot be interrupted.
+    """
+    
+    NAME = 'moviepy'
+    LABEL = 'MoviePy (compatibility)'
+    
+    def __init__(self):
+        """Initialize moviepy backend"""
+        super().__init__()
+        self._clips = {}
+    
+    def _open(self, source: str):
+        """Open a source once and keep it for the following clips"""
+        if source not in self._clips:
+            from moviepy.editor import VideoFileClip
+            print(f"Loading video: {source}")
+            started = time.monotonic()
+            self._clips[source] = VideoFileClip(source)
+            self._count_open(0, time.monotonic() - started)
+        return self._clips[source]
+    
+    def probe(self, source: str) -> Optional[Dict[str, Any]]:
+        """Probe a source by opening it with moviepy"""
+        from moviepy.editor import VideoFileClip
+        try:
+            clip = VideoFileClip(source)
+        except Exception as e:
+            print(f"Error reading video: {e}")
+            return None
+        try:
+            return {
+                'duration': clip.duration,
+                'fps': clip.fps,
+                'size': tuple(clip.size),
+                'has_audio': clip.audio is not None
+            }
+        finally:
+            clip.close()
+    
+    def encode(self, source: str, start: float, end: float, output_path: Path,
+               video_codec: str, preset: str, crf: int,
+               audio_codec: Optional[str] = None, audio_path: Optional[str] = None,
+               audio_offset: float = 0.0,
+               threads: int = 0, video_filter: Optional[str] = None,
+               work_dir: Optional[Path] = None,
+               thumbnail_path: Optional[Path] = None,
+               progress_callback: Optional[Callable] = None,
+               stop_check: Optional[Callable] = None) -> bool:
+        """Encode a clip with moviepy's write_videofile"""
+        output_path = Path(output_path)
+        video = self._open(source)
+        end = min(end, video.duration)
+        write_audio = bool(audio_codec) and not audio_path and video.audio is not None
+        work_dir = Path(work_dir) if work_dir else output_path.parent
+        target = work_dir / f"{output_path.stem}_video{output_path.suffix}" if audio_path else output_path
+        
+        ffmpeg_params = ['-preset', preset, '-crf', str(crf)]
+        if video_filter:
+            ffmpeg_params += ['-vf', video_filter]
+        
+        # The subclip shares the source's readers, so it is not closed here;
+        # they stay open for the next clip until close()
+        video.subclip(start, end).write_videofile(
+            str(target),
+            codec=video_codec,
+            audio=write_audio,
+            audio_codec=audio_codec if write_audio else None,
+            temp_audiofile=str(work_dir / f"{output_path.stem}_audio.m4a") if write_audio else None,
+            threads=threads or None,
+            fps=video.fps,
+            verbose=False,
+            logger=None,
+            ffmpeg_params=ffmpeg_params
+        )
+        
+        if stop_check and stop_check():
+            target.unlink(missing_ok=True)
+            return False
+        if audio_path:
+            self.mux(target, audio_path, output_path, start + audio_offset, end - start, stop_check)
+            target.unlink(missing_ok=True)
+        if thumbnail_path:
+            # Frames never leave moviepy's writer, so the poster is read back from the clip
+            Thumbnails.extract_frame(str(output_path), thumbnail_path)
+        return True
+    
+    def close(self):
+        """Close every source opened for encoding"""
+        clips, self._clips = self._clips, {}
+        for clip in clips.values():
+            try:
+                clip.close()
+            except Exception:
+                pass
+
+
+# Registered backends (name -> class)
+BACKENDS = {
+    FFmpegBackend.NAME: FFmpegBackend,
+    MoviePyBackend.NAME: MoviePyBackend,
+}
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Clip Cache for ClipForge
+Content-addressed store of encoded clips shared by every job and output folder
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+from utils.file_utils import FileUtils
+from utils.fingerprint import Fingerprint
+
+
+class ClipCache:
+    """Size-bounded LRU cache of finished clips
+    
+    A clip is keyed by the source fingerprint, its planned range and the encode
+    parameters, so re-running the same video with the same settings (a retry,
+    or an export to another folder) reuses the clips instead of encoding them
+    again. Clips are hard-linked in and out of the cache when the output is on
+    the same drive, and copied otherwise.
+    """
+    
+    DEFAULT_MAX_SIZE_MB = 4096
+    INDEX_FILENAME = "clip_cache.json"
+    
+    # Shared by all instances (per cache directory): batch jobs run concurrently against one index
+    _indexes: Dict[Path, Dict[str, Dict[str, Any]]] = {}
+    _lock = threading.Lock()
+    
+    def __init__(self, max_size_mb: Optional[int] = None, cache_dir: Optional[Path] = None):
+        """Initialize clip cache (max_size_mb 0 disables it)"""
+        if max_size_mb is None:
+            max_size_mb = self.DEFAULT_MAX_SIZE_MB
+        self.max_size_bytes = max(0, int(max_size_mb)) * 1024 * 1024
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+    
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> 'ClipCache':
+        """Create a cache from processing settings"""
+        settings = settings or {}
+        return cls(settings.get('clip_cache_mb', cls.DEFAULT_MAX_SIZE_MB))
+    
+    @property
+    def enabled(self) -> bool:
+        """Check whether clips are cached at all"""
+        return self.max_size_bytes > 0
+    
+    def _get_cache_dir(self) -> Path:
+        """Get (and create) the cache directory"""
+        if self.cache_dir is None:
+            self.cache_dir = FileUtils.get_cache_directory("clips")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        return self.cache_dir
+    
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """Load the index once per process (caller holds the lock)"""
+        cache_dir = self._get_cache_dir()
+        if cache_dir not in ClipCache._indexes:
+            try:
+                with open(cache_dir / self.INDEX_FILENAME, 'r', encoding='utf-8') as f:
+                    ClipCache._indexes[cache_dir] = json.load(f)
+            except (OSError, ValueError):
+                ClipCache._indexes[cache_dir] = {}
+        return ClipCache._indexes[cache_dir]
+    
+    def _save_index(self):
+        """Write the index atomically (caller holds the lock)"""
+        index_file = self._get_cache_dir() / self.INDEX_FILENAME
+        temp_file = index_file.with_suffix('.tmp')
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._load_index(), f)
+            os.replace(temp_file, index_file)
+        except OSError as e:
+            print(f"⚠️ Could not save clip cache index: {e}")
+    
+    @staticmethod
+    def get_key(source: str, start: float, end: float, params: Dict[str, Any]) -> str:
+        """Get the cache key of a clip"""
+        key_data = {
+            'source': Fingerprint.get_fingerprint(source),
+            'start': round(start, 3),
+            'end': round(end, 3),
+            'params': params
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _link_or_copy(source: Path, destination: Path):
+        """Hard-link a file, falling back to a copy across drives"""
+        destination.unlink(missing_ok=True)
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copy2(source, destination)
+    
+    def _is_intact(self, entry: Dict[str, Any]) -> bool:
+        """Check that a cached file still has the size and mtime it was stored with"""
+        try:
+            stat = (self._get_cache_dir() / entry['file']).stat()
+        except OSError:
+            return False
+        return stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']
+    
+    def fetch(self, key: str, destination: Path) -> Optional[Dict[str, Any]]:
+        """Place a cached clip at destination and return its entry, or None on a miss"""
+        if not self.enabled:
+            return None
+        
+        with self._lock:
+            index = self._load_index()
+            entry = index.get(key)
+            if entry and not self._is_intact(entry):
+                # Modified or removed outside ClipForge
+                (self._get_cache_dir() / entry['file']).unlink(missing_ok=True)
+                del index[key]
+                self._save_index()
+                entry = None
+            if entry is None:
+                return None
+            entry['last_used'] = time.time()
+            self._save_index()
+            entry = dict(entry)
+        
+        try:
+            self._link_or_copy(self._get_cache_dir() / entry['file'], Path(destination))
+        except OSError as e:
+            print(f"⚠️ Could not reuse cached clip: {e}")
+            return None
+        return entry
+    
+    def store(self, key: str, clip_path: Path, start: float, end: float):
+        """Add a finished clip to the cache and evict the least recently used ones"""
+        if not self.enabled:
+            return
+        
+        clip_path = Path(clip_path)
+        size = FileUtils.get_file_size(str(clip_path))
+        if size <= 0 or size > self.max_size_bytes:
+            return
+        
+        cache_file = Path(key[:2]) / f"{key}{clip_path.suffix}"
+        target = self._get_cache_dir() / cache_file
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            self._link_or_copy(clip_path, target)
+            mtime_ns = target.stat().st_mtime_ns
+        except OSError as e:
+            print(f"⚠️ Could not cache clip: {e}")
+            return
+        
+        with self._lock:
+            index = self._load_index()
+            index[key] = {
+                'file': cache_file.as_posix(),
+                'size': size,
+                'mtime_ns': mtime_ns,
+                'start': start,
+                'end': end,
+                'last_used': time.time()
+            }
+            self._evict(index)
+            self._save_index()
+    
+    def _evict(self, index: Dict[str, Dict[str, Any]]):
+        """Drop least recently used clips until the cache fits its size limit (caller holds the lock)"""
+        total = sum(entry['size'] for entry in index.values())
+        for key in sorted(index, key=lambda k: index[k]['last_used']):
+            if total <= self.max_size_bytes:
+                break
+            entry = index.pop(key)
+            (self._get_cache_dir() / entry['file']).unlink(missing_ok=True)
+            total -= entry['size']
+    
+    def get_size(self) -> int:
+        """Get the total size of cached clips in bytes"""
+        with self._lock:
+            return sum(entry['size'] for entry in self._load_index().values())
+    
+    def clear(self):
+        """Remove every cached clip"""
+        with self._lock:
+            index = self._load_index()
+            for entry in index.values():
+                (self._get_cache_dir() / entry['file']).unlink(missing_ok=True)
+            index.clear()
+            self._save_index()
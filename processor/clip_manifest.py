@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Clip Manifest for ClipForge
+Checkpoints finished clips in the output folder so interrupted jobs can resume
+"""
+
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+from utils.file_utils import FileUtils
+from utils.fingerprint import Fingerprint
+
+
+class ClipManifest:
+    """Per-output-folder record of every finished clip
+    
+    Each entry stores the clip range, size, duration and checksum. A job resumed
+    on the same folder skips clips whose file still matches its entry and only
+    encodes the missing or corrupt ones. The manifest only applies to the same
+    source (sampled content fingerprint, or URL) and the same encode parameters.
+    When the source's full hash is known on both sides it must match as well.
+    """
+    
+    FILENAME = "clipforge_manifest.json"
+    VERSION = 2
+    # Clip plans are deterministic, so a resumed plan matches to within rounding
+    RANGE_TOLERANCE = 0.001
+    
+    def __init__(self, output_folder: Path, source: str, params: Dict[str, Any]):
+        """Initialize an empty manifest for a folder"""
+        self.output_folder = Path(output_folder)
+        self.source = source
+        self.source_fingerprint = Fingerprint.get_fingerprint(source)
+        self.source_full_hash = Fingerprint.get_full_hash(source)
+        self.params = dict(params)
+        self.clips: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def path(self) -> Path:
+        """Get the manifest file path"""
+        return self.output_folder / self.FILENAME
+    
+    @classmethod
+    def load(cls, output_folder: Path) -> Optional['ClipManifest']:
+        """Load the manifest stored in a folder, if any"""
+        manifest_file = Path(output_folder) / cls.FILENAME
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != cls.VERSION:
+                return None
+            manifest = cls(output_folder, data['source'], data['params'])
+            manifest.source_fingerprint = data['source_fingerprint']
+            manifest.source_full_hash = data.get('source_full_hash')
+            manifest.clips = data.get('clips', {})
+            return manifest
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    @classmethod
+    def open(cls, output_folder: Path, source: str, params: Dict[str, Any]) -> 'ClipManifest':
+        """Load the folder's manifest if it belongs to this job, else start a new one"""
+        manifest = cls.load(output_folder)
+        if manifest and manifest.matches(source, params):
+            return manifest
+        return cls(output_folder, source, params)
+    
+    @classmethod
+    def find_resumable(cls, output_base_path: Path, folder_name: str, source: str,
+                       params: Dict[str, Any]) -> Optional[Path]:
+        """Find the most recent output folder of a previous run of the same job
+        
+        Looks at the folder itself and its timestamped variants created by
+        FileUtils.create_unique_folder_name.
+        """
+        base_path = Path(output_base_path)
+        if not base_path.is_dir():
+            return None
+        
+        candidates = []
+        for folder in base_path.iterdir():
+            if not folder.is_dir():
+                continue
+            if folder.name != folder_name and not folder.name.startswith(f"{folder_name}_"):
+                continue
+            manifest = cls.load(folder)
+            if manifest and manifest.matches(source, params):
+                candidates.append((manifest.path.stat().st_mtime, folder))
+        
+        if not candidates:
+            return None
+        return max(candidates)[1]
+    
+    def matches(self, source: str, params: Dict[str, Any]) -> bool:
+        """Check whether this manifest was written for the same source and parameters"""
+        if self.source_fingerprint != Fingerprint.get_fingerprint(source) or self.params != dict(params):
+            return False
+        full_hash = Fingerprint.get_full_hash(source)
+        return not (full_hash and self.source_full_hash) or full_hash == self.source_full_hash
+    
+    @staticmethod
+    def compute_checksum(file_path: str) -> str:
+        """Compute the SHA-256 checksum of a clip"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def record_clip(self, index: int, clip_path: str, start: float, end: float,
+                    planned: Optional[Dict[str, float]] = None):
+        """Record a finished clip and save the manifest
+        
+        start/end are the real clip range; planned is the range the clip was
+        cut for (copy mode moves cuts to keyframes), used to match it on resume.
+        """
+        planned = planned or {'start': start, 'end': end}
+        # No probe here: it would send every clip through the persistent probe cache
+        entry = {
+            'file': Path(clip_path).name,
+            'start': start,
+            'end': end,
+            'planned_start': planned['start'],
+            'planned_end': planned['end'],
+            'size': FileUtils.get_file_size(clip_path),
+            'duration': end - start,
+            'checksum': self.compute_checksum(clip_path)
+        }
+        with self._lock:
+            self.clips[str(index)] = entry
+            # A background full hash of the source may have finished meanwhile
+            self.source_full_hash = self.source_full_hash or Fingerprint.get_full_hash(self.source)
+            self.save()
+    
+    def get_valid_clip(self, index: int, planned: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        """Get the recorded clip for an index if its file is intact and was cut for this plan"""
+        with self._lock:
+            entry = self.clips.get(str(index))
+        if not entry:
+            return None
+        
+        if (abs(entry['planned_start'] - planned['start']) > self.RANGE_TOLERANCE
+                or abs(entry['planned_end'] - planned['end']) > self.RANGE_TOLERANCE):
+            return None
+        
+        clip_path = self.output_folder / entry['file']
+        if not clip_path.is_file() or clip_path.stat().st_size != entry['size']:
+            return None
+        if self.compute_checksum(str(clip_path)) != entry['checksum']:
+            print(f"⚠️ Clip {entry['file']} is corrupt, it will be encoded again")
+            return None
+        
+        return dict(entry, path=str(clip_path))
+    
+    def save(self):
+        """Write the manifest atomically (caller holds the lock)"""
+        data = {
+            'version': self.VERSION,
+            'source': self.source,
+            'source_fingerprint': self.source_fingerprint,
+            'source_full_hash': self.source_full_hash,
+            'params': self.params,
+            'clips': self.clips
+        }
+        temp_file = self.path.with_suffix('.tmp')
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_file, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save clip manifest: {e}")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Clip Planner for ClipForge
+Calculates clip ranges for a video, optionally moving cuts to scene changes, pauses and keyframes
+"""
+
+import bisect
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+
+class ClipPlanner:
+    """Plans clip boundaries for the local splitter and the URL processor"""
+    
+    # Cuts stay this far inside a pause (seconds) so trailing sounds are not clipped
+    SILENCE_MARGIN = 0.15
+    
+    @staticmethod
+    def fixed_clips(video_duration: float, clip_duration: float) -> List[Dict[str, float]]:
+        """Calculate clips on fixed offsets (0, d, 2d, ...)"""
+        clips = []
+        start_time = 0.0
+        
+        while start_time < video_duration:
+            end_time = min(start_time + clip_duration, video_duration)
+            clips.append({
+                'start': start_time,
+                'end': end_time,
+                'duration': end_time - start_time
+            })
+            start_time = end_time
+        
+        return clips
+    
+    @staticmethod
+    def sliding_windows(video_duration: float, clip_duration: float,
+                        step: float) -> List[Dict[str, float]]:
+        """Calculate windows of clip_duration starting every step seconds (0, s, 2s, ...)
+        
+        Windows overlap when step is shorter than the clip duration. The last
+        window is the first one reaching the end of the video.
+        """
+        clips = []
+        index = 0
+        while index * step < video_duration:
+            start_time = index * step
+            end_time = min(start_time + clip_duration, video_duration)
+            clips.append({
+                'start': start_time,
+                'end': end_time,
+                'duration': end_time - start_time
+            })
+            if end_time >= video_duration:
+                break
+            index += 1
+        
+        return clips
+    
+    @staticmethod
+    def assign_lanes(clips: List[Dict[str, float]], indexes: List[int]) -> List[List[int]]:
+        """Group clip indexes into lanes of clips that do not overlap
+        
+        Each clip goes to the first lane that has ended by its start, so the lane
+        count is the overlap depth (clip duration / step for sliding windows).
+        """
+        lanes = []
+        lane_ends = []
+        for index in sorted(indexes, key=lambda i: clips[i]['start']):
+            for lane, end in enumerate(lane_ends):
+                if end <= clips[index]['start'] + 1e-6:
+                    lanes[lane].append(index)
+                    lane_ends[lane] = clips[index]['end']
+                    break
+            else:
+                lanes.append([index])
+                lane_ends.append(clips[index]['end'])
+        return lanes
+    
+    @staticmethod
+    def contiguous_runs(indexes: List[int]) -> List[List[int]]:
+        """Group sorted clip indexes into runs of consecutive indexes"""
+        runs = []
+        for index in indexes:
+            if runs and runs[-1][-1] == index - 1:
+                runs[-1].append(index)
+            else:
+                runs.append([index])
+        return runs
+    
+    @staticmethod
+    def split_shards(items: List[Any], count: int) -> List[List[Any]]:
+        """Split a list of clips (or clip indexes) into at most count contiguous shards"""
+        shard_count = max(1, min(count, len(items)))
+        shard_size = -(-len(items) // shard_count)
+        return [items[i:i + shard_size] for i in range(0, len(items), shard_size)]
+    
+    @staticmethod
+    def clips_from_boundaries(boundaries: List[float]) -> List[Dict[str, float]]:
+        """Build clip dicts from an ordered list of cut points (including 0 and the end)"""
+        return [
+            {'start': start, 'end': end, 'duration': end - start}
+            for start, end in zip(boundaries, boundaries[1:])
+            if end > start
+        ]
+    
+    @staticmethod
+    def _move_boundaries(clips: List[Dict[str, float]],
+                         choose: Callable[[float], Optional[float]]) -> List[Dict[str, float]]:
+        """Move every inner clip boundary to the point choose() picks for it (None keeps it)"""
+        video_end = clips[-1]['end']
+        boundaries = [clips[0]['start']]
+        for clip in clips[:-1]:
+            target = clip['end']
+            moved = choose(target)
+            if moved is not None and boundaries[-1] < moved < video_end:
+                target = moved
+            if target > boundaries[-1]:
+                boundaries.append(target)
+        boundaries.append(video_end)
+        
+        return ClipPlanner.clips_from_boundaries(boundaries)
+    
+    @staticmethod
+    def snap_to_keyframes(clips: List[Dict[str, float]], keyframes: List[float],
+                          tolerance: float) -> List[Dict[str, float]]:
+        """Move every inner clip boundary to the nearest keyframe within tolerance
+        
+        Boundaries with no keyframe in range are left where they are.
+        """
+        if not clips or not keyframes or tolerance <= 0:
+            return clips
+        return ClipPlanner._move_boundaries(
+            clips, lambda target: ClipPlanner._nearest(keyframes, target, tolerance)
+        )
+    
+    @staticmethod
+    def snap_to_scenes(clips: List[Dict[str, float]], scenes: List[Tuple[float, float]],
+                       window: float, min_score: float = 0.0) -> List[Dict[str, float]]:
+        """Move every inner clip boundary to the strongest scene change within window
+        
+        scenes are sorted (time, score) pairs; boundaries with no scene change of
+        at least min_score in range are left where they are.
+        """
+        if not clips or not scenes or window <= 0:
+            return clips
+        times = [scene[0] for scene in scenes]
+        return ClipPlanner._move_boundaries(
+            clips, lambda target: ClipPlanner._strongest(scenes, times, target, window, min_score)
+        )
+    
+    @staticmethod
+    def _nearest(points: List[float], target: float, tolerance: float) -> Optional[float]:
+        """Find the sorted point closest to target within tolerance"""
+        index = bisect.bisect_left(points, target)
+        candidates = [points[i] for i in (index - 1, index) if 0 <= i < len(points)]
+        candidates = [p for p in candidates if abs(p - target) <= tolerance]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda p: abs(p - target))
+    
+    @staticmethod
+    def snap_to_silences(clips: List[Dict[str, float]], silences: List[Tuple[float, float]],
+                         tolerance: float) -> List[Dict[str, float]]:
+        """Move every inner clip boundary into the nearest silent interval within tolerance
+        
+        The cut lands on the point of the pause closest to the original boundary,
+        kept SILENCE_MARGIN inside it so the end of the word before stays whole.
+        Boundaries with no pause in range are left where they are.
+        """
+        if not clips or not silences or tolerance <= 0:
+            return clips
+        starts = [silence[0] for silence in silences]
+        return ClipPlanner._move_boundaries(
+            clips, lambda target: ClipPlanner._nearest_silence(silences, starts, target, tolerance)
+        )
+    
+    @staticmethod
+    def _nearest_silence(silences: List[Tuple[float, float]], starts: List[float],
+                         target: float, tolerance: float) -> Optional[float]:
+        """Find the cut point in the silent interval closest to target within tolerance"""
+        best = None
+        # Intervals are sorted and disjoint, so only those starting before target + tolerance matter
+        high = bisect.bisect_right(starts, target + tolerance)
+        for start, end in reversed(silences[:high]):
+            if end < target - tolerance:
+                break
+            margin = min(ClipPlanner.SILENCE_MARGIN, (end - start) / 2)
+            point = min(max(target, start + margin), end - margin)
+            if abs(point - target) <= tolerance and (best is None or abs(point - target) < abs(best - target)):
+                best = point
+        return best
+    
+    @staticmethod
+    def _strongest(scenes: List[Tuple[float, float]], times: List[float], target: float,
+                   window: float, min_score: float) -> Optional[float]:
+        """Find the time of the highest scoring scene change within window of target"""
+        low = bisect.bisect_left(times, target - window)
+        high = bisect.bisect_right(times, target + window)
+        candidates = [scene for scene in scenes[low:high] if scene[1] >= min_score]
+        if not candidates:
+            return None
+        # Ties go to the change closest to the target
+        return max(candidates, key=lambda scene: (scene[1], -abs(scene[0] - target)))[0]
+    
+    @staticmethod
+    def plan_clips(video_duration: float, clip_duration: float,
+                   keyframes: Optional[List[float]] = None,
+                   tolerance: float = 0.0,
+                   scenes: Optional[List[Tuple[float, float]]] = None,
+                   scene_window: float = 0.0,
+                   min_scene_score: float = 0.0,
+                   silences: Optional[List[Tuple[float, float]]] = None,
+                   silence_tolerance: float = 0.0) -> List[Dict[str, float]]:
+        """Plan clips on fixed offsets, then move cuts to scene changes, into pauses
+        and onto keyframes, in that order, for each index that is given
+        
+        Scene and silence windows are capped at a quarter of the clip duration so
+        no clip ends up much shorter than half of it.
+        """
+        clips = ClipPlanner.fixed_clips(video_duration, clip_duration)
+        if scenes:
+            window = min(scene_window, clip_duration / 4)
+            clips = ClipPlanner.snap_to_scenes(clips, scenes, window, min_scene_score)
+        if silences:
+            window = min(silence_tolerance, clip_duration / 4)
+            clips = ClipPlanner.snap_to_silences(clips, silences, window)
+        if keyframes:
+            clips = ClipPlanner.snap_to_keyframes(clips, keyframes, tolerance)
+        return clips
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Format Selector for ClipForge
+Picks the yt-dlp formats a URL job streams from: best video, plus a separate audio track when that is better
+"""
+
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+
+class FormatSelector:
+    """Choose the video format (and separate audio format) to cut URL clips from
+    
+    Platforms like YouTube only offer combined audio+video formats up to
+    360p/720p; the higher qualities are video-only, with audio in separate
+    formats. The best video format within max_height is picked, preferring
+    video_codec at equal height, and when it has no audio the best audio-only
+    format is paired with it. That audio is stream copied into the clips, so
+    only codecs MP4 can carry are considered. The video is always re-encoded
+    for exact cuts, so video_codec only picks which source is downloaded.
+    """
+    
+    DEFAULT_MAX_HEIGHT = 1080
+    DEFAULT_VIDEO_CODEC = 'any'
+    
+    # Height limits offered in the GUI (0 = no limit)
+    MAX_HEIGHTS = (0, 2160, 1440, 1080, 720, 480)
+    
+    # Preferred video codec id -> yt-dlp vcodec prefixes ('any' has no preference)
+    VIDEO_CODECS = {
+        'any': (),
+        'avc1': ('avc1', 'h264'),
+        'vp9': ('vp9', 'vp09'),
+        'av01': ('av01',),
+    }
+    
+    # Audio codecs that can be copied into MP4 clips, best first
+    AUDIO_CODECS = ('mp4a', 'opus')
+    
+    def __init__(self, max_height: int = DEFAULT_MAX_HEIGHT,
+                 video_codec: str = DEFAULT_VIDEO_CODEC):
+        """Initialize format selector (max_height 0 = no limit)"""
+        if video_codec not in self.VIDEO_CODECS:
+            raise ValueError(f"Unknown video codec preference: {video_codec}")
+        self.max_height = max(0, int(max_height))
+        self.video_codec = video_codec
+    
+    @staticmethod
+    def from_settings(settings: Optional[Dict[str, Any]]) -> 'FormatSelector':
+        """Create the format selector configured in processing settings"""
+        settings = settings or {}
+        return FormatSelector(settings.get('url_max_height', FormatSelector.DEFAULT_MAX_HEIGHT),
+                              settings.get('url_video_codec') or FormatSelector.DEFAULT_VIDEO_CODEC)
+    
+    @staticmethod
+    def has_video(fmt: Dict[str, Any]) -> bool:
+        """Check whether a format carries video"""
+        vcodec = fmt.get('vcodec')
+        if vcodec:
+            return vcodec != 'none'
+        return bool(fmt.get('height'))
+    
+    @staticmethod
+    def has_audio(fmt: Dict[str, Any]) -> bool:
+        """Check whether a format carries audio"""
+        acodec = fmt.get('acodec')
+        return bool(acodec) and acodec != 'none'
+    
+    def select(self, formats: List[Dict[str, Any]],
+               usable: Optional[Callable] = None) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Get (video format, separate audio format or None) from yt-dlp formats
+        
+        usable(fmt) filters out formats that cannot be fetched. A combined
+        format is kept when no separate pair would be better than it; video
+        without any audio is only used when nothing else is available.
+        """
+        formats = [fmt for fmt in formats if not usable or usable(fmt)]
+        videos = [fmt for fmt in formats if self.has_video(fmt) and self._fits(fmt)]
+        if not videos:
+            # Nothing within the height limit: take the smallest video there is
+            videos = [fmt for fmt in formats if self.has_video(fmt)]
+            if videos:
+                smallest = min(fmt.get('height') or 0 for fmt in videos)
+                videos = [fmt for fmt in videos if (fmt.get('height') or 0) == smallest]
+        combined = [fmt for fmt in videos if self.has_audio(fmt)]
+        audios = [fmt for fmt in formats if not self.has_video(fmt) and self.has_audio(fmt)
+                  and self._audio_rank(fmt)[0] >= 0]
+        if not videos:
+            return None, None
+        
+        best_video = max(videos, key=self._video_rank)
+        best_combined = max(combined, key=self._video_rank) if combined else None
+        if self.has_audio(best_video):
+            return best_video, None
+        if audios:
+            return best_video, max(audios, key=self._audio_rank)
+        return best_combined or best_video, None
+    
+    def _fits(self, fmt: Dict[str, Any]) -> bool:
+        """Check a video format against the height limit"""
+        return not self.max_height or (fmt.get('height') or 0) <= self.max_height
+    
+    def _video_rank(self, fmt: Dict[str, Any]) -> tuple:
+        """Sort key of video formats: height, then the preferred codec, frame rate and bitrate"""
+        prefixes = self.VIDEO_CODECS[self.video_codec]
+        preferred = bool(prefixes) and (fmt.get('vcodec') or '').startswith(prefixes)
+        return (fmt.get('height') or 0, preferred, fmt.get('fps') or 0,
+                fmt.get('tbr') or fmt.get('vbr') or 0)
+    
+    def _audio_rank(self, fmt: Dict[str, Any]) -> tuple:
+        """Sort key of audio formats: copyable codec (-1 if none), then bitrate"""
+        acodec = fmt.get('acodec') or ''
+        codec = next((len(self.AUDIO_CODECS) - n for n, name in enumerate(self.AUDIO_CODECS)
+                      if acodec.startswith(name)), -1)
+        return (codec, fmt.get('abr') or fmt.get('tbr') or 0)
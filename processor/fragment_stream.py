@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fragment Stream for ClipForge
+Fetches only the HLS/DASH fragments that cover a time range of a fragmented format
+"""
+
+import re
+import bisect
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from urllib.parse import urljoin
+import requests
+
+
+class FragmentStream:
+    """Fragment list of an HLS or DASH format, and range fetches from it
+    
+    A fragmented format is a list of short media files (plus an optional init
+    segment) instead of one file. With each fragment's duration known, a time
+    range maps to the few fragments covering it; those are downloaded in
+    parallel and joined into one local file for ffmpeg to cut exactly. A clip
+    from a long VOD then fetches about its own length of media.
+    
+    stats counts the fragments and bytes downloaded.
+    """
+    
+    PLAYLIST_PROTOCOLS = ('m3u8', 'm3u8_native')
+    FRAGMENT_PROTOCOLS = ('http_dash_segments', 'm3u8', 'm3u8_native')
+    CHUNK_SIZE = 1024 * 1024
+    RETRIES = 3
+    TIMEOUT = 30
+    
+    def __init__(self, url: str, fragments: Optional[List[Dict[str, Any]]] = None,
+                 init: Optional[Dict[str, Any]] = None,
+                 headers: Optional[Dict[str, str]] = None, extension: str = 'ts'):
+        """Initialize fragment stream
+        
+        url is the media playlist of an HLS format, read by load() when no
+        fragments are given. Fragments are {'url', 'start', 'duration'} dicts,
+        with an optional byte 'range' (first, last); init is the init segment.
+        """
+        self.url = url
+        self.fragments = fragments or []
+        self.init = init
+        self.headers = dict(headers or {})
+        self.extension = extension
+        self.stats = {'fragments': 0, 'bytes': 0}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def is_fragmented(fmt: Dict[str, Any]) -> bool:
+        """Check whether a yt-dlp format is delivered as fragments"""
+        return bool(fmt.get('fragments')) or fmt.get('protocol') in FragmentStream.PLAYLIST_PROTOCOLS
+    
+    @staticmethod
+    def from_format(fmt: Dict[str, Any]) -> Optional['FragmentStream']:
+        """Create a fragment stream for a yt-dlp format (None if it is not fragmented or not supported)"""
+        if not FragmentStream.is_fragmented(fmt) or fmt.get('has_drm'):
+            return None
+        if fmt.get('protocol') not in FragmentStream.FRAGMENT_PROTOCOLS:
+            return None
+        headers = fmt.get('http_headers')
+        if not fmt.get('fragments'):
+            return FragmentStream(fmt['url'], headers=headers)
+        
+        # Fragments listed by yt-dlp: an init segment first (no duration), then media
+        base_url = fmt.get('fragment_base_url') or fmt.get('url') or ''
+        init = None
+        fragments = []
+        start = 0.0
+        for fragment in fmt['fragments']:
+            url = fragment.get('url') or urljoin(base_url, fragment.get('path', ''))
+            if fragment.get('duration') is None:
+                if fragments or init:
+                    return None
+                init = {'url': url}
+                continue
+            fragments.append({'url': url, 'start': start, 'duration': float(fragment['duration'])})
+            start += float(fragment['duration'])
+        # HLS fragments without an init segment are MPEG-TS
+        if init or fmt.get('protocol') not in FragmentStream.PLAYLIST_PROTOCOLS:
+            extension = fmt.get('ext') or 'mp4'
+        else:
+            extension = 'ts'
+        return FragmentStream(fmt.get('url', ''), fragments, init, headers, extension)
+    
+    @staticmethod
+    def parse_playlist(text: str, base_url: str) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]], List[str]]:
+        """Parse an m3u8 playlist into (init segment, fragments, variant playlist URLs)
+        
+        Variants are only listed by master playlists, best bandwidth first.
+        Raises ValueError for encrypted playlists.
+        """
+        init = None
+        fragments = []
+        variants = []
+        start = 0.0
+        duration = None
+        byte_range = None
+        next_offset = 0
+        bandwidth = None
+        
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('#EXT-X-KEY'):
+                method = re.search(r'METHOD=([^,]+)', line)
+                if method and method.group(1) != 'NONE':
+                    raise ValueError("Encrypted HLS playlists are not supported")
+            elif line.startswith('#EXT-X-MAP'):
+                uri = re.search(r'URI="([^"]+)"', line)
+                init = {'url': urljoin(base_url, uri.group(1))}
+                map_range = re.search(r'BYTERANGE="(\d+)(?:@(\d+))?"', line)
+                if map_range:
+                    offset = int(map_range.group(2) or 0)
+                    init['range'] = (offset, offset + int(map_range.group(1)) - 1)
+            elif line.startswith('#EXT-X-STREAM-INF'):
+                match = re.search(r'BANDWIDTH=(\d+)', line)
+                bandwidth = int(match.group(1)) if match else 0
+            elif line.startswith('#EXTINF:'):
+                duration = float(line[len('#EXTINF:'):].split(',')[0])
+            elif line.startswith('#EXT-X-BYTERANGE:'):
+                length, _, offset = line[len('#EXT-X-BYTERANGE:'):].partition('@')
+                first = int(offset) if offset else next_offset
+                byte_range = (first, first + int(length) - 1)
+                next_offset = byte_range[1] + 1
+            elif not line.startswith('#'):
+                url = urljoin(base_url, line)
+                if bandwidth is not None:
+                    variants.append((bandwidth, url))
+                    bandwidth = None
+                elif duration is not None:
+                    fragment = {'url': url, 'start': start, 'duration': duration}
+                    if byte_range:
+                        fragment['range'] = byte_range
+                    fragments.append(fragment)
+                    start += duration
+                    duration = None
+                    byte_range = None
+        
+        variants.sort(key=lambda variant: variant[0], reverse=True)
+        return init, fragments, [url for _, url in variants]
+    
+    def load(self) -> bool:
+        """Read the fragment list from the playlist if needed (False if it cannot be used)"""
+        if self.fragments:
+            return True
+        try:
+            url = self.url
+            for _ in range(2):
+                response = requests.get(url, headers=self.headers, timeout=self.TIMEOUT)
+                response.raise_for_status()
+                self.init, self.fragments, variants = self.parse_playlist(response.text, response.url)
+                if not variants:
+                    break
+                # Master playlist: follow the best variant
+                url = variants[0]
+        except (requests.RequestException, ValueError) as e:
+            print(f"⚠️ Could not read fragment list: {e}")
+            return False
+        if self.init:
+            self.extension = 'mp4'
+        print(f"✅ Fragment list: {len(self.fragments)} fragments, {self.duration:.1f}s")
+        return bool(self.fragments)
+    
+    @property
+    def duration(self) -> float:
+        """Get the total duration of all fragments"""
+        if not self.fragments:
+            return 0.0
+        return self.fragments[-1]['start'] + self.fragments[-1]['duration']
+    
+    def select(self, start: float, end: float) -> List[Dict[str, Any]]:
+        """Get the fragments covering start..end"""
+        starts = [fragment['start'] for fragment in self.fragments]
+        first = max(0, bisect.bisect_right(starts, start) - 1)
+        selected = []
+        for fragment in self.fragments[first:]:
+            if fragment['start'] >= end:
+                break
+            if fragment['start'] + fragment['duration'] > start:
+                selected.append(fragment)
+        return selected
+    
+    def fetch(self, start: float, end: float, output_path: Path, workers: int = 4,
+              stop_check: Optional[Callable] = None,
+              connection: Optional[Callable] = None) -> Optional[float]:
+        """Download the fragments covering start..end into one local file
+        
+        Fragments are downloaded by `workers` threads; connection(url), when
+        given, returns a context manager that holds a connection slot for the
+        download and yields False if stopped while waiting. Returns the source
+        time at which the local file starts (None if stopped). Raises
+        RuntimeError when a fragment cannot be downloaded.
+        """
+        output_path = Path(output_path)
+        selected = self.select(start, end)
+        if not selected:
+            raise RuntimeError(f"No fragments cover {start:.1f}s - {end:.1f}s")
+        parts = [output_path.parent / f"{output_path.stem}_{n:05d}.part" for n in range(len(selected))]
+        connection = connection or (lambda url: nullcontext(True))
+        
+        def download(fragment: Dict[str, Any], path: Path) -> bool:
+            with connection(fragment['url']) as connected:
+                return connected and self._download(fragment, path, stop_check)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(selected)))) as executor:
+                done = list(executor.map(download, selected, parts))
+            if not all(done) or (self.init and not download(self.init, output_path)):
+                return None
+            
+            # Join in playback order after the init segment
+            with open(output_path, 'ab' if self.init else 'wb') as output:
+                for part in parts:
+                    with open(part, 'rb') as f:
+                        shutil.copyfileobj(f, output, self.CHUNK_SIZE)
+            return selected[0]['start']
+        finally:
+            for part in parts:
+                part.unlink(missing_ok=True)
+    
+    def _download(self, fragment: Dict[str, Any], path: Path,
+                  stop_check: Optional[Callable] = None) -> bool:
+        """Download one fragment, retrying failed requests (False if stopped)"""
+        headers = dict(self.headers)
+        if fragment.get('range'):
+            headers['Range'] = f"bytes={fragment['range'][0]}-{fragment['range'][1]}"
+        
+        for attempt in range(self.RETRIES):
+            try:
+                size = 0
+                with requests.get(fragment['url'], headers=headers, stream=True,
+                                  timeout=self.TIMEOUT) as response:
+                    response.raise_for_status()
+                    with open(path, 'wb') as f:
+                        for chunk in response.iter_content(self.CHUNK_SIZE):
+                            if stop_check and stop_check():
+                                return False
+                            f.write(chunk)
+                            size += len(chunk)
+                with self._lock:
+                    self.stats['fragments'] += 1
+                    self.stats['bytes'] += size
+                return True
+            except requests.RequestException as e:
+                if attempt == self.RETRIES - 1:
+                    raise RuntimeError(f"Fragment download failed ({fragment['url'][:80]}): {e}")
+                print(f"⚠️ Fragment download failed, retrying: {e}")
+        return False
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Keyframe Index for ClipForge
+Builds keyframe timestamp indexes with a packet scan and caches them per source
+"""
+
+import json
+import hashlib
+import threading
+from typing import List, Dict, Optional
+from utils.file_utils import FileUtils
+from utils.ffmpeg_utils import FFmpegUtils
+
+
+class KeyframeIndex:
+    """Keyframe timestamp index cached in memory and on disk
+    
+    Entries are keyed by path + size + mtime (see FileUtils.get_file_signature),
+    so an index is rebuilt only when the source file changes.
+    """
+    
+    # Bumped when the keyframe times change meaning (2: relative to the container start)
+    INDEX_VERSION = 2
+    
+    # Shared by all instances so the splitter and the URL processor reuse entries
+    _memory_cache: Dict[str, List[float]] = {}
+    _lock = threading.Lock()
+    
+    def __init__(self, use_disk_cache: bool = True):
+        """Initialize keyframe index"""
+        self.use_disk_cache = use_disk_cache
+        self.cache_dir = FileUtils.get_cache_directory("keyframes") if use_disk_cache else None
+    
+    def _get_cache_file(self, signature: str):
+        """Get the on-disk cache file for a source signature"""
+        digest = hashlib.sha1(signature.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+    
+    def get_keyframes(self, source: str) -> List[float]:
+        """Get keyframe timestamps (seconds) for a file or stream URL"""
+        signature = FileUtils.get_file_signature(source)
+        
+        with self._lock:
+            if signature in self._memory_cache:
+                return self._memory_cache[signature]
+        
+        keyframes = self._load_from_disk(signature)
+        if keyframes is None:
+            print(f"Building keyframe index for: {source}")
+            keyframes = FFmpegUtils.get_keyframe_times(source)
+            print(f"✅ Keyframe index built: {len(keyframes)} keyframes")
+            self._save_to_disk(signature, keyframes)
+        
+        with self._lock:
+            self._memory_cache[signature] = keyframes
+        return keyframes
+    
+    def _load_from_disk(self, signature: str) -> Optional[List[float]]:
+        """Load a cached index from disk"""
+        if not self.use_disk_cache:
+            return None
+        cache_file = self._get_cache_file(signature)
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('signature') == signature and data.get('version') == self.INDEX_VERSION:
+                return data['keyframes']
+        except (OSError, ValueError, KeyError):
+            pass
+        return None
+    
+    def _save_to_disk(self, signature: str, keyframes: List[float]):
+        """Save an index to disk"""
+        if not self.use_disk_cache:
+            return
+        try:
+            with open(self._get_cache_file(signature), 'w', encoding='utf-8') as f:
+                json.dump({'signature': signature, 'version': self.INDEX_VERSION, 'keyframes': keyframes}, f)
+        except OSError as e:
+            print(f"⚠️ Could not save keyframe index: {e}")
+    
+    def clear_memory_cache(self):
+        """Drop in-memory entries (disk cache is kept)"""
+        with self._lock:
+            self._memory_cache.clear()
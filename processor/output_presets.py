@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Output Presets for ClipForge
+Output sizes applied as ffmpeg scale/crop/pad filters in the clip encode itself
+"""
+
+from typing import Dict, Any, Optional, Tuple
+
+
+class OutputPresets:
+    """Output size presets for re-encoded clips
+    
+    Each preset becomes an ffmpeg filter chain added to the encode that already
+    writes the clip, so frames are resized by ffmpeg's native scaler in the
+    same pass instead of going through Python one frame at a time.
+    """
+    
+    DEFAULT_PRESET = 'original'
+    
+    # Preset id -> display name, target size and how the source is fitted:
+    # 'crop' fills the frame and crops the overflow around the center,
+    # 'pad' fits the whole picture and letterboxes it, 'downscale' keeps the
+    # aspect ratio and only ever makes the video smaller
+    PRESETS: Dict[str, Dict[str, Any]] = {
+        'original': {'name': 'Original size'},
+        'vertical_1080': {'name': 'Vertical 1080x1920 (crop center)',
+                          'width': 1080, 'height': 1920, 'fit': 'crop'},
+        'vertical_720': {'name': 'Vertical 720x1280 (crop center)',
+                         'width': 720, 'height': 1280, 'fit': 'crop'},
+        'square_1080': {'name': 'Square 1080x1080 (pad)',
+                        'width': 1080, 'height': 1080, 'fit': 'pad'},
+        'downscale_720': {'name': '720p (downscale)', 'height': 720, 'fit': 'downscale'},
+    }
+    
+    @staticmethod
+    def get_filter(preset: Optional[str]) -> Optional[str]:
+        """Get the ffmpeg video filter chain of a preset (None keeps the source size)"""
+        preset = preset or OutputPresets.DEFAULT_PRESET
+        if preset not in OutputPresets.PRESETS:
+            raise ValueError(f"Unknown output preset: {preset}")
+        
+        spec = OutputPresets.PRESETS[preset]
+        fit = spec.get('fit')
+        if fit == 'crop':
+            width, height = spec['width'], spec['height']
+            return (f"scale={width}:{height}:force_original_aspect_ratio=increase,"
+                    f"crop={width}:{height},setsar=1")
+        if fit == 'pad':
+            width, height = spec['width'], spec['height']
+            return (f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                    f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1")
+        if fit == 'downscale':
+            # -2 keeps the width even, as yuv420p needs
+            return f"scale=-2:min({spec['height']}\\,ih),setsar=1"
+        return None
+    
+    @staticmethod
+    def get_output_size(preset: Optional[str], source_size: Tuple[int, int]) -> Tuple[int, int]:
+        """Get the (width, height) a preset produces for a source of the given size"""
+        spec = OutputPresets.PRESETS.get(preset or OutputPresets.DEFAULT_PRESET, {})
+        width, height = source_size
+        fit = spec.get('fit')
+        if fit in ('crop', 'pad'):
+            return spec['width'], spec['height']
+        if fit == 'downscale' and height > spec['height']:
+            return round(width * spec['height'] / height / 2) * 2, spec['height']
+        return width, height
+
+    @staticmethod
+    def get_name(preset: Optional[str]) -> str:
+        """Get the display name of a preset"""
+        spec = OutputPresets.PRESETS.get(preset or OutputPresets.DEFAULT_PRESET)
+        return spec['name'] if spec else str(preset)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scene Index for ClipForge
+Detects scene changes on a tiny grayscale proxy stream and caches them per source
+"""
+
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+from typing import List, Dict, Optional, Callable, Tuple
+from utils.file_utils import FileUtils
+from utils.ffmpeg_utils import FFmpegUtils
+from utils.fingerprint import Fingerprint
+from .analysis_proxy import AnalysisProxy
+
+
+class SceneIndex:
+    """Scene change index cached in memory and on disk
+    
+    Frames come from the shared analysis proxy (a 64x36 grayscale store at a
+    low fixed rate), or straight from an ffmpeg pipe when the proxy cache is
+    disabled. Every frame is scored against the previous one (mean pixel
+    difference plus histogram distance) with NumPy, a batch of frames at a
+    time. Only local score peaks are kept, as (time, score) pairs. Entries are
+    keyed by the content fingerprint, so moved sources reuse their index.
+    """
+    
+    ANALYSIS_FPS = AnalysisProxy.FPS
+    WIDTH = AnalysisProxy.WIDTH
+    HEIGHT = AnalysisProxy.HEIGHT
+    HISTOGRAM_BINS = 16
+    BATCH_FRAMES = 1024
+    # Peaks below this score are noise (motion, fades) and are not stored
+    MIN_PEAK_SCORE = 0.05
+    # Weakest change the planner will move a cut to
+    MIN_CUT_SCORE = 0.15
+    VERSION = 1
+    
+    # Shared by all instances so every job reuses analysed sources
+    _memory_cache: Dict[str, List[Tuple[float, float]]] = {}
+    _lock = threading.Lock()
+    
+    def __init__(self, use_disk_cache: bool = True, proxy: Optional[AnalysisProxy] = None):
+        """Initialize scene index"""
+        self.use_disk_cache = use_disk_cache
+        self.proxy = proxy
+        self.cache_dir = FileUtils.get_cache_directory("scenes") if use_disk_cache else None
+    
+    def _get_cache_key(self, source: str) -> str:
+        """Get the cache key of a source (fingerprint + analysis parameters)"""
+        return (f"{Fingerprint.get_fingerprint(source)}|v{self.VERSION}|{self.ANALYSIS_FPS}"
+                f"|{self.WIDTH}x{self.HEIGHT}")
+    
+    def _get_cache_file(self, key: str):
+        """Get the on-disk cache file for a cache key"""
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+    
+    def get_scenes(self, source: str,
+                   stop_check: Optional[Callable] = None) -> List[Tuple[float, float]]:
+        """Get scene changes (time in seconds, score 0-1) for a video file"""
+        key = self._get_cache_key(source)
+        
+        with self._lock:
+            if key in self._memory_cache:
+                return self._memory_cache[key]
+        
+        scenes = self._load_from_disk(key)
+        if scenes is None:
+            print(f"Analysing scene changes for: {source}")
+            scenes = self.analyze(source, stop_check)
+            if scenes is None:
+                return []
+            self._save_to_disk(key, scenes)
+        
+        with self._lock:
+            self._memory_cache[key] = scenes
+        return scenes
+    
+    @staticmethod
+    def score_frames(frames: np.ndarray, previous: Optional[np.ndarray]) -> np.ndarray:
+        """Score each frame of a (n, height, width) uint8 batch against the frame before it
+        
+        The score is the mean of the normalised absolute pixel difference and the
+        histogram distance (half the L1 distance of the normalised histograms).
+        The first frame of the video scores 0.
+        """
+        if previous is not None:
+            frames = np.concatenate([previous[np.newaxis], frames])
+        count = len(frames)
+        pixels = frames[0].size
+        flat = frames.reshape(count, -1)
+        
+        pixel_diff = np.abs(np.diff(flat.astype(np.int16), axis=0)).mean(axis=1) / 255.0
+        
+        bins = SceneIndex.HISTOGRAM_BINS
+        bin_index = (flat // (256 // bins)).astype(np.int64)
+        bin_index += np.arange(count, dtype=np.int64)[:, np.newaxis] * bins
+        histograms = np.bincount(bin_index.ravel(), minlength=count * bins).reshape(count, bins)
+        histogram_diff = np.abs(np.diff(histograms, axis=0)).sum(axis=1) / (2.0 * pixels)
+        
+        scores = (pixel_diff + histogram_diff) / 2.0
+        if previous is None:
+            scores = np.concatenate([[0.0], scores])
+        return scores
+    
+    @staticmethod
+    def find_peaks(scores: np.ndarray, fps: float,
+                   min_score: float) -> List[Tuple[float, float]]:
+        """Get (time, score) of every local score maximum at or above min_score"""
+        if len(scores) < 2:
+            return []
+        padded = np.concatenate([[-1.0], scores, [-1.0]])
+        is_peak = (padded[1:-1] >= padded[:-2]) & (padded[1:-1] > padded[2:]) & (scores >= min_score)
+        return [(round(float(i) / fps, 3), round(float(scores[i]), 4))
+                for i in np.flatnonzero(is_peak)]
+    
+    def analyze(self, source: str,
+                stop_check: Optional[Callable] = None) -> Optional[List[Tuple[float, float]]]:
+        """Score the low-resolution frames and find scene changes (None if stopped)"""
+        start_time = time.time()
+        if self.proxy and self.proxy.enabled:
+            frames = self.proxy.get_frames(source, stop_check)
+            scores = self._score_store(frames, stop_check) if frames is not None else None
+        else:
+            scores = self._score_pipe(source, stop_check)
+        if scores is None:
+            return None
+        
+        scenes = self.find_peaks(scores, self.ANALYSIS_FPS, self.MIN_PEAK_SCORE)
+        
+        elapsed = max(time.time() - start_time, 1e-6)
+        duration = len(scores) / self.ANALYSIS_FPS
+        print(f"✅ Scene analysis: {len(scenes)} candidates in {elapsed:.1f}s "
+              f"({duration / elapsed:.0f}x real time)")
+        return scenes
+    
+    def _score_store(self, frames: np.ndarray,
+                     stop_check: Optional[Callable] = None) -> Optional[np.ndarray]:
+        """Score a memory-mapped frame store batch by batch (None if stopped)"""
+        batches = []
+        for start in range(0, len(frames), self.BATCH_FRAMES):
+            if stop_check and stop_check():
+                return None
+            previous = frames[start - 1] if start else None
+            batches.append(self.score_frames(frames[start:start + self.BATCH_FRAMES], previous))
+        return np.concatenate(batches) if batches else np.zeros(0)
+    
+    def _score_pipe(self, source: str,
+                    stop_check: Optional[Callable] = None) -> Optional[np.ndarray]:
+        """Decode the frames through an ffmpeg pipe and score them (None if stopped)"""
+        frame_size = self.WIDTH * self.HEIGHT
+        process = FFmpegUtils.open_rawvideo_pipe(source, self.WIDTH, self.HEIGHT, self.ANALYSIS_FPS)
+        
+        batches = []
+        previous = None
+        try:
+            while True:
+                if stop_check and stop_check():
+                    process.kill()
+                    return None
+                data = process.stdout.read(frame_size * self.BATCH_FRAMES)
+                count = len(data) // frame_size
+                if count == 0:
+                    break
+                frames = np.frombuffer(data[:count * frame_size], dtype=np.uint8)
+                frames = frames.reshape(count, self.HEIGHT, self.WIDTH)
+                batches.append(self.score_frames(frames, previous))
+                previous = frames[-1]
+        finally:
+            process.stdout.close()
+            stderr = process.stderr.read().decode('utf-8', errors='replace')
+            process.stderr.close()
+            process.wait()
+        
+        # Scores of an ffmpeg run that died part way would be cached as a complete index
+        if process.returncode != 0:
+            raise RuntimeError(f"Could not analyse scenes: {stderr.strip()[-300:]}")
+        return np.concatenate(batches) if batches else np.zeros(0)
+    
+    def _load_from_disk(self, key: str) -> Optional[List[Tuple[float, float]]]:
+        """Load a cached index from disk"""
+        if not self.use_disk_cache:
+            return None
+        try:
+            with open(self._get_cache_file(key), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('key') == key:
+                return [tuple(scene) for scene in data['scenes']]
+        except (OSError, ValueError, KeyError):
+            pass
+        return None
+    
+    def _save_to_disk(self, key: str, scenes: List[Tuple[float, float]]):
+        """Save an index to disk"""
+        if not self.use_disk_cache:
+            return
+        try:
+            with open(self._get_cache_file(key), 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'scenes': scenes}, f)
+        except OSError as e:
+            print(f"⚠️ Could not save scene index: {e}")
+    
+    def clear_memory_cache(self):
+        """Drop in-memory entries (disk cache is kept)"""
+        with self._lock:
+            self._memory_cache.clear()
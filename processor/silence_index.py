@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Silence Index for ClipForge
+Finds pauses in the audio track from windowed RMS energy and caches them per source
+"""
+
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import List, Dict, Optional, Callable, Tuple, Iterable
+from utils.file_utils import FileUtils
+from utils.ffmpeg_utils import FFmpegUtils
+from utils.fingerprint import Fingerprint
+from .analysis_proxy import AnalysisProxy
+
+
+class SilenceIndex:
+    """Silence interval index cached in memory and on disk
+    
+    Mono 8 kHz PCM comes from the shared analysis proxy, or straight from an
+    ffmpeg pipe when the proxy cache is disabled, and is read in fixed-size
+    chunks. Each chunk's windowed RMS is computed with NumPy
+    over a strided window view, and silent runs are tracked across chunk
+    boundaries, so memory stays bounded however long the source is. Only the
+    resulting (start, end) intervals are kept. Entries are keyed by the content
+    fingerprint.
+    """
+    
+    SAMPLE_RATE = AnalysisProxy.SAMPLE_RATE
+    WINDOW_SECONDS = 0.02
+    HOP_SECONDS = 0.01
+    CHUNK_SECONDS = 10
+    # Windows quieter than this are silent
+    SILENCE_DB = -40.0
+    # Shorter gaps are pauses between syllables, not between words or sentences
+    MIN_SILENCE_SECONDS = 0.3
+    VERSION = 1
+    
+    # Shared by all instances so every job reuses analysed sources
+    _memory_cache: Dict[str, List[Tuple[float, float]]] = {}
+    _lock = threading.Lock()
+    
+    def __init__(self, use_disk_cache: bool = True, proxy: Optional[AnalysisProxy] = None):
+        """Initialize silence index"""
+        self.use_disk_cache = use_disk_cache
+        self.proxy = proxy
+        self.cache_dir = FileUtils.get_cache_directory("silence") if use_disk_cache else None
+    
+    def _get_cache_key(self, source: str) -> str:
+        """Get the cache key of a source (fingerprint + analysis parameters)"""
+        return (f"{Fingerprint.get_fingerprint(source)}|v{self.VERSION}|{self.SAMPLE_RATE}"
+                f"|{self.SILENCE_DB}|{self.MIN_SILENCE_SECONDS}")
+    
+    def _get_cache_file(self, key: str):
+        """Get the on-disk cache file for a cache key"""
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+    
+    def get_silences(self, source: str,
+                     stop_check: Optional[Callable] = None) -> List[Tuple[float, float]]:
+        """Get silent intervals (start, end in seconds) of a file's audio"""
+        key = self._get_cache_key(source)
+        
+        with self._lock:
+            if key in self._memory_cache:
+                return self._memory_cache[key]
+        
+        silences = self._load_from_disk(key)
+        if silences is None:
+            print(f"Analysing silences for: {source}")
+            silences = self.analyze(source, stop_check)
+            if silences is None:
+                return []
+            self._save_to_disk(key, silences)
+        
+        with self._lock:
+            self._memory_cache[key] = silences
+        return silences
+    
+    def analyze(self, source: str,
+                stop_check: Optional[Callable] = None) -> Optional[List[Tuple[float, float]]]:
+        """Read the audio in chunks and find silent intervals (None if stopped)"""
+        start_time = time.time()
+        if self.proxy and self.proxy.enabled:
+            audio = self.proxy.get_audio(source, stop_check)
+            if audio is None:
+                return None
+            chunk = self.SAMPLE_RATE * self.CHUNK_SECONDS
+            found = self._find_runs((audio[i:i + chunk] for i in range(0, len(audio), chunk)),
+                                    stop_check)
+        else:
+            found = self._find_runs_in_pipe(source, stop_check)
+        if found is None:
+            return None
+        runs, frame_offset = found
+        
+        silences = []
+        for first, last in runs:
+            start = first * self.HOP_SECONDS
+            end = (last - 1) * self.HOP_SECONDS + self.WINDOW_SECONDS
+            if end - start >= self.MIN_SILENCE_SECONDS:
+                silences.append((round(start, 3), round(end, 3)))
+        
+        elapsed = max(time.time() - start_time, 1e-6)
+        duration = frame_offset * self.HOP_SECONDS
+        print(f"✅ Silence analysis: {len(silences)} pauses in {elapsed:.1f}s "
+              f"({duration / elapsed:.0f}x real time)")
+        return silences
+    
+    def _find_runs(self, chunks: Iterable[np.ndarray], stop_check: Optional[Callable] = None
+                   ) -> Optional[Tuple[List[Tuple[int, int]], int]]:
+        """Find runs of silent windows in int16 sample chunks
+        
+        Returns ([(first window, end window)], window count), or None if stopped.
+        """
+        window = int(self.SAMPLE_RATE * self.WINDOW_SECONDS)
+        hop = int(self.SAMPLE_RATE * self.HOP_SECONDS)
+        threshold = 10 ** (self.SILENCE_DB / 20)
+        
+        leftover = np.zeros(0, dtype=np.float32)
+        frame_offset = 0
+        run_start = None
+        runs = []
+        for samples in chunks:
+            if stop_check and stop_check():
+                return None
+            buffer = np.concatenate([leftover, samples.astype(np.float32) / 32768.0])
+            if len(buffer) < window:
+                leftover = buffer
+                continue
+            
+            windows = sliding_window_view(buffer, window)[::hop]
+            rms = np.sqrt(np.mean(np.square(windows), axis=1))
+            leftover = buffer[len(windows) * hop:]
+            
+            silent = rms < threshold
+            previous = 1 if run_start is not None else 0
+            edges = np.diff(np.concatenate([[previous], silent.astype(np.int8)]))
+            for index in np.flatnonzero(edges):
+                if edges[index] > 0:
+                    run_start = frame_offset + int(index)
+                else:
+                    runs.append((run_start, frame_offset + int(index)))
+                    run_start = None
+            frame_offset += len(windows)
+        
+        if run_start is not None:
+            runs.append((run_start, frame_offset))
+        return runs, frame_offset
+    
+    def _find_runs_in_pipe(self, source: str, stop_check: Optional[Callable] = None
+                           ) -> Optional[Tuple[List[Tuple[int, int]], int]]:
+        """Decode the audio through an ffmpeg pipe and find silent runs (None if stopped)"""
+        chunk_bytes = self.SAMPLE_RATE * self.CHUNK_SECONDS * 2
+        
+        def read_chunks():
+            while True:
+                data = process.stdout.read(chunk_bytes)
+                if len(data) < 2:
+                    return
+                yield np.frombuffer(data[:len(data) // 2 * 2], dtype='<i2')
+        
+        process = FFmpegUtils.open_pcm_pipe(source, self.SAMPLE_RATE)
+        try:
+            found = self._find_runs(read_chunks(), stop_check)
+            if found is None:
+                process.kill()
+                return None
+        finally:
+            process.stdout.close()
+            stderr = process.stderr.read().decode('utf-8', errors='replace')
+            process.stderr.close()
+            process.wait()
+        
+        # Runs of an ffmpeg run that died part way would be cached as a complete index
+        if process.returncode != 0:
+            if 'matches no streams' in stderr and found[1] == 0:
+                # No audio track: nothing to snap to
+                return [], 0
+            raise RuntimeError(f"Could not analyse silences: {stderr.strip()[-300:]}")
+        return found
+    
+    def _load_from_disk(self, key: str) -> Optional[List[Tuple[float, float]]]:
+        """Load a cached index from disk"""
+        if not self.use_disk_cache:
+            return None
+        try:
+            with open(self._get_cache_file(key), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('key') == key:
+                return [tuple(silence) for silence in data['silences']]
+        except (OSError, ValueError, KeyError):
+            pass
+        return None
+    
+    def _save_to_disk(self, key: str, silences: List[Tuple[float, float]]):
+        """Save an index to disk"""
+        if not self.use_disk_cache:
+            return
+        try:
+            with open(self._get_cache_file(key), 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'silences': silences}, f)
+        except OSError as e:
+            print(f"⚠️ Could not save silence index: {e}")
+    
+    def clear_memory_cache(self):
+        """Drop in-memory entries (disk cache is kept)"""
+        with self._lock:
+            self._memory_cache.clear()
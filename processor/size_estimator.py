@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Size Estimator for ClipForge
+Predicts how many bytes a job will write from the source bitrate and past jobs
+"""
+
+import os
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+from utils.file_utils import FileUtils
+from .output_presets import OutputPresets
+
+
+class SizeEstimator:
+    """Bitrate model of the output size of a split job
+    
+    The estimate is source bytes per second x covered duration x a compression
+    ratio for the mode and output preset. Ratios start from a prior (1.0 for
+    stream copy, scaled by the preset's pixel count for re-encodes) and are
+    replaced by the measured output/source ratios of finished jobs, kept in
+    Documents/ClipForge/cache/size_model as a running average.
+    """
+    
+    MODEL_FILE = "size_model.json"
+    # Sources without a known bitrate (streams) are assumed to be 1080p-ish
+    DEFAULT_SOURCE_BITRATE = 8_000_000
+    # Encoded size grows slower than the pixel count
+    PIXEL_EXPONENT = 0.75
+    # Weight of the newest job in the running average
+    LEARNING_RATE = 0.3
+    # Estimates err on the large side, running out of space is worse than refusing early
+    SAFETY_MARGIN = 1.15
+    
+    _lock = threading.Lock()
+    
+    def __init__(self, model_file: Optional[Path] = None):
+        """Initialize size estimator"""
+        self.model_file = Path(model_file) if model_file else \
+            FileUtils.get_cache_directory("size_model") / self.MODEL_FILE
+        self._model = None
+    
+    @staticmethod
+    def get_key(mode: str, preset: Optional[str]) -> str:
+        """Get the model key of a mode and output preset"""
+        return f"{mode}|{preset or OutputPresets.DEFAULT_PRESET}"
+    
+    def _load_model(self) -> Dict[str, Dict[str, float]]:
+        """Load the measured ratios once (caller holds the lock)"""
+        if self._model is None:
+            try:
+                with open(self.model_file, 'r', encoding='utf-8') as f:
+                    self._model = json.load(f)
+            except (OSError, ValueError):
+                self._model = {}
+        return self._model
+    
+    def _save_model(self):
+        """Write the measured ratios atomically (caller holds the lock)"""
+        temp_file = self.model_file.with_suffix('.tmp')
+        try:
+            self.model_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._model or {}, f, indent=2)
+            os.replace(temp_file, self.model_file)
+        except OSError as e:
+            print(f"⚠️ Could not save size model: {e}")
+    
+    @staticmethod
+    def get_source_rate(video_info: Dict[str, Any]) -> float:
+        """Get the source's bytes per second (0 if unknown)"""
+        if video_info.get('bitrate'):
+            return video_info['bitrate'] / 8
+        duration = video_info.get('duration') or 0
+        if duration > 0 and video_info.get('file_size'):
+            return video_info['file_size'] / duration
+        return 0.0
+    
+    def get_prior_ratio(self, video_info: Dict[str, Any], mode: str,
+                        preset: Optional[str]) -> float:
+        """Get the output/source ratio assumed before any job was measured"""
+        if mode == 'copy':
+            return 1.0
+        source_size = tuple(video_info.get('size') or (0, 0))
+        if not all(source_size):
+            return 1.0
+        width, height = OutputPresets.get_output_size(preset, source_size)
+        pixel_factor = (width * height) / (source_size[0] * source_size[1])
+        return pixel_factor ** self.PIXEL_EXPONENT
+    
+    def get_ratio(self, video_info: Dict[str, Any], mode: str, preset: Optional[str]) -> float:
+        """Get the output/source ratio for a mode and preset (measured or prior)"""
+        with self._lock:
+            entry = self._load_model().get(self.get_key(mode, preset))
+        if entry and entry.get('ratio'):
+            return entry['ratio']
+        return self.get_prior_ratio(video_info, mode, preset)
+    
+    def estimate(self, video_info: Dict[str, Any], mode: str, preset: Optional[str],
+                 duration: Optional[float] = None) -> int:
+        """Estimate the bytes written for `duration` seconds of the source (default: all of it)"""
+        if duration is None:
+            duration = video_info.get('duration') or 0
+        if duration <= 0:
+            return 0
+        
+        source_rate = self.get_source_rate(video_info)
+        if source_rate:
+            output_rate = source_rate * self.get_ratio(video_info, mode, preset)
+        else:
+            with self._lock:
+                entry = self._load_model().get(self.get_key(mode, preset))
+            if entry and entry.get('bytes_per_second'):
+                output_rate = entry['bytes_per_second']
+            else:
+                output_rate = self.DEFAULT_SOURCE_BITRATE / 8 * \
+                    self.get_prior_ratio(video_info, mode, preset)
+        return int(output_rate * duration * self.SAFETY_MARGIN)
+    
+    def record(self, video_info: Dict[str, Any], mode: str, preset: Optional[str],
+               duration: float, output_bytes: int) -> Optional[float]:
+        """Learn from a finished job that wrote output_bytes for `duration` seconds
+        
+        Returns the measured output/source ratio (None if the source rate is unknown).
+        """
+        if duration <= 0 or output_bytes <= 0:
+            return None
+        
+        source_rate = self.get_source_rate(video_info)
+        measured = {'bytes_per_second': output_bytes / duration}
+        if source_rate:
+            measured['ratio'] = output_bytes / (source_rate * duration)
+        
+        with self._lock:
+            # Other jobs' estimators may have saved since this one loaded the model
+            self._model = None
+            model = self._load_model()
+            entry = model.setdefault(self.get_key(mode, preset), {'jobs': 0})
+            for name, value in measured.items():
+                previous = entry.get(name)
+                entry[name] = value if previous is None else \
+                    previous + (value - previous) * self.LEARNING_RATE
+            entry['jobs'] = entry.get('jobs', 0) + 1
+            self._save_model()
+        return measured.get('ratio')
+    
+    def clear(self):
+        """Forget every measured ratio"""
+        with self._lock:
+            self._model = {}
+            self._save_model()
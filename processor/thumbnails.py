@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Thumbnails for ClipForge
+Poster frames per clip taken from the encode's own decode, and a contact sheet per source
+"""
+
+import math
+from pathlib import Path
+from typing import List, Optional, Tuple
+from utils.ffmpeg_utils import FFmpegUtils
+from utils.file_utils import FileUtils
+
+
+class Thumbnails:
+    """Poster frames and contact sheets for split jobs
+    
+    The poster frame of a clip is its first frame. Splitters add it as an
+    extra image output to the ffmpeg run that already decodes the clip, so
+    the frame is not decoded twice; stream copy runs decode keyframes only
+    for it. The contact sheet is tiled from the small poster images.
+    """
+    
+    # Thumbnail setting -> display name
+    FORMATS = {
+        'off': 'Off',
+        'jpg': 'JPEG',
+        'webp': 'WebP'
+    }
+    DEFAULT_FORMAT = 'off'
+    FOLDER_NAME = "thumbnails"
+    WIDTH = 320
+    SHEET_COLUMNS = 5
+    QUALITY = 85
+    # Frames within this many seconds before a clip start still count as its first frame
+    TIME_TOLERANCE = 0.001
+    
+    @staticmethod
+    def get_format(settings: Optional[dict]) -> Optional[str]:
+        """Get the image format selected in processing settings (None when off)"""
+        fmt = (settings or {}).get('thumbnails') or Thumbnails.DEFAULT_FORMAT
+        if fmt not in Thumbnails.FORMATS:
+            raise ValueError(f"Unknown thumbnail format: {fmt}")
+        return None if fmt == 'off' else fmt
+    
+    @staticmethod
+    def get_thumbnail_path(clip_path: Path, fmt: str) -> Path:
+        """Get the thumbnail path of a clip (thumbnails/<clip name>.<fmt>)"""
+        clip_path = Path(clip_path)
+        return clip_path.parent / Thumbnails.FOLDER_NAME / f"{clip_path.stem}.{fmt}"
+    
+    @staticmethod
+    def get_contact_sheet_path(output_folder: Path, base_filename: str, fmt: str) -> Path:
+        """Get the contact sheet path of a source"""
+        return Path(output_folder) / f"{FileUtils.clean_filename(base_filename)}_contact_sheet.{fmt}"
+    
+    @staticmethod
+    def get_filter(video_filter: Optional[str] = None) -> str:
+        """Get the filter chain that turns a decoded frame into a thumbnail
+        
+        The output preset is applied first so posters show the clip's framing.
+        """
+        scale = f"scale={Thumbnails.WIDTH}:-2"
+        return f"{video_filter},{scale}" if video_filter else scale
+    
+    @staticmethod
+    def get_select_filter(times: List[float], video_filter: Optional[str] = None) -> str:
+        """Get a filter chain keeping the first frame at or after each of the given times"""
+        terms = []
+        for t in times:
+            t = max(0.0, t - Thumbnails.TIME_TOLERANCE)
+            terms.append(f"gte(t,{t:.6f})*(isnan(prev_selected_t)+lt(prev_selected_t,{t:.6f}))")
+        return f"select='{'+'.join(terms)}',{Thumbnails.get_filter(video_filter)}"
+    
+    @staticmethod
+    def get_image_args(output_path: Path) -> List[str]:
+        """Get ffmpeg encoder arguments for thumbnail images (format from the extension)"""
+        if Path(output_path).suffix == '.webp':
+            return ['-c:v', 'libwebp', '-quality', str(Thumbnails.QUALITY)]
+        return ['-c:v', 'mjpeg', '-q:v', '3']
+    
+    @staticmethod
+    def get_frame_output_args(output_path: Path, video_filter: Optional[str] = None) -> List[str]:
+        """Get ffmpeg output arguments writing the first decoded frame as a thumbnail"""
+        return ['-map', '0:v:0', '-frames:v', '1', '-vf', Thumbnails.get_filter(video_filter),
+                '-an'] + Thumbnails.get_image_args(output_path) + [str(output_path)]
+    
+    @staticmethod
+    def get_sequence_output_args(pattern: Path, filter_script: Optional[Path] = None,
+                                 stream: str = '0:v:0') -> List[str]:
+        """Get ffmpeg output arguments writing one numbered image per selected frame
+        
+        The select expression grows with the clip count, so it is read from a
+        filter script instead of the command line. Without one, stream must be
+        a filter graph output that already selects and scales the frames.
+        """
+        args = ['-map', stream]
+        if filter_script:
+            args += ['-filter_script:v', str(filter_script)]
+        return args + ['-fps_mode', 'vfr', '-an'] + Thumbnails.get_image_args(pattern) + \
+            ['-f', 'image2', str(pattern)]
+    
+    @staticmethod
+    def extract_frame(video_path: str, output_path: Path, time: float = 0.0,
+                      video_filter: Optional[str] = None) -> bool:
+        """Write the frame at `time` as a thumbnail with its own (short) decode"""
+        args = ['-ss', FFmpegUtils.format_time(time)] if time > 0 else []
+        args += ['-i', video_path] + Thumbnails.get_frame_output_args(output_path, video_filter)
+        returncode, _ = FFmpegUtils.run_ffmpeg(args)
+        return returncode == 0 and Path(output_path).exists()
+    
+    @staticmethod
+    def build_contact_sheet(thumbnails: List[Tuple[Path, str]], output_path: Path) -> Optional[str]:
+        """Tile (thumbnail path, label) pairs into one contact sheet image
+        
+        Labels (clip number and start time) are drawn on each tile. Returns the
+        sheet path, or None when there is nothing to tile.
+        """
+        from PIL import Image, ImageDraw
+        
+        tiles = []
+        for path, label in thumbnails:
+            try:
+                with Image.open(path) as image:
+                    tiles.append((image.convert('RGB'), label))
+            except OSError as e:
+                print(f"⚠️ Skipping thumbnail {path}: {e}")
+        if not tiles:
+            return None
+        
+        # Wider grids for long sources keep the sheet within image size limits
+        columns = max(min(Thumbnails.SHEET_COLUMNS, len(tiles)), math.ceil(math.sqrt(len(tiles))))
+        rows = math.ceil(len(tiles) / columns)
+        tile_width = max(tile.width for tile, _ in tiles)
+        tile_height = max(tile.height for tile, _ in tiles)
+        sheet = Image.new('RGB', (columns * tile_width, rows * tile_height), 'black')
+        draw = ImageDraw.Draw(sheet)
+        
+        for index, (tile, label) in enumerate(tiles):
+            x = (index % columns) * tile_width
+            y = (index // columns) * tile_height
+            sheet.paste(tile, (x, y))
+            left, top, right, bottom = draw.textbbox((x + 4, y + 4), label)
+            draw.rectangle((left - 2, top - 2, right + 2, bottom + 2), fill='black')
+            draw.text((x + 4, y + 4), label, fill='white')
+        
+        sheet.save(output_path, quality=Thumbnails.QUALITY)
+        print(f"✅ Contact sheet: {output_path} ({len(tiles)} clips, {columns}x{rows})")
+        return str(output_path)
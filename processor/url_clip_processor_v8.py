@@ -6,28 +6,89 @@ Real streaming without downloading full video - uses yt-dlp + moviepy streaming
 """
 
 import os
-import tempfile
+import shutil
 import time
 import gc
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Callable
-from .url_processor import URLProcessor
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from urllib.parse import urlparse
+from .url_processor import URLProcessor, InfoCache
+from .clip_planner import ClipPlanner
+from .clip_manifest import ClipManifest
+from .clip_cache import ClipCache
+from .output_presets import OutputPresets
+from .clip_backend import ClipBackend
+from .fragment_stream import FragmentStream
+from .format_selector import FormatSelector
+from .size_estimator import SizeEstimator
 from utils.file_utils import FileUtils
+from utils.scratch_manager import ScratchManager
+from utils.disk_guard import DiskGuard
 
 
 class URLClipProcessorV8:
     """URL clip processor that does real streaming without downloading full video"""
     
-    def __init__(self, progress_callback: Optional[Callable] = None):
-        """Initialize URL clip processor V8"""
-        self.url_processor = URLProcessor()
+    # Open connections per stream host, shared by all instances so concurrent
+    # jobs against one host respect its connection cap together
+    _host_condition = threading.Condition()
+    _host_connections = {}
+    # Media fetched (and kept in scratch) at once per session from fragmented formats
+    FRAGMENT_BATCH_SECONDS = 300
+    
+    def __init__(self, progress_callback: Optional[Callable] = None,
+                 settings: Optional[Dict[str, Any]] = None,
+                 status_callback: Optional[Callable] = None):
+        """Initialize URL clip processor V8
+        
+        status_callback receives (finished clips, total clips, bytes downloaded)
+        whenever a clip is finished.
+        """
+        self.settings = settings or {}
+        self.url_processor = URLProcessor(self.settings)
         self.progress_callback = progress_callback or (lambda x: None)
-        self.temp_dir = None
+        self.status_callback = status_callback or (lambda completed, total, bytes_read: None)
+        self.backend = ClipBackend.from_settings(self.settings)
+        self.scratch_job = None
+        self.manifest = None
+        self.clip_cache = ClipCache.from_settings(self.settings)
+        self.output_filter = None
+        self.disk_guard = DiskGuard.from_settings(self.settings)
+        self.size_estimator = SizeEstimator()
+        self.disk_reservation = None
+        self.format_selector = FormatSelector.from_settings(self.settings)
+        self.fragment_stream = None
+        # Separate audio track of the selected video-only format (None when it has its own)
+        self.audio_url = None
+        self.audio_fragment_stream = None
         self._stop_flag = False
     
+    def get_manifest_params(self, clip_duration: int) -> Dict[str, Any]:
+        """Get the parameters that must match for finished clips to be reused"""
+        return {
+            'processor': 'v8',
+            'clip_duration': clip_duration,
+            'video_codec': 'libx264',
+            'audio_codec': 'aac',
+            'preset': 'ultrafast',
+            'crf': 28,
+            'backend': self.backend.NAME,
+            'output_preset': self.settings.get('output_preset') or OutputPresets.DEFAULT_PRESET,
+            'max_height': self.format_selector.max_height,
+            'source_codec': self.format_selector.video_codec
+        }
+    
     def process_url_video(self, url: str, output_base_path: Path, 
-                         clip_duration: int) -> Dict[str, Any]:
-        """Process a video from URL using real streaming"""
+                         clip_duration: int, resume: bool = False) -> Dict[str, Any]:
+        """Process a video from URL using real streaming
+        
+        With resume, an earlier output folder for the same URL is reused and
+        only its missing or corrupt clips are extracted.
+        """
         try:
             # Validate URL first
             validation = self.url_processor.validate_url(url)
@@ -41,14 +102,13 @@ class URLClipProcessorV8:
             video_info = validation['video_info']
             platform = validation['platform']
             
-            # Create temporary directory for processing
-            self.temp_dir = tempfile.mkdtemp(prefix="clipforge_v8_")
-            temp_path = Path(self.temp_dir)
-            
             print(f"Processing {platform} video: {video_info['title']}")
             print(f"Duration: {self.url_processor.format_duration(video_info['duration'])}")
             print(f"Using V8 processor - REAL streaming without full download")
             
+            # Output size is applied by ffmpeg in the clip encode itself
+            self.output_filter = OutputPresets.get_filter(self.settings.get('output_preset'))
+            
             # Calculate clips
             clips = self._calculate_clips(video_info['duration'], clip_duration)
             total_clips = len(clips)
@@ -57,84 +117,215 @@ class URLClipProcessorV8:
             
             # Create output folder
             safe_title = FileUtils.get_safe_folder_name(video_info['title'])
-            output_folder = FileUtils.create_unique_folder_name(output_base_path, safe_title)
+            manifest_params = self.get_manifest_params(clip_duration)
+            # Jobs and cached clips are keyed by the video, not the link used for it
+            source_key = InfoCache.get_key(url)
+            output_folder = None
+            if resume:
+                output_folder = ClipManifest.find_resumable(output_base_path, safe_title,
+                                                            source_key, manifest_params)
+                if output_folder:
+                    print(f"Resuming previous job in: {output_folder}")
+            if output_folder is None:
+                output_folder = FileUtils.create_unique_folder_name(output_base_path, safe_title)
             FileUtils.ensure_directory_exists(output_folder)
             
-            output_files = []
-            successful_clips = 0
-            
-            # Get stream URL once for all clips
-            print("Step 1: Getting video stream URL...")
-            stream_url = self._get_stream_url(url)
-            if not stream_url:
+            # Refuse (or queue) the job when its clips would not fit on disk
+            output_preset = manifest_params['output_preset']
+            self.disk_reservation = self.disk_guard.admit_job(
+                output_folder,
+                self.size_estimator.estimate(video_info, 'v8', output_preset,
+                                             sum(c['duration'] for c in clips)),
+                stop_check=lambda: self._stop_flag
+            )
+            if self.disk_reservation is None:
                 return {
                     'success': False,
-                    'error': 'Could not get video stream URL',
+                    'error': 'Cancelled',
                     'url': url
                 }
+            clip_size_estimate = self.size_estimator.estimate(
+                video_info, 'v8', output_preset, min(clip_duration, video_info['duration'])
+            )
+            self.manifest = ClipManifest.open(output_folder, source_key, manifest_params)
             
-            print(f"✅ Stream URL obtained: {stream_url[:50]}...")
+            # Create scratch directory for processing (RAM-backed when it fits)
+            self.scratch_job = ScratchManager.from_settings(self.settings).create_job(
+                f"v8_{safe_title}", output_dir=output_base_path
+            )
             
-            # Extract segments using real streaming
-            print("Step 2: Extracting segments using real streaming...")
+            output_files = []
+            successful_clips = 0
+            extracted_duration = 0.0
+            extracted_bytes = 0
+            
+            # Clips recorded by an earlier run are kept as they are, clips in the
+            # clip cache are linked in; only the rest is extracted
+            cache_params = {k: v for k, v in manifest_params.items() if k != 'clip_duration'}
+            pending = []
+            resumed_clips = 0
+            cache_hits = 0
             for i, clip_info in enumerate(clips):
-                # Check if processing was stopped
-                if self._stop_flag:
-                    print("🛑 Processing stopped by user")
-                    break
-                    
-                try:
-                    # Update progress
-                    progress = int((i / total_clips) * 100)
-                    progress = max(0, min(100, progress))
-                    print(f"Progress: {progress}% ({i + 1}/{total_clips})")
-                    if self.progress_callback:
-                        self.progress_callback(progress)
-                    
-                    print(f"Processing clip {i + 1}/{total_clips}: {clip_info['start']:.1f}s - {clip_info['end']:.1f}s")
-                    
-                    # Check if clip end time exceeds video duration
-                    if clip_info['end'] > video_info['duration']:
-                        print(f"⚠️ Clip {i + 1} end time ({clip_info['end']:.1f}s) exceeds video duration ({video_info['duration']:.1f}s), skipping")
-                        continue
-                    
-                    # Generate output filename
-                    output_filename = FileUtils.generate_clip_filename(
-                        video_info['title'], i + 1, clip_duration
-                    )
-                    output_path = output_folder / output_filename
-                    
-                    # Extract segment using real streaming
-                    segment_path = self._extract_segment_streaming(
-                        stream_url, clip_info['start'], clip_info['duration'], temp_path, i
-                    )
+                entry = self.manifest.get_valid_clip(i, clip_info)
+                if entry:
+                    output_files.append(entry['path'])
+                    successful_clips += 1
+                    resumed_clips += 1
+                    continue
+                
+                output_path = output_folder / FileUtils.generate_clip_filename(
+                    video_info['title'], i + 1, clip_duration
+                )
+                cache_key = ClipCache.get_key(source_key, clip_info['start'], clip_info['end'], cache_params)
+                if self.clip_cache.fetch(cache_key, output_path):
+                    self.manifest.record_clip(i, str(output_path), clip_info['start'],
+                                              clip_info['end'], clip_info)
+                    output_files.append(str(output_path))
+                    successful_clips += 1
+                    cache_hits += 1
+                    continue
+                
+                pending.append(i)
+            if resumed_clips:
+                print(f"✅ Resuming: {resumed_clips} of {total_clips} clips already done")
+            if cache_hits:
+                print(f"✅ Clip cache: {cache_hits} of {total_clips} clips reused")
+            
+            # Get stream URL once for all clips (not needed when every clip is done)
+            stream_url = None
+            if pending:
+                print("Step 1: Getting video stream URL...")
+                self.fragment_stream = None
+                self.audio_url = None
+                self.audio_fragment_stream = None
+                stream_url = self._get_stream_url(url)
+                if not stream_url:
+                    return {
+                        'success': False,
+                        'error': 'Could not get video stream URL',
+                        'url': url
+                    }
+                
+                print(f"✅ Stream URL obtained: {stream_url[:50]}...")
+                if self.audio_url:
+                    print(f"✅ Separate audio stream: {self.audio_url[:50]}...")
+                # Clips are only cut from fragments when every track they need is fragmented
+                fragment_streams = self._get_fragment_streams()
+                if fragment_streams and not (
+                        self.fragment_stream and (not self.audio_url or self.audio_fragment_stream)
+                        and all(s.load() for s in fragment_streams)):
+                    print("⚠️ Streaming the fragmented format with ffmpeg instead")
+                    self.fragment_stream = None
+                    self.audio_fragment_stream = None
+            
+            # Extract clips in stream sessions: every stretch of consecutive clips
+            # still to do is split into one shard per worker, and each shard is cut
+            # from a single open of the stream (one per stretch with one worker)
+            # instead of reopening, probing and seeking per clip. Shards run
+            # concurrently within the host's connection cap and share the encode
+            # thread budget. Shards stopped by low disk space continue once there is room.
+            workers, threads, host_connections = self.get_concurrency_budget()
+            print(f"Step 2: Extracting clips in {workers} concurrent stream session(s) "
+                  f"({threads} ffmpeg threads each, up to {host_connections} per host)...")
+            self.backend.reset_stats()
+            extracted_clips = 0
+            total_duration = sum(clips[i]['duration'] for i in pending) or 1.0
+            stop_check = lambda: self._stop_flag or self.disk_reservation.is_low()
+            while pending and self.disk_reservation.wait_for_space(clip_size_estimate,
+                                                                   stop_check=lambda: self._stop_flag):
+                shards = [shard for run in ClipPlanner.contiguous_runs(pending)
+                          for shard in ClipPlanner.split_shards(run, workers)]
+                shard_of = {i: index for index, shard in enumerate(shards) for i in shard}
+                shard_progress = [0.0] * len(shards)
+                progress_lock = threading.Lock()
+                
+                def report_progress(shard_index: int, value: int, offset=extracted_duration):
+                    # Seconds done in this round on top of the clips finished before it
+                    with progress_lock:
+                        shard_duration = sum(clips[i]['duration'] for i in shards[shard_index])
+                        shard_progress[shard_index] = value / 100 * shard_duration
+                        progress = int((offset + sum(shard_progress)) / total_duration * 100)
+                    self.progress_callback(max(0, min(100, progress)))
+                
+                # Leaving this block shuts the executor down with wait=True, so no
+                # shard is still running when the job releases its disk reservation
+                # and scratch directory below
+                with ThreadPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+                    futures = {
+                        executor.submit(
+                            self._extract_shard, stream_url, shard, clips,
+                            video_info['title'], clip_duration, threads, host_connections,
+                            partial(report_progress, index), stop_check
+                        ): index
+                        for index, shard in enumerate(shards)
+                    }
                     
-                    if segment_path:
-                        # Move to final location
-                        if Path(segment_path).exists():
-                            Path(segment_path).rename(output_path)
+                    # Clips are moved to their final names in clip order: each one
+                    # once every earlier clip is in place or its shard gave up
+                    ready = {}
+                    finished_shards = set()
+                    order = [i for shard in shards for i in shard]
+                    next_clip = 0
+                    for future in as_completed(futures):
+                        finished_shards.add(futures[future])
+                        for i, clip in zip(shards[futures[future]], future.result()):
+                            ready[i] = clip
+                        
+                        while next_clip < len(order):
+                            i = order[next_clip]
+                            if i not in ready and shard_of[i] not in finished_shards:
+                                break
+                            next_clip += 1
+                            if i not in ready:
+                                continue
+                            
+                            clip = ready.pop(i)
+                            output_path = output_folder / clip['path'].name
+                            # Scratch may be on another filesystem (e.g. tmpfs), so move, don't rename
+                            shutil.move(str(clip['path']), str(output_path))
+                            clip_bytes = FileUtils.get_file_size(str(output_path))
+                            self.disk_reservation.consume(clip_bytes)
+                            extracted_duration += clips[i]['duration']
+                            extracted_bytes += clip_bytes
+                            extracted_clips += 1
+                            self.manifest.record_clip(i, str(output_path), clip['start'],
+                                                      clip['end'], clips[i])
+                            self.clip_cache.store(
+                                ClipCache.get_key(source_key, clips[i]['start'], clips[i]['end'], cache_params),
+                                output_path, clip['start'], clip['end']
+                            )
                             output_files.append(str(output_path))
                             successful_clips += 1
-                            print(f"✅ Clip {i + 1} created: {output_filename}")
-                        else:
-                            print(f"❌ Segment file not found: {segment_path}")
-                    else:
-                        print(f"❌ Failed to extract clip {i + 1}")
-                        
-                except Exception as e:
-                    print(f"❌ Error processing clip {i + 1}: {e}")
-                    import traceback
-                    traceback.print_exc()
+                            pending.remove(i)
+                            print(f"✅ Clip {i + 1} created: {output_path.name}")
+                            self._report_completed(successful_clips, total_clips)
+                
+                if self._stop_flag:
+                    print("🛑 Processing stopped by user")
+                    break
+                if not self.disk_reservation.low_space:
+                    break
             
-            # Cleanup
-            self._cleanup_temp_dir()
+            stream_stats = self._get_stream_stats(extracted_clips, extracted_bytes)
+            info_cache = InfoCache.get_stats()
+            print(f"📊 Video info cache: {info_cache['hits']} hit(s), {info_cache['misses']} miss(es)")
+            
+            # Teach the size estimator how large this platform's clips really are
+            if not self._stop_flag and extracted_bytes:
+                self.size_estimator.record(video_info, 'v8', output_preset,
+                                           extracted_duration, extracted_bytes)
             
             # Return results
             return {
                 'success': successful_clips > 0,
                 'total_clips': total_clips,
                 'successful_clips': successful_clips,
-                'output_files': output_files,
+                'resumed_clips': resumed_clips,
+                'cache_hits': cache_hits,
+                'cache_misses': total_clips - resumed_clips - cache_hits if self.clip_cache.enabled else 0,
+                'stream_stats': stream_stats,
+                'info_cache': info_cache,
+                'output_files': sorted(output_files),
                 'output_folder': str(output_folder),
                 'video_info': video_info,
                 'platform': platform,
@@ -145,18 +336,21 @@ class URLClipProcessorV8:
             print(f"Error processing URL video: {e}")
             import traceback
             traceback.print_exc()
-            self._cleanup_temp_dir()
             return {
                 'success': False,
                 'error': str(e),
                 'url': url
             }
+        finally:
+            # Only here, after every extraction thread has finished
+            self._cleanup_temp_dir()
     
     def _get_stream_url(self, url: str) -> Optional[str]:
-        """Get direct stream URL using yt-dlp with audio included"""
+        """Get the direct stream URL of the selected video format using yt-dlp
+        
+        A separate audio format chosen for it is kept in audio_url.
+        """
         try:
-            import yt_dlp
-            
             print("Getting video stream information...")
             
             # Detect platform and use specific options
@@ -173,57 +367,303 @@ class URLClipProcessorV8:
                 info_opts.update(self.url_processor.platform_opts[platform])
                 print(f"Using {platform}-specific options for stream extraction...")
             
-            with yt_dlp.YoutubeDL(info_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                
-                # Get the best video format with direct URL
-                formats = info.get('formats', [])
-                if not formats:
-                    print("❌ No video formats found")
-                    return None
-                
-                # Find the best format with audio included (prefer formats with audio)
-                best_format = None
-                for fmt in formats:
-                    if fmt.get('url') and not fmt.get('fragments'):
-                        # Check if format has audio (acodec not None and not 'none')
-                        has_audio = fmt.get('acodec') and fmt.get('acodec') != 'none'
-                        
-                        # Prefer formats with audio and higher resolution
-                        if has_audio:
-                            if not best_format or (fmt.get('height', 0) or 0) > (best_format.get('height', 0) or 0):
-                                best_format = fmt
-                
-                # If no format with audio found, fallback to any format
-                if not best_format:
-                    print("⚠️ No format with audio found, trying any format...")
-                    for fmt in formats:
-                        if fmt.get('url') and not fmt.get('fragments'):
-                            if not best_format or (fmt.get('height', 0) or 0) > (best_format.get('height', 0) or 0):
-                                best_format = fmt
-                
-                if not best_format:
-                    print("❌ No suitable video format found")
-                    return None
-                
-                stream_url = best_format.get('url')
-                format_info = best_format.get('format_note', 'Unknown')
-                file_size = best_format.get('filesize', 0)
-                has_audio = best_format.get('acodec') and best_format.get('acodec') != 'none'
-                
-                print(f"✅ Selected format: {format_info}")
-                print(f"✅ Has audio: {has_audio}")
-                print(f"✅ Video size: {file_size} bytes")
-                print(f"✅ Stream URL: {stream_url[:50]}...")
-                
-                return stream_url
-                
+            # Shared with validation and preview through the URL info cache
+            info = self.url_processor.extract_info(url, info_opts)
+            
+            # Get the best video format with direct URL
+            formats = info.get('formats', [])
+            if not formats:
+                print("❌ No video formats found")
+                return None
+            
+            # Best video within the configured height and codec preference; when
+            # it is video-only, the best audio-only format is muxed into the clips
+            best_format, audio_format = self.format_selector.select(formats, self._is_usable_format)
+            if not best_format:
+                print("❌ No suitable video format found")
+                return None
+            
+            # Fragmented (HLS/DASH) formats are cut from just the fragments each clip needs
+            self.fragment_stream = FragmentStream.from_format(best_format)
+            if audio_format:
+                self.audio_url = audio_format['url']
+                self.audio_fragment_stream = FragmentStream.from_format(audio_format)
+            stream_url = best_format.get('url')
+            format_info = best_format.get('format_note', 'Unknown')
+            file_size = best_format.get('filesize', 0)
+            
+            print(f"✅ Selected format: {format_info} ({best_format.get('height') or '?'}p, "
+                  f"{best_format.get('vcodec') or 'unknown codec'})")
+            if audio_format:
+                print(f"✅ Separate audio: {audio_format.get('format_note') or audio_format.get('acodec')} "
+                      f"({audio_format.get('abr') or '?'} kbps, copied)")
+            else:
+                print(f"✅ Has audio: {FormatSelector.has_audio(best_format)}")
+            print(f"✅ Fragmented: {self.fragment_stream is not None}")
+            print(f"✅ Video size: {file_size} bytes")
+            print(f"✅ Stream URL: {stream_url[:50]}...")
+            
+            return stream_url
+        
         except Exception as e:
             print(f"Error getting stream URL: {e}")
             return None
     
+    def _is_usable_format(self, fmt: Dict[str, Any]) -> bool:
+        """Check whether a yt-dlp format can be cut (direct files, or fragments we can fetch)"""
+        if not fmt.get('url'):
+            return False
+        return not FragmentStream.is_fragmented(fmt) or FragmentStream.from_format(fmt) is not None
+    
+    def get_concurrency_budget(self) -> Tuple[int, int, int]:
+        """Get (concurrent stream sessions, ffmpeg threads per session, connections per host)
+        
+        url_encode_threads is the thread budget shared by all sessions (0 = all
+        CPU cores). Backends that cannot run concurrently get one session.
+        """
+        connections = max(1, int(self.settings.get('url_host_connections', 4)))
+        budget = int(self.settings.get('url_encode_threads', 0)) or os.cpu_count() or 1
+        workers = int(self.settings.get('url_workers', 0))
+        if workers <= 0:
+            workers = connections
+        if not self.backend.CONCURRENT:
+            workers = 1
+        workers = max(1, min(workers, budget))
+        return workers, max(1, budget // workers), connections
+    
+    @classmethod
+    @contextmanager
+    def _host_slot(cls, urls: List[str], limit: int, stop_check: Callable):
+        """Hold a connection to the host of each url while inside (yields False if stopped)
+        
+        All connections are taken at once, so sessions that read several
+        streams never hold some while waiting for the rest.
+        """
+        needed = {}
+        for url in urls:
+            host = urlparse(url).hostname or ''
+            needed[host] = min(limit, needed.get(host, 0) + 1)
+        
+        def available():
+            return all(cls._host_connections.get(host, 0) + count <= limit
+                       for host, count in needed.items())
+        
+        with cls._host_condition:
+            while not available() and not stop_check():
+                cls._host_condition.wait(0.2)
+            # A stopped job starts no new session even when a connection is free
+            acquired = available() and not stop_check()
+            if acquired:
+                for host, count in needed.items():
+                    cls._host_connections[host] = cls._host_connections.get(host, 0) + count
+        if not acquired:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            with cls._host_condition:
+                for host, count in needed.items():
+                    cls._host_connections[host] -= count
+                    if not cls._host_connections[host]:
+                        del cls._host_connections[host]
+                cls._host_condition.notify_all()
+    
+    def _extract_shard(self, stream_url: str, shard: List[int], clips: List[Dict[str, float]],
+                       title: str, clip_duration: int, threads: int, host_connections: int,
+                       progress_callback: Callable, stop_check: Callable) -> List[Dict[str, Any]]:
+        """Cut a shard of consecutive clips into scratch
+        
+        Fragmented formats fetch only the fragments covering the shard.
+        Otherwise the shard is one stream session (reading the separate audio
+        stream alongside, if any), which waits for free connections to the
+        streams' hosts first. Returns the written clips in
+        order; falls back to one open per clip when the session fails.
+        """
+        if stop_check():
+            return []
+        work_dir = self.scratch_job.clip_dir(shard[0])
+        output_paths = [work_dir / FileUtils.generate_clip_filename(title, i + 1, clip_duration)
+                        for i in shard]
+        print(f"Processing clips {shard[0] + 1}-{shard[-1] + 1}: "
+              f"{clips[shard[0]]['start']:.1f}s - {clips[shard[-1]]['end']:.1f}s")
+        
+        written = []
+        if self.fragment_stream:
+            try:
+                self._extract_fragments(shard, clips, output_paths, work_dir, threads,
+                                        host_connections, progress_callback, stop_check, written)
+                return written
+            except Exception as e:
+                print(f"⚠️ Fragment fetch failed ({e}), streaming clips "
+                      f"{shard[len(written)] + 1}-{shard[-1] + 1} instead")
+        
+        rest = shard[len(written):]
+        streams = [stream_url] + ([self.audio_url] if self.audio_url else [])
+        with self._host_slot(streams, host_connections, stop_check) as connected:
+            if not connected:
+                return written
+            try:
+                written += self.backend.encode_run(
+                    stream_url, [clips[i] for i in rest], output_paths[len(written):],
+                    'libx264', 'ultrafast', 28,
+                    audio_codec='aac',
+                    audio_path=self.audio_url,
+                    threads=threads,
+                    video_filter=self.output_filter,
+                    work_dir=work_dir,
+                    progress_callback=progress_callback,
+                    stop_check=stop_check
+                )
+            except Exception as e:
+                print(f"⚠️ Stream session failed ({e}), extracting clips {rest[0] + 1}-{rest[-1] + 1} "
+                      f"one by one")
+                written += self._extract_run_per_clip(stream_url, rest, clips,
+                                                      output_paths[len(written):], threads)
+        return written
+    
+    def _extract_fragments(self, shard: List[int], clips: List[Dict[str, float]],
+                           output_paths: List[Path], work_dir: Path, threads: int,
+                           host_connections: int, progress_callback: Callable,
+                           stop_check: Callable, written: List[Dict[str, Any]]):
+        """Cut a shard of a fragmented format from local copies of its fragments
+        
+        Clips are taken in batches of about FRAGMENT_BATCH_SECONDS: only the
+        fragments covering a batch are downloaded (in parallel, within the
+        host's connection cap) and joined into one local file, which the
+        backend cuts exactly in one run. A separate audio track is fetched the
+        same way at the same time and copied into the clips. Written clips are
+        appended to written.
+        """
+        total_duration = sum(clips[i]['duration'] for i in shard) or 1.0
+        done = 0.0
+        local_path = work_dir / f"fragments.{self.fragment_stream.extension}"
+        audio_local_path = None
+        if self.audio_fragment_stream:
+            audio_local_path = work_dir / f"audio_fragments.{self.audio_fragment_stream.extension}"
+        
+        def fetch(stream: FragmentStream, start: float, end: float, path: Path) -> Optional[float]:
+            return stream.fetch(start, end, path, workers=host_connections, stop_check=stop_check,
+                                connection=lambda url: self._host_slot([url], host_connections, stop_check))
+        
+        for batch in self._batch_clips(shard, clips):
+            if stop_check():
+                return
+            start, end = clips[batch[0]]['start'], clips[batch[-1]]['end']
+            audio_start = 0.0
+            if audio_local_path:
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    video = executor.submit(fetch, self.fragment_stream, start, end, local_path)
+                    audio = executor.submit(fetch, self.audio_fragment_stream, start, end,
+                                            audio_local_path)
+                    local_start, audio_start = video.result(), audio.result()
+            else:
+                local_start = fetch(self.fragment_stream, start, end, local_path)
+            if local_start is None or audio_start is None:
+                return
+            # Each local file starts at its own first fragment
+            audio_offset = local_start - audio_start if audio_local_path else 0.0
+            
+            batch_duration = sum(clips[i]['duration'] for i in batch)
+            
+            def report_progress(value: int, offset=done, weight=batch_duration):
+                progress_callback(int((offset + value / 100 * weight) / total_duration * 100))
+            
+            # The local file starts at its first fragment, so clip times are shifted onto it and back
+            try:
+                batch_written = self.backend.encode_run(
+                    str(local_path),
+                    [dict(clips[i], start=clips[i]['start'] - local_start,
+                          end=clips[i]['end'] - local_start) for i in batch],
+                    output_paths[len(written):len(written) + len(batch)],
+                    'libx264', 'ultrafast', 28,
+                    audio_codec='aac',
+                    audio_path=str(audio_local_path) if audio_local_path else None,
+                    audio_offset=audio_offset,
+                    threads=threads,
+                    video_filter=self.output_filter,
+                    work_dir=work_dir,
+                    progress_callback=report_progress,
+                    stop_check=stop_check
+                )
+            finally:
+                local_path.unlink(missing_ok=True)
+                if audio_local_path:
+                    audio_local_path.unlink(missing_ok=True)
+            written += [dict(clip, start=clip['start'] + local_start, end=clip['end'] + local_start)
+                        for clip in batch_written]
+            if len(batch_written) < len(batch):
+                return
+            done += batch_duration
+    
+    def _batch_clips(self, shard: List[int], clips: List[Dict[str, float]]) -> List[List[int]]:
+        """Group a shard's clips into consecutive batches of about FRAGMENT_BATCH_SECONDS"""
+        batches = [[]]
+        batch_duration = 0.0
+        for i in shard:
+            if batches[-1] and batch_duration + clips[i]['duration'] > self.FRAGMENT_BATCH_SECONDS:
+                batches.append([])
+                batch_duration = 0.0
+            batches[-1].append(i)
+            batch_duration += clips[i]['duration']
+        return batches
+    
+    def _extract_run_per_clip(self, stream_url: str, run: List[int], clips: List[Dict[str, float]],
+                              output_paths: List[Path], threads: int) -> List[Dict[str, Any]]:
+        """Extract a run of clips opening the stream for each one (fallback of the session)"""
+        written = []
+        for i, output_path in zip(run, output_paths):
+            if self._stop_flag or self.disk_reservation.low_space:
+                break
+            segment_path = self._extract_segment_streaming(
+                stream_url, clips[i]['start'], clips[i]['duration'], self.scratch_job.clip_dir(i), i,
+                threads
+            )
+            if not segment_path or not Path(segment_path).exists():
+                print(f"❌ Failed to extract clip {i + 1}")
+                break
+            shutil.move(segment_path, str(output_path))
+            written.append({'path': output_path, 'start': clips[i]['start'], 'end': clips[i]['end']})
+        return written
+    
+    def _get_bytes_downloaded(self) -> int:
+        """Get the bytes fetched from the streams so far (fragments, or what the backend read)"""
+        if self.fragment_stream:
+            return sum(stream.stats['bytes'] for stream in self._get_fragment_streams())
+        return self.backend.stats['bytes_read']
+    
+    def _get_fragment_streams(self) -> List[FragmentStream]:
+        """Get the fragment streams clips are cut from (video, then separate audio)"""
+        return [stream for stream in (self.fragment_stream, self.audio_fragment_stream) if stream]
+    
+    def _report_completed(self, completed_clips: int, total_clips: int):
+        """Report finished clips and the bytes downloaded so far"""
+        bytes_read = self._get_bytes_downloaded()
+        print(f"Progress: {completed_clips}/{total_clips} clips, "
+              f"{FileUtils.format_file_size(bytes_read)} downloaded")
+        self.status_callback(completed_clips, total_clips, bytes_read)
+    
+    def _get_stream_stats(self, clips: int, output_bytes: int) -> Dict[str, Any]:
+        """Summarize how often the stream was opened and how much of it was fetched"""
+        stats = dict(self.backend.stats)
+        stats['clips'] = clips
+        stats['overhead_per_clip'] = stats['startup_seconds'] / clips if clips else 0.0
+        if self.fragment_stream:
+            # Sessions read local copies of the fragments; what was fetched is the fragments
+            stats['bytes_read'] = self._get_bytes_downloaded()
+            stats['fragments'] = sum(stream.stats['fragments'] for stream in self._get_fragment_streams())
+        if clips:
+            fetched = (f"{FileUtils.format_file_size(stats['bytes_read'])} fetched"
+                       if stats['bytes_read'] else "bytes fetched not reported by the backend")
+            if self.fragment_stream:
+                fetched += f" in {stats['fragments']} fragments"
+            print(f"📊 Stream session: {stats['opens']} open(s) for {clips} clips, {fetched}, "
+                  f"{stats['overhead_per_clip']:.2f}s open/seek overhead per clip, "
+                  f"{FileUtils.format_file_size(output_bytes)} written")
+        return stats
+    
     def _extract_segment_streaming(self, stream_url: str, start_time: float, duration: float, 
-                                  temp_dir: Path, clip_index: int) -> Optional[str]:
+                                  temp_dir: Path, clip_index: int, threads: int = 2) -> Optional[str]:
         """Extract a segment using real streaming without downloading full video"""
         try:
             # Create temporary file path for segment
@@ -235,93 +675,65 @@ class URLClipProcessorV8:
             # Calculate end time
             end_time = start_time + duration
             
-            # Use moviepy to extract segment directly from stream URL
-            print("Extracting segment with moviepy streaming...")
-            from moviepy.editor import VideoFileClip
-            
-            video = None
-            segment = None
+            print(f"Extracting segment with {self.backend.NAME} streaming...")
             
             try:
-                # Open the video stream directly - this is the key difference!
-                # MoviePy will stream the video without downloading it completely
-                video = VideoFileClip(stream_url, audio=True, target_resolution=None)
-                
-                # Extract the segment
-                segment = video.subclip(start_time, end_time)
-                
-                # Write the segment with optimized settings
-                segment.write_videofile(
-                    str(temp_segment_path),
-                    codec='libx264',
+                # Read the range straight from the stream URL - no full download.
+                # The output preset runs as an ffmpeg filter in the same encode
+                written = self.backend.encode(
+                    stream_url, start_time, end_time, temp_segment_path,
+                    'libx264', 'ultrafast', 28,
                     audio_codec='aac',
-                    ffmpeg_params=['-preset', 'ultrafast', '-crf', '28'],
-                    verbose=False,
-                    logger=None,
-                    threads=2,
-                    fps=video.fps
+                    audio_path=self.audio_url,
+                    threads=threads,
+                    video_filter=self.output_filter,
+                    work_dir=temp_dir,
+                    stop_check=lambda: self._stop_flag
                 )
                 
                 # Verify the segment
-                if temp_segment_path.exists():
+                if written and temp_segment_path.exists():
                     segment_size = temp_segment_path.stat().st_size
                     print(f"✅ Segment extracted: {segment_size} bytes")
                     
                     # Verify duration
-                    try:
-                        clip = VideoFileClip(str(temp_segment_path))
-                        actual_duration = clip.duration
-                        clip.close()
-                        
+                    segment_info = self.backend.probe(str(temp_segment_path))
+                    if segment_info:
+                        actual_duration = segment_info['duration']
                         print(f"✅ Segment duration: {actual_duration:.1f}s")
                         
                         if actual_duration > 0 and abs(actual_duration - duration) <= 5:
                             return str(temp_segment_path)
                         else:
                             print(f"⚠️ Duration mismatch: {actual_duration:.1f}s (expected: {duration:.1f}s)")
-                            
-                    except Exception as e:
-                        print(f"⚠️ Could not verify duration: {e}")
+                    else:
+                        print("⚠️ Could not verify duration")
                         if segment_size > 1000:
                             return str(temp_segment_path)
-                else:
+                elif written:
                     print("❌ Segment file not created")
                     
             except Exception as e:
-                print(f"⚠️ MoviePy streaming error: {e}")
+                print(f"⚠️ {self.backend.NAME} streaming error: {e}")
                 # Try alternative encoding settings
                 try:
-                    if segment:
-                        segment.write_videofile(
-                            str(temp_segment_path),
-                            codec='libx264',
-                            audio=False,  # Try without audio
-                            ffmpeg_params=['-preset', 'ultrafast'],
-                            verbose=False,
-                            logger=None
-                        )
+                    written = self.backend.encode(
+                        stream_url, start_time, end_time, temp_segment_path,
+                        'libx264', 'ultrafast', 28,  # Try without audio
+                        video_filter=self.output_filter,
+                        work_dir=temp_dir,
+                        stop_check=lambda: self._stop_flag
+                    )
+                    
+                    if written and temp_segment_path.exists():
+                        segment_size = temp_segment_path.stat().st_size
+                        print(f"✅ Segment extracted (no audio): {segment_size} bytes")
+                        return str(temp_segment_path)
                         
-                        if temp_segment_path.exists():
-                            segment_size = temp_segment_path.stat().st_size
-                            print(f"✅ Segment extracted (no audio): {segment_size} bytes")
-                            return str(temp_segment_path)
-                            
                 except Exception as e2:
                     print(f"⚠️ Alternative encoding failed: {e2}")
                     
             finally:
-                # Clean up resources properly
-                if segment:
-                    try:
-                        segment.close()
-                    except:
-                        pass
-                if video:
-                    try:
-                        video.close()
-                    except:
-                        pass
-                
                 # Force garbage collection
                 gc.collect()
             
@@ -334,32 +746,26 @@ class URLClipProcessorV8:
             traceback.print_exc()
             return None
     
-    def _calculate_clips(self, video_duration: float, clip_duration: int) -> List[Dict[str, float]]:
-        """Calculate clip segments for a video"""
-        clips = []
-        current_time = 0.0
+    def _calculate_clips(self, video_duration: float, clip_duration: int,
+                         keyframes: Optional[List[float]] = None,
+                         tolerance: float = 0.0) -> List[Dict[str, float]]:
+        """Calculate clip segments for a video
         
-        while current_time < video_duration:
-            end_time = min(current_time + clip_duration, video_duration)
-            duration = end_time - current_time
-            
-            clips.append({
-                'start': current_time,
-                'end': end_time,
-                'duration': duration
-            })
-            
-            current_time = end_time
-        
-        return clips
+        A keyframe index (see KeyframeIndex) snaps cuts to keyframes within tolerance.
+        """
+        return ClipPlanner.plan_clips(video_duration, clip_duration, keyframes, tolerance)
     
     def _cleanup_temp_dir(self):
-        """Clean up temporary directory"""
+        """Release the stream, the disk reservation and clean up the scratch directory"""
+        self.backend.close()
+        if self.disk_reservation:
+            self.disk_reservation.release()
+            self.disk_reservation = None
         try:
-            if self.temp_dir and os.path.exists(self.temp_dir):
-                import shutil
-                shutil.rmtree(self.temp_dir)
-                print(f"✅ Temporary directory cleaned: {self.temp_dir}")
+            if self.scratch_job:
+                self.scratch_job.cleanup()
+                print(f"✅ Temporary directory cleaned: {self.scratch_job.path}")
+                self.scratch_job = None
         except Exception as e:
             print(f"⚠️ Error cleaning temp directory: {e}")
     
@@ -422,7 +828,9 @@ class URLClipProcessorV8:
             return f"~{hours}h {minutes}m"
     
     def cancel_processing(self):
-        """Cancel current processing"""
+        """Cancel current processing
+        
+        Only flags the job: process_url_video cleans up once its shards have stopped.
+        """
         print("🛑 Processing cancelled by user")
-        self._stop_flag = True
-        self._cleanup_temp_dir() 
\ No newline at end of file
+        self._stop_flag = True 
\ No newline at end of file
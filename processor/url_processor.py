@@ -5,12 +5,175 @@ URL Video Processor for ClipForge
 Handles video processing from URLs (YouTube, Twitch, Kick)
 """
 
+import os
 import re
+import json
+import time
+import hashlib
+import threading
 import yt_dlp
 from typing import Dict, Optional, List, Any
 from pathlib import Path
-from urllib.parse import urlparse
+from urllib.parse import urlparse, parse_qs
 import requests
+from .clip_backend import ClipBackend
+from utils.file_utils import FileUtils
+
+
+class InfoCache:
+    """yt-dlp info dicts shared by URL validation, preview and stream URL lookup
+    
+    Every extract_info takes seconds and counts against the platform's rate
+    limits, yet one URL job needs the same info several times. Entries are
+    keyed by the canonical video (the youtu.be, watch and shorts links of a
+    video share one) and expire shortly before the signed stream URLs in
+    them do. In 'disk' mode they are also kept in
+    Documents/ClipForge/cache/url_info and outlive the process. Cached infos
+    are shared, so callers must not modify them. stats counts hits and misses.
+    """
+    
+    MODES = ('off', 'memory', 'disk')
+    DEFAULT_MODE = 'memory'
+    # Lifetime of infos whose stream URLs carry no expiry
+    DEFAULT_TTL = 1800
+    # Entries are dropped this long before their stream URLs expire, so a
+    # job started from one still has time to fetch its clips
+    EXPIRY_MARGIN = 1800
+    MAX_ENTRIES = 50
+    
+    YOUTUBE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{11}$')
+    # Signed googlevideo URLs: ...&expire=1700000000&... or .../expire/1700000000/...
+    EXPIRE_PATTERN = re.compile(r'[?&/]expire[=/](\d+)')
+    
+    _entries: Dict[str, Dict[str, Any]] = {}
+    _lock = threading.Lock()
+    stats = {'hits': 0, 'misses': 0}
+    
+    @staticmethod
+    def get_key(url: str) -> str:
+        """Get the canonical key of a video URL"""
+        parsed = urlparse(url.strip())
+        host = (parsed.hostname or '').lower()
+        for prefix in ('www.', 'm.'):
+            if host.startswith(prefix):
+                host = host[len(prefix):]
+        parts = [part for part in parsed.path.split('/') if part]
+        
+        video_id = ''
+        if host == 'youtu.be' and parts:
+            video_id = parts[0]
+        elif host.endswith('youtube.com') or host.endswith('youtube-nocookie.com'):
+            if parts[:1] == ['watch']:
+                video_id = parse_qs(parsed.query).get('v', [''])[0]
+            elif len(parts) >= 2 and parts[0] in ('shorts', 'embed', 'live', 'v'):
+                video_id = parts[1]
+        if InfoCache.YOUTUBE_ID_PATTERN.match(video_id):
+            return f"youtube:{video_id}"
+        
+        if host.endswith('twitch.tv'):
+            if len(parts) >= 2 and parts[-2] in ('videos', 'v') and parts[-1].isdigit():
+                return f"twitch:{parts[-1]}"
+            if host == 'clips.twitch.tv' and parts:
+                return f"twitch_clip:{parts[0]}"
+            if len(parts) >= 3 and parts[1] == 'clip':
+                return f"twitch_clip:{parts[2]}"
+        
+        key = f"url:{host}{parsed.path.rstrip('/')}"
+        return f"{key}?{parsed.query}" if parsed.query else key
+    
+    @staticmethod
+    def get_expiry(info: Dict[str, Any]) -> float:
+        """Get the time at which a cached info must be extracted again"""
+        urls = [info.get('url'), info.get('manifest_url')]
+        for fmt in info.get('formats') or []:
+            urls += [fmt.get('url'), fmt.get('manifest_url'), fmt.get('fragment_base_url')]
+        expiries = [int(match) for url in urls if url
+                    for match in InfoCache.EXPIRE_PATTERN.findall(url)]
+        if expiries:
+            return min(expiries) - InfoCache.EXPIRY_MARGIN
+        return time.time() + InfoCache.DEFAULT_TTL
+    
+    @staticmethod
+    def get(url: str, disk: bool = False) -> Optional[Dict[str, Any]]:
+        """Get the cached info of a URL's video (None if missing or expired)"""
+        key = InfoCache.get_key(url)
+        with InfoCache._lock:
+            entry = InfoCache._entries.get(key)
+            if entry is None and disk:
+                entry = InfoCache._load(key)
+                if entry:
+                    InfoCache._entries[key] = entry
+            if entry and entry['expires_at'] > time.time():
+                InfoCache.stats['hits'] += 1
+                return entry['info']
+            if entry:
+                del InfoCache._entries[key]
+                if disk:
+                    InfoCache._get_cache_file(key).unlink(missing_ok=True)
+            InfoCache.stats['misses'] += 1
+            return None
+    
+    @staticmethod
+    def put(url: str, info: Dict[str, Any], disk: bool = False):
+        """Cache the info of a URL's video (live streams and expired infos are not cached)"""
+        expires_at = InfoCache.get_expiry(info)
+        if info.get('is_live') or expires_at <= time.time():
+            return
+        key = InfoCache.get_key(url)
+        entry = {'key': key, 'info': info, 'expires_at': expires_at}
+        with InfoCache._lock:
+            InfoCache._entries[key] = entry
+            # Keep the entries that stay valid longest
+            if len(InfoCache._entries) > InfoCache.MAX_ENTRIES:
+                keys = sorted(InfoCache._entries, key=lambda k: InfoCache._entries[k]['expires_at'])
+                for old_key in keys[:len(InfoCache._entries) - InfoCache.MAX_ENTRIES]:
+                    del InfoCache._entries[old_key]
+            if disk:
+                InfoCache._save(entry)
+    
+    @staticmethod
+    def get_stats() -> Dict[str, int]:
+        """Get the hit and miss counts"""
+        with InfoCache._lock:
+            return dict(InfoCache.stats, entries=len(InfoCache._entries))
+    
+    @staticmethod
+    def clear():
+        """Clear the in-memory and on-disk cache and its counts"""
+        with InfoCache._lock:
+            InfoCache._entries.clear()
+            InfoCache.stats = {'hits': 0, 'misses': 0}
+            for cache_file in FileUtils.get_cache_directory("url_info").glob("*.json"):
+                cache_file.unlink(missing_ok=True)
+    
+    @staticmethod
+    def _get_cache_file(key: str) -> Path:
+        """Get the on-disk file of a cache key"""
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return FileUtils.get_cache_directory("url_info") / f"{name}.json"
+    
+    @staticmethod
+    def _load(key: str) -> Optional[Dict[str, Any]]:
+        """Read an entry from disk (caller holds the lock)"""
+        try:
+            with open(InfoCache._get_cache_file(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get('key') == key and 'info' in entry else None
+    
+    @staticmethod
+    def _save(entry: Dict[str, Any]):
+        """Write an entry to disk atomically (caller holds the lock)"""
+        cache_file = InfoCache._get_cache_file(entry['key'])
+        temp_file = cache_file.with_suffix('.tmp')
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                # sanitize_info makes yt-dlp's info JSON serializable (and adds keys to what it gets)
+                json.dump(dict(entry, info=yt_dlp.YoutubeDL.sanitize_info(dict(entry['info']))), f)
+            os.replace(temp_file, cache_file)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ Could not save video info cache: {e}")
 
 
 class URLProcessor:
@@ -35,8 +198,12 @@ class URLProcessor:
         }
     }
     
-    def __init__(self):
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
         """Initialize URL processor"""
+        self.backend = ClipBackend.from_settings(settings)
+        self.info_cache = (settings or {}).get('url_info_cache') or InfoCache.DEFAULT_MODE
+        if self.info_cache not in InfoCache.MODES:
+            raise ValueError(f"Unknown URL info cache mode: {self.info_cache}")
         self.ydl_opts = {
             'quiet': True,
             'no_warnings': True,
@@ -73,6 +240,24 @@ class URLProcessor:
             }
         }
     
+    def extract_info(self, url: str, opts: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Get yt-dlp's info for a URL, from the info cache while it is fresh
+        
+        The info is shared with other cache users and must not be modified.
+        """
+        disk = self.info_cache == 'disk'
+        if self.info_cache != 'off':
+            info = InfoCache.get(url, disk)
+            if info:
+                print(f"✅ Video info from cache ({InfoCache.get_key(url)})")
+                return info
+        
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+        if info and self.info_cache != 'off':
+            InfoCache.put(url, info, disk)
+        return info
+    
     def is_supported_url(self, url: str) -> Dict[str, Any]:
         """Check if URL is from a supported platform"""
         try:
@@ -153,25 +338,25 @@ class URLProcessor:
             print(f"Getting video info for {platform} with custom options...")
             
             try:
-                with yt_dlp.YoutubeDL(info_opts) as ydl:
-                    info = ydl.extract_info(url, download=False)
-                    
-                    if not info:
-                        return None
-                    
-                    return {
-                        'title': info.get('title', 'Unknown Title'),
-                        'duration': info.get('duration', 0),
-                        'uploader': info.get('uploader', 'Unknown'),
-                        'platform': info.get('extractor', 'unknown'),
-                        'url': url,
-                        'thumbnail': info.get('thumbnail'),
-                        'view_count': info.get('view_count', 0),
-                        'upload_date': info.get('upload_date'),
-                        'description': info.get('description', '')[:200] + '...' if info.get('description') else '',
-                        'formats': self._get_available_formats(info)
-                    }
-                    
+                # The info is cached for the preview, validation and stream URL lookup of the same video
+                info = self.extract_info(url, info_opts)
+                
+                if not info:
+                    return None
+                
+                return {
+                    'title': info.get('title', 'Unknown Title'),
+                    'duration': info.get('duration', 0),
+                    'uploader': info.get('uploader', 'Unknown'),
+                    'platform': info.get('extractor', 'unknown'),
+                    'url': url,
+                    'thumbnail': info.get('thumbnail'),
+                    'view_count': info.get('view_count', 0),
+                    'upload_date': info.get('upload_date'),
+                    'description': info.get('description', '')[:200] + '...' if info.get('description') else '',
+                    'formats': self._get_available_formats(info)
+                }
+            
             except Exception as e:
                 error_msg = str(e)
                 if '403' in error_msg and platform == 'kick':
@@ -239,45 +424,39 @@ class URLProcessor:
             # Check if full video was downloaded
             if temp_download_path.exists():
                 print(f"Full video available, extracting segment {start_time}s - {start_time + duration}s")
-                # Now extract the segment using moviepy
-                from moviepy.editor import VideoFileClip
                 
                 try:
-                    clip = VideoFileClip(str(temp_download_path))
+                    video_info = self.backend.probe(str(temp_download_path))
+                    if not video_info:
+                        print(f"Could not read downloaded video: {temp_download_path}")
+                        return None
                     
                     # Check if start_time is within video duration
-                    if start_time >= clip.duration:
-                        print(f"Start time {start_time}s is beyond video duration {clip.duration}s")
-                        clip.close()
+                    if start_time >= video_info['duration']:
+                        print(f"Start time {start_time}s is beyond video duration {video_info['duration']}s")
                         return None
                     
                     # Adjust end time if it exceeds video duration
-                    end_time = min(start_time + duration, clip.duration)
+                    end_time = min(start_time + duration, video_info['duration'])
                     actual_duration = end_time - start_time
                     
                     print(f"Extracting segment: {start_time}s - {end_time}s (actual duration: {actual_duration}s)")
                     
-                    segment = clip.subclip(start_time, end_time)
-                    segment.write_videofile(
-                        str(output_path),
-                        codec='libx264',
-                        audio_codec='aac',
-                        ffmpeg_params=['-preset', 'fast', '-crf', '23'],
-                        verbose=False,
-                        logger=None
-                    )
-                    segment.close()
-                    clip.close()
+                    self.backend.encode(str(temp_download_path), start_time, end_time, output_path,
+                                        'libx264', 'fast', 23, audio_codec='aac')
                     
                     print(f"Segment extracted successfully: {output_path}")
                     
                     return str(output_path)
                     
                 except Exception as e:
-                    print(f"Error extracting segment with moviepy: {e}")
+                    print(f"Error extracting segment with {self.backend.NAME}: {e}")
                     import traceback
                     traceback.print_exc()
                     return None
+                
+                finally:
+                    self.backend.close()
             else:
                 print(f"Failed to download full video to {temp_download_path}")
                 return None
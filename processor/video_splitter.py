@@ -6,85 +6,491 @@ Handles video processing and clipping operations
 """
 
 import os
+import csv
+import glob
+import shutil
+import bisect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import List, Optional, Callable, Dict, Any
-from moviepy.editor import VideoFileClip
+from typing import List, Optional, Callable, Dict, Any, Tuple
 from utils.file_utils import FileUtils
+from utils.ffmpeg_utils import FFmpegUtils
+from utils.media_probe import MediaProbe
+from utils.scratch_manager import ScratchManager
+from utils.disk_guard import DiskGuard, DiskReservation
+from utils.fingerprint import Fingerprint
+from .clip_planner import ClipPlanner
+from .keyframe_index import KeyframeIndex
+from .scene_index import SceneIndex
+from .silence_index import SilenceIndex
+from .analysis_proxy import AnalysisProxy
+from .clip_manifest import ClipManifest
+from .clip_cache import ClipCache
+from .output_presets import OutputPresets
+from .clip_backend import ClipBackend
+from .size_estimator import SizeEstimator
+from .thumbnails import Thumbnails
 
 
 class VideoSplitter:
     """Handles video splitting and processing operations"""
     
-    def __init__(self, progress_callback: Optional[Callable] = None):
+    # Available split modes (mode id -> display name)
+    SPLIT_MODES = {
+        'reencode': 'Re-encode (exact cuts)',
+        'single_pass': 'Single-pass re-encode (exact cuts, faster)',
+        'parallel': 'Parallel re-encode (exact cuts, all CPU cores)',
+        'smart': 'Smart cut (exact cuts, copies GOP interiors)',
+        'sliding': 'Sliding windows (overlapping clips, one decode)',
+        'copy': 'Stream copy (fast, keyframe cuts)'
+    }
+    DEFAULT_MODE = 'reencode'
+    
+    # Encoding settings shared by all re-encoding modes
+    VIDEO_CODEC = 'libx264'
+    AUDIO_CODEC = 'aac'
+    PRESET = 'fast'
+    CRF = 23
+    
+    # x264 profile names for the source profiles smart cut can match
+    H264_PROFILES = {
+        'Constrained Baseline': 'baseline',
+        'Baseline': 'baseline',
+        'Main': 'main',
+        'High': 'high'
+    }
+    
+    # Shared by all instances so concurrent jobs never pick the same output folder
+    _folder_lock = threading.Lock()
+    
+    def __init__(self, progress_callback: Optional[Callable] = None,
+                 settings: Optional[Dict[str, Any]] = None):
         """Initialize video splitter"""
         self.progress_callback = progress_callback or (lambda x: None)
+        self.settings = settings or {}
         self.current_video_path = None
-        self.current_clip = None
         self._stop_flag = False
+        self.clip_results = []
+        self.smart_cut_report = None
+        self.scratch_job = None
+        self.shared_audio = None
+        self.manifest = None
+        self.resumed_clips = 0
+        self.clip_cache = ClipCache.from_settings(self.settings)
+        self.analysis_proxy = AnalysisProxy.from_settings(self.settings)
+        self.cache_params = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.output_filter = None
+        self.backend = ClipBackend.from_settings(self.settings)
+        self.disk_guard = DiskGuard.from_settings(self.settings)
+        self.size_estimator = SizeEstimator()
+        self.disk_reservation = None
+        self.estimated_size = 0
+        self.clip_size_estimate = 0
+        self.thumbnail_format = None
+        self.contact_sheet = None
     
     def get_video_info(self, video_path: str) -> Optional[Dict[str, Any]]:
-        """Get detailed video information"""
+        """Get detailed video information (probed once, then served from cache)"""
+        return MediaProbe.get_video_info(video_path)
+    
+    def calculate_clips(self, video_duration: float, clip_duration: int,
+                        keyframes: Optional[List[float]] = None,
+                        tolerance: float = 0.0,
+                        scenes: Optional[List[Tuple[float, float]]] = None,
+                        scene_window: float = 0.0,
+                        silences: Optional[List[Tuple[float, float]]] = None,
+                        silence_window: float = 0.0) -> List[Dict[str, float]]:
+        """Calculate clip segments for a video
+        
+        When a scene index is given, cuts move to the strongest scene change
+        within scene_window seconds; when a silence index is given, they then
+        move into the nearest pause within silence_window seconds; when a
+        keyframe index is given, cuts finally snap to the nearest keyframe
+        within tolerance seconds.
+        """
+        return ClipPlanner.plan_clips(video_duration, clip_duration, keyframes, tolerance,
+                                      scenes, scene_window, SceneIndex.MIN_CUT_SCORE,
+                                      silences, silence_window)
+    
+    def _plan_clips(self, video_path: str, video_duration: float, clip_duration: int,
+                    mode: str) -> List[Dict[str, float]]:
+        """Plan clips for a split mode
+        
+        Cuts move to scene changes when scene_window is set and into pauses
+        when silence_window is set, and snap to keyframes for the non
+        re-encoding modes. Sliding windows stay on their fixed grid.
+        """
+        if mode == 'sliding':
+            step = self._get_window_step(clip_duration)
+            print(f"Planning {clip_duration}s windows every {step:g}s")
+            return ClipPlanner.sliding_windows(video_duration, clip_duration, step)
+        
+        scenes = None
+        scene_window = float(self.settings.get('scene_window', 0) or 0)
+        if scene_window > 0:
+            scenes = SceneIndex(proxy=self.analysis_proxy).get_scenes(
+                video_path, stop_check=lambda: self._stop_flag
+            )
+            print(f"Moving clip boundaries to scene changes (window {scene_window:.1f}s)")
+        
+        silences = None
+        silence_window = float(self.settings.get('silence_window', 0) or 0)
+        if silence_window > 0:
+            silences = SilenceIndex(proxy=self.analysis_proxy).get_silences(
+                video_path, stop_check=lambda: self._stop_flag
+            )
+            print(f"Moving clip boundaries into pauses (window {silence_window:.1f}s)")
+        
+        keyframes = None
+        tolerance = float(self.settings.get('keyframe_tolerance', 0) or 0)
+        if mode in ('copy', 'smart') and tolerance > 0:
+            keyframes = KeyframeIndex().get_keyframes(video_path)
+            print(f"Snapping clip boundaries to keyframes (tolerance {tolerance:.1f}s)")
+        
+        return self.calculate_clips(video_duration, clip_duration, keyframes, tolerance,
+                                    scenes, scene_window, silences, silence_window)
+    
+    def _get_window_step(self, clip_duration: int) -> float:
+        """Get the seconds between sliding window starts (window_step, default the clip duration)"""
+        step = float(self.settings.get('window_step', 0) or 0)
+        return step if step > 0 else float(clip_duration)
+    
+    def split_video(self, video_path: str, output_folder: Path, 
+                   clip_duration: int, base_filename: str,
+                   mode: str = DEFAULT_MODE) -> List[str]:
+        """Split video into clips of specified duration
+        
+        Clips already recorded in the folder's manifest for the same source and
+        parameters are kept; only missing or corrupt clips are encoded. Returns
+        every clip of the video in source order.
+        """
+        if mode not in self.SPLIT_MODES:
+            raise ValueError(f"Unknown split mode: {mode}")
+        
+        self.clip_results = []
+        self.smart_cut_report = None
+        self.resumed_clips = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.contact_sheet = None
+        self.output_filter = self._get_output_filter(mode)
+        self.thumbnail_format = Thumbnails.get_format(self.settings)
+        params = self.get_manifest_params(clip_duration, mode)
+        if self.settings.get('full_source_hash', False):
+            # Hashing the whole source runs alongside the encode; the manifest picks it up when done
+            Fingerprint.start_full_hash(video_path)
+        self.manifest = ClipManifest.open(output_folder, video_path, params)
+        # Cached clips are addressed by range, so the clip length itself is not part of the key
+        self.cache_params = {k: v for k, v in params.items() if k != 'clip_duration'}
+        
+        # Temp files of this job live in their own scratch directory, removed
+        # when the job ends, fails or is cancelled
+        self.scratch_job = ScratchManager.from_settings(self.settings).create_job(
+            base_filename,
+            output_dir=output_folder.parent,
+            estimated_bytes=self._estimate_scratch_bytes(video_path, clip_duration, mode)
+        )
         try:
-            print(f"Getting video info for: {video_path}")
-            clip = VideoFileClip(video_path)
-            
-            info = {
-                'duration': clip.duration,
-                'fps': clip.fps,
-                'size': (clip.w, clip.h),
-                'filename': Path(video_path).name,
-                'file_size': FileUtils.get_file_size(video_path)
-            }
+            # Refuse (or queue) the job up front when its clips would not fit on disk
+            self.disk_reservation = self._admit_job(video_path, output_folder, clip_duration, mode)
+            if self.disk_reservation is None:
+                print("Processing stopped by user")
+                return []
             
-            # Close the clip to free resources
-            clip.close()
+            # Sliding windows filter the audio along with the video instead
+            if mode not in ('copy', 'sliding'):
+                self._prepare_shared_audio(video_path)
+            if mode in ('copy', 'single_pass'):
+                self._split_with_segment_muxer(video_path, output_folder, clip_duration,
+                                               base_filename, mode)
+            elif mode == 'parallel':
+                self._split_parallel(video_path, output_folder, clip_duration, base_filename)
+            elif mode == 'smart':
+                self._split_smart_cut(video_path, output_folder, clip_duration, base_filename)
+            elif mode == 'sliding':
+                self._split_sliding(video_path, output_folder, clip_duration, base_filename)
+            else:
+                self._split_per_clip(video_path, output_folder, clip_duration, base_filename)
+        finally:
+            self.scratch_job.cleanup()
+            self.scratch_job = None
+            self.shared_audio = None
+            self.output_filter = None
+            if self.disk_reservation:
+                self.disk_reservation.release()
+            self.disk_reservation = None
+        
+        self.clip_results.sort(key=lambda clip: clip['start'])
+        if not self._stop_flag:
+            # Modes only report the clips they encode, which is none when every
+            # clip came from the manifest or the clip cache
+            self.progress_callback(100)
+            self._update_size_model(video_path, mode)
+            if self.thumbnail_format:
+                self._finish_thumbnails(output_folder, base_filename)
+        return [clip['path'] for clip in self.clip_results]
+    
+    def _get_thumbnail_path(self, output_path: Path) -> Optional[Path]:
+        """Get a clip's thumbnail path, creating its folder (None when thumbnails are off)"""
+        if not self.thumbnail_format:
+            return None
+        thumbnail_path = Thumbnails.get_thumbnail_path(output_path, self.thumbnail_format)
+        thumbnail_path.parent.mkdir(parents=True, exist_ok=True)
+        return thumbnail_path
+    
+    def _finish_thumbnails(self, output_folder: Path, base_filename: str):
+        """Attach each clip's poster frame and tile them into the source's contact sheet
+        
+        Posters normally come out of the clip's own encode; clips without one
+        (resumed or cached clips) get it from their first frame.
+        """
+        labelled = []
+        for number, clip in enumerate(self.clip_results, 1):
+            thumbnail_path = self._get_thumbnail_path(Path(clip['path']))
+            if not thumbnail_path.exists():
+                Thumbnails.extract_frame(clip['path'], thumbnail_path)
+            if thumbnail_path.exists():
+                clip['thumbnail'] = str(thumbnail_path)
+                labelled.append((thumbnail_path,
+                                 f"#{number:03d} {FileUtils.format_duration(clip['start'])}"))
+        
+        try:
+            self.contact_sheet = Thumbnails.build_contact_sheet(
+                labelled,
+                Thumbnails.get_contact_sheet_path(output_folder, base_filename, self.thumbnail_format)
+            )
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not write contact sheet: {e}")
+    
+    def _admit_job(self, video_path: str, output_folder: Path, clip_duration: int,
+                   mode: str) -> Optional[DiskReservation]:
+        """Estimate the job's output size and reserve it on the output drive
+        
+        Raises OSError when it does not fit and the disk space policy refuses;
+        returns None if stopped while queued.
+        """
+        self.estimated_size = 0
+        self.clip_size_estimate = 0
+        video_info = self.get_video_info(video_path)
+        if video_info and video_info.get('duration'):
+            preset = self._get_output_preset(mode)
+            if mode == 'sliding':
+                # Overlapping windows write every overlapped second once per window
+                clips = ClipPlanner.sliding_windows(video_info['duration'], clip_duration,
+                                                    self._get_window_step(clip_duration))
+            else:
+                clips = self.calculate_clips(video_info['duration'], clip_duration)
+            self.estimated_size = self.size_estimator.estimate(
+                video_info, mode, preset, sum(c['duration'] for c in clips)
+            )
+            self.clip_size_estimate = self.size_estimator.estimate(
+                video_info, mode, preset, min(clip_duration, video_info['duration'])
+            )
+        return self.disk_guard.admit_job(output_folder, self.estimated_size,
+                                         stop_check=lambda: self._stop_flag)
+    
+    def _update_size_model(self, video_path: str, mode: str):
+        """Teach the size estimator this job's real output/source ratio"""
+        video_info = self.get_video_info(video_path)
+        duration = sum(clip['duration'] for clip in self.clip_results)
+        output_bytes = sum(FileUtils.get_file_size(clip['path']) for clip in self.clip_results)
+        if not video_info or not output_bytes:
+            return
+        ratio = self.size_estimator.record(video_info, mode, self._get_output_preset(mode),
+                                           duration, output_bytes)
+        if ratio is not None:
+            print(f"Output/source size ratio ({mode}): {ratio:.2f}")
+    
+    def _should_interrupt(self) -> bool:
+        """stop_check for encodes: stop for the user, or before the disk fills up"""
+        return self._stop_flag or (self.disk_reservation is not None and
+                                   self.disk_reservation.is_low())
+    
+    def _is_low_on_space(self) -> bool:
+        """Check whether the last encode was interrupted by low disk space"""
+        return self.disk_reservation is not None and self.disk_reservation.low_space
+    
+    def _wait_for_space(self) -> bool:
+        """Pause until the next clip fits on disk (False if stopped)"""
+        if self.disk_reservation is None:
+            return not self._stop_flag
+        return self.disk_reservation.wait_for_space(self.clip_size_estimate,
+                                                    stop_check=lambda: self._stop_flag)
+    
+    def get_manifest_params(self, clip_duration: int, mode: str) -> Dict[str, Any]:
+        """Get the parameters a resumed job must share with the original run"""
+        return {
+            'mode': mode,
+            'clip_duration': clip_duration,
+            'video_codec': self.VIDEO_CODEC,
+            'audio_codec': self.AUDIO_CODEC,
+            'preset': self.PRESET,
+            'crf': self.CRF,
+            'keyframe_tolerance': self.settings.get('keyframe_tolerance', 0),
+            'scene_window': self.settings.get('scene_window', 0),
+            'silence_window': self.settings.get('silence_window', 0),
+            'window_step': self._get_window_step(clip_duration) if mode == 'sliding' else None,
+            'output_preset': self._get_output_preset(mode),
+            'backend': self.backend.NAME if mode == 'reencode' else None
+        }
+    
+    def _get_output_preset(self, mode: str) -> str:
+        """Get the output preset a mode applies (stream copy always keeps the source size)"""
+        preset = self.settings.get('output_preset') or OutputPresets.DEFAULT_PRESET
+        return OutputPresets.DEFAULT_PRESET if mode == 'copy' else preset
+    
+    def _get_output_filter(self, mode: str) -> Optional[str]:
+        """Get the ffmpeg filter chain of the output preset for a split mode"""
+        preset = self.settings.get('output_preset') or OutputPresets.DEFAULT_PRESET
+        output_filter = OutputPresets.get_filter(preset)
+        if output_filter and mode == 'copy':
+            print(f"⚠️ Output preset '{OutputPresets.get_name(preset)}' needs re-encoding, "
+                  f"stream copy keeps the source size")
+            return None
+        if output_filter:
+            print(f"Output preset: {OutputPresets.get_name(preset)}")
+        return output_filter
+    
+    def _reuse_clips(self, clips: List[Dict[str, float]], output_folder: Path,
+                     clip_duration: int, base_filename: str) -> List[int]:
+        """Keep clips the manifest or the clip cache already has
+        
+        Returns the indexes still to encode.
+        """
+        pending = []
+        for i, clip_info in enumerate(clips):
+            entry = self.manifest.get_valid_clip(i, clip_info)
+            if entry is not None:
+                self.resumed_clips += 1
+                self.clip_results.append({
+                    'path': entry['path'],
+                    'start': entry['start'],
+                    'end': entry['end'],
+                    'duration': entry['end'] - entry['start']
+                })
+                continue
             
-            return info
+            output_path = output_folder / FileUtils.generate_clip_filename(
+                base_filename, i + 1, clip_duration
+            )
+            cached = self.clip_cache.fetch(self._get_cache_key(clip_info), output_path)
+            if cached is not None:
+                self.cache_hits += 1
+                self._record_clip(i, output_path, cached['start'], cached['end'], clip_info,
+                                  cache=False)
+                continue
             
-        except Exception as e:
-            print(f"Error getting video info for {video_path}: {e}")
-            return None
+            pending.append(i)
+        
+        if self.resumed_clips:
+            print(f"✅ Resuming: {self.resumed_clips} of {len(clips)} clips already done")
+        if self.cache_hits:
+            print(f"✅ Clip cache: {self.cache_hits} of {len(clips)} clips reused")
+        self.cache_misses = len(pending) if self.clip_cache.enabled else 0
+        return pending
+    
+    def _get_cache_key(self, planned: Dict[str, float]) -> str:
+        """Get the clip cache key for a planned clip of the current video"""
+        return ClipCache.get_key(self.current_video_path, planned['start'], planned['end'],
+                                 self.cache_params)
+    
+    def _record_clip(self, index: int, output_path: Path, start: float, end: float,
+                     planned: Dict[str, float], cache: bool = True):
+        """Add a finished clip to the results, checkpoint it in the manifest and cache it"""
+        self.clip_results.append({
+            'path': str(output_path),
+            'start': start,
+            'end': end,
+            'duration': end - start
+        })
+        self.manifest.record_clip(index, str(output_path), start, end, planned)
+        if self.disk_reservation:
+            self.disk_reservation.consume(FileUtils.get_file_size(str(output_path)))
+        if cache:
+            self.clip_cache.store(self._get_cache_key(planned), output_path, start, end)
     
-    def calculate_clips(self, video_duration: float, clip_duration: int) -> List[Dict[str, float]]:
-        """Calculate clip segments for a video"""
-        clips = []
-        start_time = 0.0
+    def _prepare_shared_audio(self, video_path: str):
+        """Make the source audio available as AAC once for every clip
         
-        while start_time < video_duration:
-            end_time = min(start_time + clip_duration, video_duration)
-            clips.append({
-                'start': start_time,
-                'end': end_time,
-                'duration': end_time - start_time
-            })
-            start_time = end_time
+        AAC sources are used as they are; anything else is encoded once into the
+        job's scratch directory. Clips then stream copy their slice of it instead
+        of extracting and encoding audio per clip.
+        """
+        self.shared_audio = None
+        video_info = self.get_video_info(video_path)
+        if not video_info or not video_info.get('has_audio'):
+            return
         
-        return clips
+        if video_info.get('audio_codec') == self.AUDIO_CODEC:
+            print("Source audio is already AAC, clips will copy it")
+            self.shared_audio = video_path
+            return
+        
+        print(f"Encoding source audio ({video_info.get('audio_codec')}) once for all clips...")
+        audio_path = self.scratch_job.path / "audio.m4a"
+        returncode, stderr = FFmpegUtils.run_ffmpeg(
+            ['-i', video_path, '-map', '0:a:0', '-vn', '-c:a', self.AUDIO_CODEC, str(audio_path)],
+            stop_check=lambda: self._stop_flag
+        )
+        if self._stop_flag:
+            return
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg audio encode failed: {stderr.strip()[-300:]}")
+        self.shared_audio = str(audio_path)
     
-    def split_video(self, video_path: str, output_folder: Path, 
-                   clip_duration: int, base_filename: str) -> List[str]:
-        """Split video into clips of specified duration"""
+    def _shared_audio_input(self, start: float, duration: Optional[float] = None) -> List[str]:
+        """Get ffmpeg input arguments for a slice of the shared audio track"""
+        args = []
+        if start > 0:
+            args += ['-ss', FFmpegUtils.format_time(start)]
+        if duration is not None:
+            args += ['-t', FFmpegUtils.format_time(duration)]
+        return args + ['-i', self.shared_audio]
+    
+    def _estimate_scratch_bytes(self, video_path: str, clip_duration: int, mode: str) -> int:
+        """Estimate the scratch space one job needs at its peak
+        
+        Only one clip's temp files exist at a time, so this is roughly one clip's
+        share of the source (doubled for smart cut pieces plus the joined clip).
+        """
+        video_info = self.get_video_info(video_path)
+        if not video_info or not video_info.get('duration'):
+            return 0
+        share = min(1.0, clip_duration / video_info['duration'])
+        factor = 2 if mode == 'smart' else 1
+        return int(video_info['file_size'] * share * factor)
+    
+    def _split_per_clip(self, video_path: str, output_folder: Path,
+                        clip_duration: int, base_filename: str) -> List[str]:
+        """Split video re-encoding each clip separately with the configured backend"""
         output_files = []
+        self.current_video_path = video_path
         
         try:
-            # Load video with better error handling
-            print(f"Loading video: {video_path}")
-            video = VideoFileClip(video_path)
-            self.current_video_path = video_path
-            self.current_clip = video
+            video_info = self.backend.probe(video_path)
+            if not video_info:
+                raise ValueError("Could not read video file")
             
             # Calculate clips
-            clips = self.calculate_clips(video.duration, clip_duration)
+            clips = self._plan_clips(video_path, video_info['duration'], clip_duration, 'reencode')
             total_clips = len(clips)
+            pending = set(self._reuse_clips(clips, output_folder, clip_duration, base_filename))
             
-            print(f"Splitting video into {total_clips} clips...")
+            print(f"Splitting video into {total_clips} clips ({self.backend.LABEL})...")
             
             for i, clip_info in enumerate(clips):
                 # Check if processing was stopped
                 if self._stop_flag:
                     print("Processing stopped by user")
                     break
-                    
+                
+                if i not in pending:
+                    continue
+                
                 try:
                     # Generate output filename
                     output_filename = FileUtils.generate_clip_filename(
@@ -98,22 +504,26 @@ class VideoSplitter:
                     
                     print(f"Processing clip {i + 1}/{total_clips}: {start_time:.1f}s - {end_time:.1f}s")
                     
-                    # Extract subclip
-                    subclip = video.subclip(start_time, end_time)
-                    
-                    # Write clip with more robust settings
-                    subclip.write_videofile(
-                        str(output_path),
-                        codec='libx264',
-                        audio_codec='aac',
-                        temp_audiofile='temp-audio.m4a',
-                        remove_temp=True,
-                        verbose=False,
-                        logger=None,
-                        ffmpeg_params=['-preset', 'fast', '-crf', '23']
-                    )
+                    # Audio comes from the shared track; the output preset runs
+                    # as an ffmpeg filter in the same encode. An encode interrupted
+                    # by low disk space is redone once there is room again.
+                    written = False
+                    while not written and self._wait_for_space():
+                        written = self.backend.encode(
+                            video_path, start_time, end_time, output_path,
+                            self.VIDEO_CODEC, self.PRESET, self.CRF,
+                            audio_path=self.shared_audio,
+                            threads=self.settings.get('encode_threads') or 0,
+                            video_filter=self.output_filter,
+                            work_dir=self.scratch_job.clip_dir(i),
+                            thumbnail_path=self._get_thumbnail_path(output_path),
+                            stop_check=self._should_interrupt
+                        )
+                    if not written:
+                        continue
                     
                     output_files.append(str(output_path))
+                    self._record_clip(i, output_path, start_time, end_time, clip_info)
                     
                     # Update progress - ensure it's a valid integer
                     progress = int((i + 1) / total_clips * 100)
@@ -121,36 +531,666 @@ class VideoSplitter:
                     print(f"Progress: {progress}% ({i + 1}/{total_clips})")
                     if self.progress_callback:
                         self.progress_callback(progress)
-                    
-                    # Clean up subclip
-                    subclip.close()
-                    
+                
                 except Exception as clip_error:
                     print(f"Error processing clip {i + 1}: {clip_error}")
                     # Continue with next clip instead of failing completely
                     continue
             
             print(f"Successfully created {len(output_files)} clips")
-            
+        
         except Exception as e:
             print(f"Error splitting video: {e}")
             raise
         
         finally:
             # Clean up
-            if self.current_clip:
+            self.backend.close()
+            self.current_video_path = None
+        
+        return output_files
+    
+    def _split_with_segment_muxer(self, video_path: str, output_folder: Path,
+                                  clip_duration: int, base_filename: str,
+                                  mode: str) -> List[str]:
+        """Split video in a single ffmpeg run feeding the segment muxer
+        
+        'copy' remuxes only: cuts land on the first keyframe at or after each
+        requested boundary. 'single_pass' decodes the source once and re-encodes
+        with keyframes forced at every boundary, so cuts are frame-accurate.
+        """
+        self.current_video_path = video_path
+        
+        try:
+            video_info = self.get_video_info(video_path)
+            if not video_info:
+                raise ValueError("Could not read video file")
+            
+            clips = self._plan_clips(video_path, video_info['duration'], clip_duration, mode)
+            pending = self._reuse_clips(clips, output_folder, clip_duration, base_filename)
+            if mode == 'copy':
+                print(f"Stream copying video into {len(clips)} clips (no re-encode)...")
+            else:
+                print(f"Encoding video into {len(clips)} clips in a single pass...")
+            
+            # One ffmpeg run per stretch of consecutive clips still to do
+            # (a single run for a fresh job). Runs stopped by low disk space
+            # continue with their remaining clips once there is room again.
+            total_duration = sum(clips[i]['duration'] for i in pending) or 1.0
+            done_duration = 0.0
+            output_files = []
+            while pending and self._wait_for_space():
+                for run in ClipPlanner.contiguous_runs(pending):
+                    if self._should_interrupt():
+                        break
+                    
+                    run_clips = [clips[i] for i in run]
+                    run_duration = sum(c['duration'] for c in run_clips)
+                    
+                    def report_progress(value: int, offset=done_duration, weight=run_duration):
+                        progress = int((offset + value / 100 * weight) / total_duration * 100)
+                        self.progress_callback(max(0, min(100, progress)))
+                    
+                    segments = self._run_segment_job(
+                        video_path, output_folder, run_clips, mode,
+                        job_name=f"{FileUtils.clean_filename(base_filename)}_segment{run[0]:03d}",
+                        threads=self.settings.get('encode_threads', 0),
+                        progress_callback=report_progress
+                    )
+                    output_files += self._collect_segments(segments, run, clips, output_folder,
+                                                           clip_duration, base_filename)
+                    done_duration += sum(c['duration'] for c in run_clips[:len(segments)])
+                    pending = [i for i in pending if i not in run[:len(segments)]]
+                if not self._is_low_on_space():
+                    break
+            
+            print(f"Successfully created {len(output_files)} clips")
+            return output_files
+        
+        finally:
+            self.current_video_path = None
+    
+    def _split_parallel(self, video_path: str, output_folder: Path,
+                        clip_duration: int, base_filename: str) -> List[str]:
+        """Split video by encoding contiguous shards of clips in parallel
+        
+        Each worker drives its own ffmpeg process with a limited thread budget and
+        cuts its shard in one pass. Progress is aggregated across workers and
+        clips are renamed in source order once every shard has finished.
+        """
+        self.current_video_path = video_path
+        
+        try:
+            video_info = self.get_video_info(video_path)
+            if not video_info:
+                raise ValueError("Could not read video file")
+            
+            clips = self._plan_clips(video_path, video_info['duration'], clip_duration, 'parallel')
+            pending = self._reuse_clips(clips, output_folder, clip_duration, base_filename)
+            workers, threads = self.get_parallel_budget()
+            if not pending:
+                return []
+            
+            output_files = []
+            safe_base = FileUtils.clean_filename(base_filename)
+            # Shards stopped by low disk space are re-sharded and continued once there is room
+            while pending and self._wait_for_space():
+                # Shards never span a clip that is already done, so each stays one ffmpeg run
+                shards = [shard for run in ClipPlanner.contiguous_runs(pending)
+                          for shard in self._shard_clips(run, workers)]
+                
+                print(f"Encoding {len(pending)} clips with {min(workers, len(shards))} workers "
+                      f"({threads} ffmpeg threads each)...")
+                
+                total_duration = sum(clips[i]['duration'] for i in pending) or 1.0
+                weights = [sum(clips[i]['duration'] for i in shard) / total_duration for shard in shards]
+                shard_progress = [0] * len(shards)
+                progress_lock = threading.Lock()
+                
+                def report_progress(shard_index: int, value: int):
+                    with progress_lock:
+                        shard_progress[shard_index] = value
+                        progress = int(sum(p * w for p, w in zip(shard_progress, weights)))
+                    self.progress_callback(max(0, min(100, progress)))
+                
+                with ThreadPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+                    futures = [
+                        executor.submit(
+                            self._run_segment_job,
+                            video_path, output_folder, [clips[i] for i in shard], 'single_pass',
+                            job_name=f"{safe_base}_part{index:02d}",
+                            threads=threads,
+                            progress_callback=partial(report_progress, index)
+                        )
+                        for index, shard in enumerate(shards)
+                    ]
+                    # Collect in submission order so clips keep source order
+                    for shard, future in zip(shards, futures):
+                        segments = future.result()
+                        output_files += self._collect_segments(segments, shard, clips,
+                                                               output_folder, clip_duration,
+                                                               base_filename)
+                        pending = [i for i in pending if i not in shard[:len(segments)]]
+                if not self._is_low_on_space():
+                    break
+            
+            print(f"Successfully created {len(output_files)} clips")
+            return output_files
+        
+        finally:
+            self.current_video_path = None
+    
+    def _split_sliding(self, video_path: str, output_folder: Path,
+                       clip_duration: int, base_filename: str) -> List[str]:
+        """Split video into overlapping windows, decoding every source frame once
+        
+        Windows are grouped into lanes of windows that do not overlap, one lane
+        per level of overlap. A single ffmpeg run decodes the source and a
+        split filter hands every frame to all lanes; each lane keeps the frames
+        inside its windows and feeds its own encoder and segment muxer. Frames
+        are shared by reference, so memory grows with the overlap depth, not
+        with the number of windows.
+        """
+        self.current_video_path = video_path
+        
+        try:
+            video_info = self.get_video_info(video_path)
+            if not video_info:
+                raise ValueError("Could not read video file")
+            
+            clips = self._plan_clips(video_path, video_info['duration'], clip_duration, 'sliding')
+            pending = self._reuse_clips(clips, output_folder, clip_duration, base_filename)
+            
+            # Windows stopped by low disk space are continued once there is room
+            output_files = []
+            job_name = f"{FileUtils.clean_filename(base_filename)}_window"
+            while pending and self._wait_for_space():
+                lanes = ClipPlanner.assign_lanes(clips, pending)
+                print(f"Encoding {len(pending)} overlapping windows in {len(lanes)} lanes "
+                      f"from a single decode...")
+                
+                lane_segments = self._run_window_job(
+                    video_path, output_folder, clips, lanes, job_name,
+                    has_audio=video_info.get('has_audio', True),
+                    threads=self.settings.get('encode_threads', 0),
+                    progress_callback=self.progress_callback
+                )
+                for lane, segments in zip(lanes, lane_segments):
+                    output_files += self._collect_segments(segments, lane, clips, output_folder,
+                                                           clip_duration, base_filename)
+                    pending = [i for i in pending if i not in lane[:len(segments)]]
+                if not self._is_low_on_space():
+                    break
+            
+            print(f"Successfully created {len(output_files)} clips")
+            return output_files
+        
+        finally:
+            self.current_video_path = None
+    
+    def _split_smart_cut(self, video_path: str, output_folder: Path,
+                         clip_duration: int, base_filename: str) -> List[str]:
+        """Split video re-encoding only the partial GOPs at the head and tail of each clip
+        
+        The keyframe-aligned middle of every clip is stream copied, the pieces are
+        joined with the concat demuxer and muxed with the shared audio track.
+        Sources that are not H.264 cannot be joined with x264 pieces and are
+        re-encoded whole. Records how many seconds were re-encoded vs copied.
+        """
+        self.current_video_path = video_path
+        
+        try:
+            video_info = self.get_video_info(video_path)
+            if not video_info:
+                raise ValueError("Could not read video file")
+            
+            keyframes = []
+            if self.output_filter:
+                print("⚠️ Output preset resizes every frame, smart cut re-encodes whole clips")
+            elif video_info.get('video_codec') == 'h264' and video_info.get('profile') in self.H264_PROFILES:
+                keyframes = KeyframeIndex().get_keyframes(video_path)
+            else:
+                print(f"⚠️ Smart cut needs an 8-bit H.264 source (got {video_info.get('video_codec')}), "
+                      f"re-encoding whole clips")
+            
+            frame_time = 1.0 / (video_info.get('fps') or 25)
+            clips = self._plan_clips(video_path, video_info['duration'], clip_duration, 'smart')
+            total_clips = len(clips)
+            pending = set(self._reuse_clips(clips, output_folder, clip_duration, base_filename))
+            report = {'reencoded_seconds': 0.0, 'copied_seconds': 0.0}
+            output_files = []
+            
+            print(f"Smart cutting video into {total_clips} clips ({len(keyframes)} keyframes)...")
+            
+            for i, clip_info in enumerate(clips):
+                if self._stop_flag:
+                    print("Processing stopped by user")
+                    break
+                
+                if i not in pending:
+                    continue
+                
+                if not self._wait_for_space():
+                    break
+                
                 try:
-                    self.current_clip.close()
-                except:
-                    pass
-                self.current_clip = None
+                    output_path = output_folder / FileUtils.generate_clip_filename(
+                        base_filename, i + 1, clip_duration
+                    )
+                    pieces = self._plan_smart_cut(clip_info['start'], clip_info['end'],
+                                                  keyframes, frame_time)
+                    
+                    copied = sum(p['end'] - p['start'] for p in pieces if p['copy'])
+                    reencoded = clip_info['duration'] - copied
+                    print(f"Processing clip {i + 1}/{total_clips}: {clip_info['start']:.1f}s - "
+                          f"{clip_info['end']:.1f}s (copy {copied:.1f}s, re-encode {reencoded:.1f}s)")
+                    
+                    self._write_smart_cut_clip(video_path, clip_info, pieces, video_info,
+                                               frame_time, output_path,
+                                               self.scratch_job.clip_dir(i) / "work",
+                                               self._get_thumbnail_path(output_path))
+                    
+                    report['copied_seconds'] += copied
+                    report['reencoded_seconds'] += reencoded
+                    output_files.append(str(output_path))
+                    self._record_clip(i, output_path, clip_info['start'], clip_info['end'], clip_info)
+                
+                except Exception as clip_error:
+                    print(f"Error processing clip {i + 1}: {clip_error}")
+                    continue
+                
+                progress = int((i + 1) / total_clips * 100)
+                self.progress_callback(max(0, min(100, progress)))
+            
+            total = report['copied_seconds'] + report['reencoded_seconds']
+            report['copied_ratio'] = report['copied_seconds'] / total if total else 0.0
+            self.smart_cut_report = report
+            
+            print(f"Successfully created {len(output_files)} clips")
+            print(f"Smart cut: {report['copied_seconds']:.1f}s copied, "
+                  f"{report['reencoded_seconds']:.1f}s re-encoded")
+            return output_files
+        
+        finally:
             self.current_video_path = None
+    
+    def _plan_smart_cut(self, start: float, end: float, keyframes: List[float],
+                        frame_time: float) -> List[Dict[str, Any]]:
+        """Split a clip range into re-encoded head/tail pieces and a copied middle"""
+        tolerance = frame_time / 2
+        first = bisect.bisect_left(keyframes, start - tolerance)
+        last = bisect.bisect_right(keyframes, end + tolerance) - 1
+        
+        if first >= last:
+            return [{'start': start, 'end': end, 'copy': False}]
+        
+        head_end = keyframes[first]
+        tail_start = keyframes[last]
+        pieces = []
+        if head_end - start > tolerance:
+            pieces.append({'start': start, 'end': head_end, 'copy': False})
+        pieces.append({'start': max(start, head_end), 'end': min(end, tail_start), 'copy': True})
+        if end - tail_start > tolerance:
+            pieces.append({'start': tail_start, 'end': end, 'copy': False})
+        return pieces
+    
+    def _write_smart_cut_clip(self, video_path: str, clip_info: Dict[str, float],
+                              pieces: List[Dict[str, Any]], video_info: Dict[str, Any],
+                              frame_time: float, output_path: Path, work_prefix: Path,
+                              thumbnail_path: Optional[Path] = None):
+        """Cut/encode each piece, then join them with the concat demuxer and add the shared audio
+        
+        Every piece carries its own SPS/PPS in-band so players can switch between
+        the source parameters and the x264 ones at each piece boundary. The
+        poster frame is an extra output of the first piece's run.
+        """
+        piece_paths = []
+        for index, piece in enumerate(pieces):
+            piece_path = Path(f"{work_prefix}_piece{index}.mp4")
+            
+            if piece['copy']:
+                # Cut by frame count: a time limit on copied packets is applied in
+                # decode order and would pull in frames from the next GOP
+                frames = max(1, round((piece['end'] - piece['start']) / frame_time))
+                args = ['-ss', FFmpegUtils.format_seek_time(piece['start']), '-i', video_path,
+                        '-map', '0:v:0', '-frames:v', str(frames),
+                        '-c', 'copy', '-bsf:v', 'h264_mp4toannexb']
+            else:
+                args = ['-ss', FFmpegUtils.format_time(piece['start']), '-i', video_path,
+                        '-t', FFmpegUtils.format_time(piece['end'] - piece['start']),
+                        '-map', '0:v:0',
+                        '-c:v', self.VIDEO_CODEC,
+                        '-preset', self.PRESET,
+                        '-crf', str(self.CRF),
+                        '-pix_fmt', video_info.get('pix_fmt') or 'yuv420p',
+                        '-x264-params', 'repeat-headers=1']
+                if self.output_filter:
+                    args += ['-vf', self.output_filter]
+                if self.settings.get('encode_threads'):
+                    args += ['-threads', str(self.settings['encode_threads'])]
+                profile = self.H264_PROFILES.get(video_info.get('profile'))
+                if profile:
+                    args += ['-profile:v', profile]
+            
+            args += ['-an', str(piece_path)]
+            if thumbnail_path and index == 0:
+                if piece['copy']:
+                    # A copied piece starts on a keyframe, the only frame decoded for the poster
+                    args = ['-skip_frame', 'nokey'] + args
+                args += Thumbnails.get_frame_output_args(thumbnail_path, self.output_filter)
+            returncode, stderr = FFmpegUtils.run_ffmpeg(args, stop_check=lambda: self._stop_flag)
+            if returncode != 0:
+                raise RuntimeError(f"ffmpeg smart cut piece failed: {stderr.strip()[-300:]}")
+            piece_paths.append(piece_path)
+        
+        concat_list = Path(f"{work_prefix}_concat.txt")
+        with open(concat_list, 'w', encoding='utf-8') as f:
+            for piece_path in piece_paths:
+                escaped = str(piece_path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        
+        args = ['-f', 'concat', '-safe', '0', '-i', str(concat_list)]
+        maps = ['-map', '0:v:0']
+        if self.shared_audio:
+            args += self._shared_audio_input(clip_info['start'], clip_info['duration'])
+            maps += ['-map', '1:a:0']
+        args += maps + ['-c', 'copy', '-shortest', str(output_path)]
+        returncode, stderr = FFmpegUtils.run_ffmpeg(args, stop_check=lambda: self._stop_flag)
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg smart cut concat failed: {stderr.strip()[-300:]}")
+        
+        for path in piece_paths + [concat_list]:
+            path.unlink()
+    
+    def get_parallel_budget(self) -> Tuple[int, int]:
+        """Get (worker count, ffmpeg threads per worker) for parallel mode"""
+        threads = max(1, int(self.settings.get('ffmpeg_threads', 2)))
+        workers = int(self.settings.get('parallel_workers', 0))
+        if workers <= 0:
+            workers = max(1, (os.cpu_count() or 1) // threads)
+        return workers, threads
+    
+    def _shard_clips(self, clips: List[Any], workers: int) -> List[List[Any]]:
+        """Split a list of clips (or clip indexes) into contiguous shards, one per worker"""
+        return ClipPlanner.split_shards(clips, workers)
+    
+    def _run_segment_job(self, video_path: str, output_folder: Path,
+                         clips: List[Dict[str, float]], mode: str, job_name: str,
+                         threads: int = 0,
+                         progress_callback: Optional[Callable] = None) -> List[Dict[str, Any]]:
+        """Cut a contiguous run of clips with one ffmpeg process and the segment muxer
+        
+        Returns the written segments with their real start/end on the source
+        timeline, read back from the segment list.
+        """
+        job_start = clips[0]['start']
+        job_duration = clips[-1]['end'] - job_start
+        boundaries = [c['start'] - job_start for c in clips[1:]]
+        segment_times = ','.join(FFmpegUtils.format_cut_time(t) for t in boundaries)
+        
+        safe_name = job_name.replace('%', '%%')
+        segment_pattern = output_folder / f"{safe_name}_%03d.mp4"
+        segment_list = self.scratch_job.path / f"{job_name}.csv"
+        
+        args = []
+        if job_start > 0:
+            args += ['-ss', FFmpegUtils.format_time(job_start)]
+        args += ['-i', video_path]
+        
+        # Re-encoding modes copy the shared AAC track instead of encoding audio again
+        audio_map = '0:a:0?'
+        if mode != 'copy' and self.shared_audio and self.shared_audio != video_path:
+            args += self._shared_audio_input(job_start)
+            audio_map = '1:a:0'
+        args += ['-t', FFmpegUtils.format_time(job_duration),
+                 '-map', '0:v:0', '-map', audio_map]
         
+        if mode == 'copy':
+            args += ['-c', 'copy']
+        else:
+            args += [
+                '-c:v', self.VIDEO_CODEC,
+                '-preset', self.PRESET,
+                '-crf', str(self.CRF),
+                '-pix_fmt', 'yuv420p',
+                '-c:a', 'copy' if self.shared_audio else self.AUDIO_CODEC
+            ]
+            if self.output_filter:
+                args += ['-vf', self.output_filter]
+            if threads:
+                args += ['-threads', str(threads)]
+            if segment_times:
+                args += ['-force_key_frames', segment_times]
+        
+        # Keep source timestamps so the segment list reports source-timeline times
+        args += [
+            '-avoid_negative_ts', 'disabled',
+            '-f', 'segment',
+            '-segment_list', str(segment_list),
+            '-segment_list_type', 'csv',
+            '-reset_timestamps', '1'
+        ]
+        if segment_times:
+            args += ['-segment_times', segment_times]
+        else:
+            args += ['-segment_time', FFmpegUtils.format_time(job_duration + 1)]
+        args.append(str(segment_pattern))
+        
+        # Poster frames: a second output of the same run keeps the first frame of
+        # every clip. Stream copy does not decode otherwise, so there only
+        # keyframes are decoded, which is where its segments start anyway.
+        thumbnail_dir = self._prepare_thumbnail_dir(job_name)
+        if thumbnail_dir:
+            filter_script = thumbnail_dir / "select.txt"
+            filter_script.write_text(Thumbnails.get_select_filter(
+                [c['start'] - job_start for c in clips],
+                None if mode == 'copy' else self.output_filter
+            ), encoding='utf-8')
+            if mode == 'copy':
+                args = ['-skip_frame', 'nokey'] + args
+            args += ['-t', FFmpegUtils.format_time(job_duration)]
+            args += Thumbnails.get_sequence_output_args(
+                thumbnail_dir / f"thumb_%05d.{self.thumbnail_format}", filter_script
+            )
+        
+        returncode, stderr = FFmpegUtils.run_ffmpeg(
+            args,
+            duration=job_duration,
+            progress_callback=progress_callback,
+            stop_check=self._should_interrupt
+        )
+        
+        if self._stop_flag:
+            print("Processing stopped by user")
+        elif returncode != 0 and self._is_low_on_space():
+            print("⏸️ Disk space is running low, stopped encoding before the disk fills")
+        elif returncode != 0:
+            raise RuntimeError(f"ffmpeg {mode} split failed: {stderr.strip()[-500:]}")
+        
+        segments = [
+            {'path': path, 'start': job_start + start, 'end': job_start + end}
+            for path, start, end in self._read_segment_list(segment_list, output_folder, job_name)
+        ]
+        self._attach_thumbnails(segments, thumbnail_dir)
+        return segments
+    
+    def _run_window_job(self, video_path: str, output_folder: Path,
+                        clips: List[Dict[str, float]], lanes: List[List[int]], job_name: str,
+                        has_audio: bool = True, threads: int = 0,
+                        progress_callback: Optional[Callable] = None) -> List[List[Dict[str, Any]]]:
+        """Encode lanes of windows with one ffmpeg run sharing a single decode
+        
+        Each lane plays its windows back to back on its own timeline, so its
+        segment muxer cuts at the running window offsets and audio has no gaps.
+        Returns the written segments of every lane, mapped back to the source
+        timeline.
+        """
+        count = len(lanes)
+        video_chain = f"{self.output_filter}," if self.output_filter else ""
+        graph = [f"[0:v:0]{video_chain}split={count}" + ''.join(f"[v{n}]" for n in range(count))]
+        if has_audio:
+            graph.append(f"[0:a:0]asplit={count}" + ''.join(f"[a{n}]" for n in range(count)))
+        
+        args = ['-i', video_path]
+        lane_jobs = []
+        for n, lane in enumerate(lanes):
+            windows = [clips[i] for i in lane]
+            offsets = [sum(w['duration'] for w in windows[:k]) for k in range(len(windows))]
+            
+            # Keep the frames inside the lane's windows, then close the gaps between them
+            inside = '+'.join(f"gte(t,{w['start']:.6f})*lt(t,{w['end']:.6f})" for w in windows)
+            shifts = [w['start'] - offset for w, offset in zip(windows, offsets)]
+            shift = f"{shifts[0]:.6f}" + ''.join(
+                f"+gte(T,{w['start']:.6f})*{shifts[k] - shifts[k - 1]:.6f}"
+                for k, w in enumerate(windows) if k > 0
+            )
+            
+            thumbnail_dir = self._prepare_thumbnail_dir(f"{job_name}_lane{n}")
+            lane_video = f"[v{n}]select='{inside}',setpts='PTS-({shift})/TB'"
+            if thumbnail_dir:
+                graph.append(f"{lane_video},split=2[vo{n}][vt{n}]")
+                graph.append(f"[vt{n}]{Thumbnails.get_select_filter(offsets)}[to{n}]")
+            else:
+                graph.append(f"{lane_video}[vo{n}]")
+            if has_audio:
+                graph.append(f"[a{n}]aselect='{inside}',asetpts='PTS-({shift})/TB'[ao{n}]")
+            
+            lane_name = f"{job_name}_lane{n}"
+            segment_list = self.scratch_job.path / f"{lane_name}.csv"
+            segment_times = ','.join(FFmpegUtils.format_cut_time(t) for t in offsets[1:])
+            args += ['-map', f"[vo{n}]"]
+            if has_audio:
+                args += ['-map', f"[ao{n}]", '-c:a', self.AUDIO_CODEC]
+            args += [
+                '-fps_mode', 'passthrough',
+                '-c:v', self.VIDEO_CODEC,
+                '-preset', self.PRESET,
+                '-crf', str(self.CRF),
+                '-pix_fmt', 'yuv420p'
+            ]
+            if threads:
+                args += ['-threads', str(threads)]
+            if segment_times:
+                args += ['-force_key_frames', segment_times]
+            args += [
+                '-avoid_negative_ts', 'disabled',
+                '-f', 'segment',
+                '-segment_list', str(segment_list),
+                '-segment_list_type', 'csv',
+                '-reset_timestamps', '1'
+            ]
+            if segment_times:
+                args += ['-segment_times', segment_times]
+            else:
+                args += ['-segment_time', FFmpegUtils.format_time(offsets[-1] + windows[-1]['duration'] + 1)]
+            args.append(str(output_folder / f"{lane_name.replace('%', '%%')}_%03d.mp4"))
+            if thumbnail_dir:
+                args += Thumbnails.get_sequence_output_args(
+                    thumbnail_dir / f"thumb_%05d.{self.thumbnail_format}", stream=f"[to{n}]"
+                )
+            lane_jobs.append((lane_name, windows, offsets, segment_list, thumbnail_dir))
+        
+        # The graph grows with the window count, so it is read from a script
+        graph_script = self.scratch_job.path / f"{job_name}_graph.txt"
+        graph_script.write_text(';\n'.join(graph), encoding='utf-8')
+        args[2:2] = ['-filter_complex_script', str(graph_script)]
+        
+        # ffmpeg reports the time of its furthest output, the longest lane
+        returncode, stderr = FFmpegUtils.run_ffmpeg(
+            args,
+            duration=max(sum(clips[i]['duration'] for i in lane) for lane in lanes),
+            progress_callback=progress_callback,
+            stop_check=self._should_interrupt
+        )
+        
+        if self._stop_flag:
+            print("Processing stopped by user")
+        elif returncode != 0 and self._is_low_on_space():
+            print("⏸️ Disk space is running low, stopped encoding before the disk fills")
+        elif returncode != 0:
+            raise RuntimeError(f"ffmpeg sliding window split failed: {stderr.strip()[-500:]}")
+        
+        lane_segments = []
+        for lane_name, windows, offsets, segment_list, thumbnail_dir in lane_jobs:
+            segments = []
+            rows = self._read_segment_list(segment_list, output_folder, lane_name)
+            for window, offset, (path, start, end) in zip(windows, offsets, rows):
+                segments.append({
+                    'path': path,
+                    'start': window['start'] + start - offset,
+                    'end': min(window['end'], window['start'] + end - offset)
+                })
+            self._attach_thumbnails(segments, thumbnail_dir)
+            lane_segments.append(segments)
+        return lane_segments
+    
+    def _read_segment_list(self, segment_list: Path, output_folder: Path,
+                           job_name: str) -> List[Tuple[Path, float, float]]:
+        """Read (path, start, end) of the segments a run wrote, times on the run's own timeline
+        
+        A cancelled run leaves its unfinished last segment behind, which is not
+        in the list and is removed.
+        """
+        segments = []
+        if segment_list.exists():
+            with open(segment_list, 'r', encoding='utf-8', newline='') as f:
+                rows = [row for row in csv.reader(f) if len(row) >= 3]
+            segment_list.unlink()
+            
+            for segment_name, start, end in (row[:3] for row in rows):
+                segment_path = output_folder / segment_name
+                if segment_path.exists():
+                    segments.append((segment_path, float(start), float(end)))
+        
+        listed = {segment[0] for segment in segments}
+        for leftover in output_folder.glob(f"{glob.escape(job_name)}_*.mp4"):
+            if leftover not in listed:
+                leftover.unlink(missing_ok=True)
+        return segments
+    
+    def _prepare_thumbnail_dir(self, job_name: str) -> Optional[Path]:
+        """Get an empty scratch folder for a run's poster frames (None when thumbnails are off)"""
+        if not self.thumbnail_format:
+            return None
+        thumbnail_dir = self.scratch_job.path / f"{job_name}_thumbnails"
+        thumbnail_dir.mkdir(exist_ok=True)
+        for stale in thumbnail_dir.glob("thumb_*"):
+            stale.unlink()
+        return thumbnail_dir
+    
+    def _attach_thumbnails(self, segments: List[Dict[str, Any]], thumbnail_dir: Optional[Path]):
+        """Pair a run's poster frames with its segments (one poster per started segment, in order)"""
+        if not thumbnail_dir:
+            return
+        thumbnails = sorted(thumbnail_dir.glob(f"thumb_*.{self.thumbnail_format}"))
+        for segment, thumbnail in zip(segments, thumbnails):
+            segment['thumbnail'] = thumbnail
+    
+    def _collect_segments(self, segments: List[Dict[str, Any]], indexes: List[int],
+                          clips: List[Dict[str, float]], output_folder: Path,
+                          clip_duration: int, base_filename: str) -> List[str]:
+        """Rename the segments of a run of clips to the standard clip names and record them"""
+        output_files = []
+        for index, segment in zip(indexes, segments):
+            output_path = output_folder / FileUtils.generate_clip_filename(
+                base_filename, index + 1, clip_duration
+            )
+            segment['path'].replace(output_path)
+            if segment.get('thumbnail'):
+                # Scratch may be on another drive, so move rather than rename
+                shutil.move(str(segment['thumbnail']), str(self._get_thumbnail_path(output_path)))
+            output_files.append(str(output_path))
+            self._record_clip(index, output_path, segment['start'], segment['end'], clips[index])
         return output_files
     
     def process_video(self, video_path: str, output_base_path: Path, 
-                     clip_duration: int) -> Dict[str, Any]:
-        """Process a video file and return results"""
+                     clip_duration: int, mode: str = DEFAULT_MODE,
+                     resume: bool = False) -> Dict[str, Any]:
+        """Process a video file and return results
+        
+        With resume, an earlier output folder of the same job is reused and only
+        its missing or corrupt clips are encoded.
+        """
         try:
             # Get video info
             video_info = self.get_video_info(video_path)
@@ -160,14 +1200,26 @@ class VideoSplitter:
             # Create output folder
             base_filename = Path(video_path).stem
             safe_folder_name = FileUtils.get_safe_folder_name(base_filename)
-            output_folder = FileUtils.create_unique_folder_name(output_base_path, safe_folder_name)
-            
-            # Ensure output directory exists
-            if not FileUtils.ensure_directory_exists(output_folder):
-                raise OSError(f"Could not create output directory: {output_folder}")
+            # Batch jobs run concurrently, so pick and create the folder atomically
+            with self._folder_lock:
+                output_folder = None
+                if resume:
+                    output_folder = ClipManifest.find_resumable(
+                        output_base_path, safe_folder_name, video_path,
+                        self.get_manifest_params(clip_duration, mode)
+                    )
+                    if output_folder:
+                        print(f"Resuming previous job in: {output_folder}")
+                if output_folder is None:
+                    output_folder = FileUtils.create_unique_folder_name(output_base_path, safe_folder_name)
+                
+                # Ensure output directory exists
+                if not FileUtils.ensure_directory_exists(output_folder):
+                    raise OSError(f"Could not create output directory: {output_folder}")
             
             # Split video
-            output_files = self.split_video(video_path, output_folder, clip_duration, base_filename)
+            output_files = self.split_video(video_path, output_folder, clip_duration,
+                                            base_filename, mode)
             
             # Calculate total output size
             total_output_size = sum(FileUtils.get_file_size(f) for f in output_files)
@@ -180,10 +1232,19 @@ class VideoSplitter:
                 'clips_count': len(output_files),
                 'input_size': video_info['file_size'],
                 'output_size': total_output_size,
+                'estimated_size': self.estimated_size,
                 'input_duration': video_info['duration'],
-                'clip_duration': clip_duration
+                'clip_duration': clip_duration,
+                'mode': mode,
+                'clips': self.clip_results,
+                'resumed_clips': self.resumed_clips,
+                'cache_hits': self.cache_hits,
+                'cache_misses': self.cache_misses,
+                'smart_cut_report': self.smart_cut_report,
+                'thumbnails': [clip['thumbnail'] for clip in self.clip_results if 'thumbnail' in clip],
+                'contact_sheet': self.contact_sheet
             }
-            
+        
         except Exception as e:
             return {
                 'success': False,
@@ -195,16 +1256,11 @@ class VideoSplitter:
         """Cancel current video processing"""
         print("🛑 Canceling video processing...")
         self._stop_flag = True
-        if self.current_clip:
-            try:
-                self.current_clip.close()
-            except:
-                pass
-            self.current_clip = None
+        self.backend.close()
     
     def get_processing_status(self) -> Dict[str, Any]:
         """Get current processing status"""
         return {
-            'is_processing': self.current_clip is not None,
+            'is_processing': self.current_video_path is not None,
             'current_video': self.current_video_path
         } 
\ No newline at end of file
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Analysis Proxy
+Verifies that a source is decoded once and every later analysis reads the cached proxy
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from processor.analysis_proxy import AnalysisProxy
+from processor.scene_index import SceneIndex
+from processor.silence_index import SilenceIndex
+from utils.ffmpeg_utils import FFmpegUtils
+
+
+def create_scene_video(path: Path, duration: int = 12, audio: bool = True) -> bool:
+    """Create a test video with a hard cut at 6s and a pause from 3s to 4s"""
+    args = [
+        '-f', 'lavfi', '-t', '6', '-i', 'testsrc2=size=320x180:rate=25',
+        '-f', 'lavfi', '-t', str(duration - 6), '-i', 'smptebars=size=320x180:rate=25',
+    ]
+    if audio:
+        args += ['-f', 'lavfi', '-i', 'aevalsrc=0.5*sin(2*PI*440*t)*not(between(t\\,3\\,4)):s=44100']
+    args += ['-filter_complex', '[0:v][1:v]concat=n=2:v=1:a=0[v]', '-map', '[v]']
+    if audio:
+        args += ['-map', '2:a', '-c:a', 'aac', '-t', str(duration)]
+    args += ['-c:v', 'libx264', '-g', '50', '-pix_fmt', 'yuv420p', str(path)]
+    
+    returncode, stderr = FFmpegUtils.run_ffmpeg(args)
+    if returncode != 0:
+        print(f"❌ Could not create sample video: {stderr[-300:]}")
+    return returncode == 0
+
+
+class DecodeRecorder:
+    """Count ffmpeg runs and pipes opened while active"""
+    
+    def __init__(self):
+        self.calls = 0
+        self.originals = {}
+    
+    def __enter__(self):
+        for name in ('run_ffmpeg', 'open_rawvideo_pipe', 'open_pcm_pipe'):
+            original = getattr(FFmpegUtils, name)
+            self.originals[name] = original
+            
+            def recording(*args, _original=original, **kwargs):
+                self.calls += 1
+                return _original(*args, **kwargs)
+            setattr(FFmpegUtils, name, staticmethod(recording))
+        return self
+    
+    def __exit__(self, *exc):
+        for name, original in self.originals.items():
+            setattr(FFmpegUtils, name, staticmethod(original))
+
+
+def test_proxy_store():
+    """Test the proxy layout and that it is memory-mapped"""
+    print("Testing proxy store...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_scene_video(source):
+            return False
+        
+        proxy = AnalysisProxy(cache_dir=temp_path / "proxy")
+        store = proxy.get(str(source))
+        frames, audio = store['frames'], store['audio']
+        print(f"Frames: {frames.shape} {frames.dtype}, audio: {audio.shape} {audio.dtype}, "
+              f"size: {proxy.get_size()} bytes")
+        
+        if not isinstance(frames, np.memmap) or not isinstance(audio, np.memmap):
+            print("❌ Proxy is not memory-mapped")
+            return False
+        if frames.shape != (12 * AnalysisProxy.FPS, AnalysisProxy.HEIGHT, AnalysisProxy.WIDTH):
+            print("❌ Unexpected frame store shape")
+            return False
+        if abs(len(audio) - 12 * AnalysisProxy.SAMPLE_RATE) > AnalysisProxy.SAMPLE_RATE // 10:
+            print("❌ Unexpected audio length")
+            return False
+        
+        # Sources without audio get an empty track
+        silent = temp_path / "silent.mp4"
+        if not create_scene_video(silent, audio=False):
+            return False
+        silent_audio = proxy.get_audio(str(silent))
+        print(f"Silent source audio: {silent_audio.shape}")
+        return len(silent_audio) == 0 and len(proxy.get_frames(str(silent))) > 0
+
+
+def test_single_decode():
+    """Test that scene and silence analyses share one decode and match the pipe results"""
+    print("Testing single decode...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_scene_video(source):
+            return False
+        
+        proxy = AnalysisProxy(cache_dir=temp_path / "proxy")
+        with DecodeRecorder() as recorder:
+            scenes = SceneIndex(use_disk_cache=False, proxy=proxy).analyze(str(source))
+            silences = SilenceIndex(use_disk_cache=False, proxy=proxy).analyze(str(source))
+        print(f"First analyses: {recorder.calls} decode(s)")
+        if recorder.calls != 1:
+            print("❌ Source was decoded more than once")
+            return False
+        
+        with DecodeRecorder() as recorder:
+            SceneIndex(use_disk_cache=False, proxy=AnalysisProxy(cache_dir=temp_path / "proxy")).analyze(str(source))
+            SilenceIndex(use_disk_cache=False, proxy=proxy).analyze(str(source))
+        print(f"Second analyses: {recorder.calls} decode(s)")
+        if recorder.calls != 0:
+            print("❌ Second analysis touched the source")
+            return False
+        
+        pipe_scenes = SceneIndex(use_disk_cache=False).analyze(str(source))
+        pipe_silences = SilenceIndex(use_disk_cache=False).analyze(str(source))
+        print(f"Scenes: {scenes[:3]}..., silences: {silences}")
+        if scenes != pipe_scenes or silences != pipe_silences:
+            print("❌ Proxy results differ from direct decoding")
+            return False
+        
+        strongest = max(scenes, key=lambda scene: scene[1])
+        return abs(strongest[0] - 6.0) < 0.2 and len(silences) == 1
+
+
+def test_eviction():
+    """Test that the least recently used proxy is evicted to fit the size limit"""
+    print("Testing proxy eviction...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        sources = []
+        for i in range(3):
+            source = temp_path / f"sample_{i}.mp4"
+            if not create_scene_video(source, duration=8 + i):
+                return False
+            sources.append(str(source))
+        
+        # Each proxy is about 0.4 MB, so a 1 MB cache holds two
+        proxy = AnalysisProxy(max_size_mb=1, cache_dir=temp_path / "proxy")
+        proxy.get(sources[0])
+        proxy.get(sources[1])
+        proxy.get(sources[0])
+        proxy.get(sources[2])
+        
+        cached = [(temp_path / "proxy" / proxy.get_key(s)).is_dir() for s in sources]
+        print(f"Cached: {cached}, size: {proxy.get_size()} bytes")
+        if cached != [True, False, True]:
+            print("❌ Wrong proxy evicted")
+            return False
+        
+        proxy.clear()
+        return proxy.get_size() == 0 and not any((temp_path / "proxy").glob("*/"))
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Analysis Proxy Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Proxy Store", test_proxy_store),
+        ("Single Decode", test_single_decode),
+        ("Eviction", test_eviction),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
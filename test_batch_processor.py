@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Batch Processor
+Verifies shortest-first scheduling, per-file status and the combined summary
+"""
+
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from processor.batch_processor import BatchProcessor
+from test_helpers import create_sample_video
+
+
+def test_batch_budget():
+    """Test how many files run at once for each mode"""
+    print("Testing batch budget...")
+
+    batch = BatchProcessor(settings={'ffmpeg_threads': 2})
+    copy_workers = batch.get_batch_budget('copy', 50)
+    parallel_workers = batch.get_batch_budget('parallel', 50)
+    print(f"✅ Auto budget: copy={copy_workers}, parallel={parallel_workers}")
+
+    # Parallel mode already uses every core for one file
+    if parallel_workers != 1 or copy_workers < 1:
+        print("❌ Unexpected auto budget")
+        return False
+
+    fixed = BatchProcessor(settings={'batch_workers': 3})
+    return fixed.get_batch_budget('copy', 50) == 3 and fixed.get_batch_budget('copy', 2) == 2
+
+
+def test_batch_queue():
+    """Test that every file is processed, shortest first, with status updates"""
+    print("Testing batch queue...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        sources = []
+        for name, duration in (("long", 8), ("short", 2), ("medium", 4)):
+            source = temp_path / f"{name}.mp4"
+            if not create_sample_video(source, duration):
+                return False
+            sources.append(str(source))
+        broken = temp_path / "broken.mp4"
+        broken.write_bytes(b"not a video")
+        sources.append(str(broken))
+
+        started = []
+        statuses = {}
+        lock = threading.Lock()
+
+        def on_status(index, status, detail):
+            with lock:
+                statuses[index] = status
+                if status == BatchProcessor.STATUS_RUNNING:
+                    started.append(Path(sources[index]).stem)
+
+        batch = BatchProcessor(status_callback=on_status, settings={'batch_workers': 1, 'clip_cache_mb': 0})
+        result = batch.process_files(sources, temp_path / "clips", 2, mode='copy')
+
+        print(f"Start order: {started}")
+        print(f"✅ {result['successful_files']}/{result['total_files']} files, "
+              f"{result['clips_count']} clips")
+
+        if started != ["broken", "short", "medium", "long"]:
+            print("❌ Files were not scheduled shortest first")
+            return False
+
+        if result['success'] or result['successful_files'] != 3 or result['failed_files'] != 1:
+            print("❌ Unexpected summary counts")
+            return False
+
+        # Results keep the input order
+        if [Path(r['input_file']).stem for r in result['results']] != ["long", "short", "medium", "broken"]:
+            print("❌ Results are not in input order")
+            return False
+
+        expected = [BatchProcessor.STATUS_DONE] * 3 + [BatchProcessor.STATUS_FAILED]
+        return [statuses[i] for i in range(4)] == expected and result['clips_count'] == 7
+
+
+def test_concurrent_reencode():
+    """Test two moviepy re-encode jobs running at once"""
+    print("Testing concurrent re-encode jobs...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        sources = []
+        for index in range(2):
+            source = temp_path / f"same_{index}.mp4"
+            if not create_sample_video(source, 4):
+                return False
+            sources.append(str(source))
+
+        batch = BatchProcessor(settings={'batch_workers': 2, 'ffmpeg_threads': 1, 'clip_cache_mb': 0})
+        result = batch.process_files(sources, temp_path / "clips", 2, mode='reencode')
+        if not result['success']:
+            print(f"❌ Batch failed: {[r.get('error') for r in result['results']]}")
+            return False
+
+        leftovers = list((temp_path / "clips").rglob("*temp-audio*"))
+        return result['clips_count'] == 4 and not leftovers
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Batch Processor Test")
+    print("=" * 60)
+
+    tests = [
+        ("Batch Budget", test_batch_budget),
+        ("Batch Queue", test_batch_queue),
+        ("Concurrent Re-encode", test_concurrent_reencode),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
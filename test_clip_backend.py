@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Clip Backends
+Verifies that the ffmpeg and moviepy backends write equivalent clips for every processor
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from processor.clip_backend import ClipBackend
+from processor.video_splitter import VideoSplitter
+from processor.url_processor import URLProcessor
+from utils.media_probe import MediaProbe
+from test_helpers import create_sample_video
+
+
+def get_info(video_path: str) -> dict:
+    """Probe a clip without the shared probe cache"""
+    MediaProbe.clear_cache()
+    return MediaProbe.get_video_info(video_path) or {}
+
+
+def test_backend_encode():
+    """Test probe and encode with a separate audio track, own audio and no audio"""
+    print("Testing backend encode...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 12):
+            return False
+        work_dir = temp_path / "work"
+        work_dir.mkdir()
+        
+        for name in ClipBackend.get_backends():
+            backend = ClipBackend.create(name)
+            info = backend.probe(str(source))
+            print(f"{name}: probe {info['duration']:.2f}s {tuple(info['size'])} audio={info['has_audio']}")
+            if abs(info['duration'] - 12) > 0.1 or not info['has_audio']:
+                return False
+            
+            cases = {
+                'shared_audio': {'audio_path': str(source)},
+                'own_audio': {'audio_codec': 'aac'},
+                'no_audio': {},
+            }
+            for case, options in cases.items():
+                output = temp_path / f"{name}_{case}.mp4"
+                backend.encode(str(source), 2.0, 6.0, output, 'libx264', 'ultrafast', 28,
+                               video_filter='scale=160:90', work_dir=work_dir, **options)
+                clip = get_info(str(output))
+                print(f"{name} {case}: {clip.get('duration', 0):.2f}s {clip.get('size')} "
+                      f"audio={clip.get('has_audio')}")
+                if abs(clip.get('duration', 0) - 4.0) > 0.15 or clip.get('size') != (160, 90):
+                    print(f"❌ {name} {case}: wrong clip")
+                    return False
+                if clip.get('has_audio') != (case != 'no_audio'):
+                    print(f"❌ {name} {case}: wrong audio")
+                    return False
+            backend.close()
+        
+        leftovers = [p.name for p in work_dir.iterdir()]
+        if leftovers:
+            print(f"❌ Intermediate files left behind: {leftovers}")
+            return False
+        
+        try:
+            ClipBackend.create('gstreamer')
+            return False
+        except ValueError:
+            return True
+
+
+def test_splitter_backends():
+    """Test re-encode mode with each backend and compare their speed"""
+    print("Testing re-encode mode with each backend...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 12):
+            return False
+        
+        timings = {}
+        for name in ClipBackend.get_backends():
+            settings = {'processing_backend': name, 'clip_cache_mb': 0}
+            start = time.time()
+            result = VideoSplitter(settings=settings).process_video(str(source), temp_path / name,
+                                                                    4, mode='reencode')
+            timings[name] = time.time() - start
+            if not result['success'] or result['clips_count'] != 3:
+                print(f"❌ {name}: {result.get('error')}")
+                return False
+            
+            durations = [get_info(path).get('duration', 0) for path in result['output_files']]
+            print(f"{name}: {timings[name]:.2f}s, clips {[round(d, 2) for d in durations]}")
+            if any(abs(d - 4.0) > 0.15 for d in durations):
+                return False
+            if not all(get_info(path).get('has_audio') for path in result['output_files']):
+                print(f"❌ {name}: clip without audio")
+                return False
+        
+        print(f"ffmpeg backend is {timings['moviepy'] / timings['ffmpeg']:.1f}x faster than moviepy")
+        return timings['ffmpeg'] < timings['moviepy']
+
+
+def test_url_segment_backend():
+    """Test that URL segment extraction goes through the configured backend"""
+    print("Testing URL segment extraction...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        output_path = temp_path / "segment.mp4"
+        # An already downloaded video is reused, so no network access is needed
+        if not create_sample_video(temp_path / f"temp_full_{output_path.stem}.mp4", 12):
+            return False
+        
+        for name in ClipBackend.get_backends():
+            processor = URLProcessor({'processing_backend': name})
+            result = processor.download_video_segment("https://example.com/video", 8.0, 10.0,
+                                                      output_path)
+            duration = get_info(str(output_path)).get('duration', 0)
+            print(f"{name}: {result} ({duration:.2f}s)")
+            # Clamped to the end of the video
+            if result != str(output_path) or abs(duration - 4.0) > 0.15:
+                return False
+            output_path.unlink()
+        return True
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Clip Backend Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Backend Encode", test_backend_encode),
+        ("Splitter Backends", test_splitter_backends),
+        ("URL Segment Backend", test_url_segment_backend),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
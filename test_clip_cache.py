@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Clip Cache
+Verifies that identical re-runs reuse cached clips and that the cache stays within its size limit
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from processor.clip_cache import ClipCache
+from processor.video_splitter import VideoSplitter
+from utils.ffmpeg_utils import FFmpegUtils
+from test_helpers import create_sample_video
+
+
+def test_lru_eviction():
+    """Test that the least recently used clips are evicted first"""
+    print("Testing LRU eviction...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        cache = ClipCache(max_size_mb=1, cache_dir=temp_path / "cache")
+        keys = []
+        for index in range(3):
+            clip = temp_path / f"clip_{index}.mp4"
+            clip.write_bytes(bytes([index]) * 400 * 1024)
+            key = ClipCache.get_key("source.mp4", index * 10, index * 10 + 10, {'crf': 23})
+            keys.append(key)
+            cache.store(key, clip, index * 10, index * 10 + 10)
+            if index == 1:
+                # Touch the first clip so the second one is now the oldest
+                cache.fetch(keys[0], temp_path / "touched.mp4")
+        
+        hits = [cache.fetch(key, temp_path / "out.mp4") is not None for key in keys]
+        print(f"Cache size: {cache.get_size() // 1024} KB, hits: {hits}")
+        if hits != [True, False, True] or cache.get_size() > 1024 * 1024:
+            print("❌ Unexpected eviction")
+            return False
+        
+        # A cached file changed outside ClipForge is a miss
+        with open(temp_path / "clip_2.mp4", 'ab') as f:
+            f.write(b"extra")
+        if cache.fetch(keys[2], temp_path / "out.mp4") is not None:
+            print("❌ Modified cached clip was reused")
+            return False
+        
+        # Different encode parameters never share an entry
+        return (ClipCache.get_key("source.mp4", 0, 10, {'crf': 23})
+                != ClipCache.get_key("source.mp4", 0, 10, {'crf': 28}))
+
+
+def test_rerun_uses_cache():
+    """Test that re-running a video into another folder encodes nothing"""
+    print("Testing re-run from cache...")
+    
+    calls = []
+    original_run_ffmpeg = FFmpegUtils.run_ffmpeg
+    
+    def recording_run_ffmpeg(args, *extra, **kwargs):
+        calls.append(list(args))
+        return original_run_ffmpeg(args, *extra, **kwargs)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 12):
+            return False
+        
+        FFmpegUtils.run_ffmpeg = staticmethod(recording_run_ffmpeg)
+        try:
+            for mode in ('single_pass', 'smart', 'parallel'):
+                results = []
+                for run in range(2):
+                    calls.clear()
+                    progress_values = []
+                    splitter = VideoSplitter(progress_values.append)
+                    splitter.clip_cache = ClipCache(cache_dir=temp_path / "cache")
+                    result = splitter.process_video(str(source), temp_path / f"{mode}_{run}", 4, mode=mode)
+                    if not result['success'] or result['clips_count'] != 3:
+                        print(f"❌ {mode}: run {run + 1} failed: {result.get('error')}")
+                        return False
+                    results.append((result, len(calls), progress_values))
+                
+                (first, _, _), (second, second_calls, second_progress) = results
+                print(f"✅ {mode}: first run {first['cache_hits']} hits / {first['cache_misses']} misses, "
+                      f"second run {second['cache_hits']} hits / {second['cache_misses']} misses, "
+                      f"{second_calls} ffmpeg runs")
+                if first['cache_misses'] != 3 or second['cache_hits'] != 3 or second['cache_misses'] != 0:
+                    print(f"❌ {mode}: unexpected hit/miss counts")
+                    return False
+                if second_calls != 0:
+                    print(f"❌ {mode}: cached re-run still ran ffmpeg")
+                    return False
+                if second_progress[-1:] != [100]:
+                    print(f"❌ {mode}: cached re-run reported progress {second_progress}")
+                    return False
+                
+                sizes = [Path(p).stat().st_size for p in second['output_files']]
+                if sizes != [Path(p).stat().st_size for p in first['output_files']]:
+                    print(f"❌ {mode}: cached clips differ from the originals")
+                    return False
+                if [c['start'] for c in second['clips']] != [c['start'] for c in first['clips']]:
+                    print(f"❌ {mode}: cached clip ranges differ")
+                    return False
+        finally:
+            FFmpegUtils.run_ffmpeg = original_run_ffmpeg
+        
+        return True
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Clip Cache Test")
+    print("=" * 60)
+    
+    tests = [
+        ("LRU Eviction", test_lru_eviction),
+        ("Re-run From Cache", test_rerun_uses_cache),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Concurrent URL Extraction
+Verifies concurrent stream sessions, per-host connection caps, the thread budget and in-order output
+"""
+
+import sys
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from processor.url_clip_processor_v8 import URLClipProcessorV8
+from utils.disk_guard import DiskGuard
+from utils.file_utils import FileUtils
+from utils.media_probe import MediaProbe
+from test_helpers import create_sample_video, RangeServer
+
+
+class CountSessions:
+    """Track how many stream sessions of a processor's backend run at the same time"""
+    
+    def __init__(self, processor: URLClipProcessorV8):
+        self.backend = processor.backend
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.threads = []
+        original = self.backend.encode_run
+        
+        def counting(*args, **kwargs):
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+                self.threads.append(kwargs.get('threads'))
+            try:
+                # Hold the session a little so overlapping sessions are observed
+                time.sleep(0.3)
+                return original(*args, **kwargs)
+            finally:
+                with self.lock:
+                    self.active -= 1
+        
+        self.backend.encode_run = counting
+
+
+def test_budget():
+    """Test worker, thread and connection budgets"""
+    print("Testing concurrency budget...")
+    
+    budget = URLClipProcessorV8(settings={
+        'url_workers': 3, 'url_encode_threads': 8, 'url_host_connections': 2
+    }).get_concurrency_budget()
+    print(f"3 workers, 8 threads: {budget}")
+    if budget != (3, 2, 2):
+        return False
+    
+    # Auto workers follow the connection cap; each gets at least one thread
+    auto = URLClipProcessorV8(settings={
+        'url_encode_threads': 2, 'url_host_connections': 4
+    }).get_concurrency_budget()
+    print(f"Auto workers, 2 threads: {auto}")
+    if auto != (2, 1, 4):
+        return False
+    
+    # moviepy shares one reader between clips, so it never runs concurrently
+    moviepy = URLClipProcessorV8(settings={
+        'url_workers': 4, 'processing_backend': 'moviepy'
+    }).get_concurrency_budget()
+    print(f"MoviePy: {moviepy}")
+    return moviepy[0] == 1
+
+
+def test_concurrent_extraction():
+    """Test that sessions overlap within the host cap and clips appear in order"""
+    print("Testing concurrent extraction...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 24):
+            return False
+        
+        with RangeServer(temp_path) as server:
+            url = server.url("sample.mp4")
+            video_info = {'title': 'Concurrent Test', 'duration': 24.0, 'filesize': source.stat().st_size}
+            settings = {'clip_cache_mb': 0, 'disk_reserve_mb': 0, 'url_workers': 3,
+                        'url_host_connections': 2, 'url_encode_threads': 6}
+            names = [FileUtils.generate_clip_filename(video_info['title'], i + 1, 4) for i in range(6)]
+            updates = []
+            out_of_order = []
+            
+            def on_clip(completed: int, total: int, bytes_read: int):
+                updates.append((completed, total, bytes_read))
+                written = sorted(p.name for p in (temp_path / "out").rglob("*.mp4") if p.name in names)
+                if written != names[:len(written)]:
+                    out_of_order.append(written)
+            
+            processor = URLClipProcessorV8(settings=settings, status_callback=on_clip)
+            processor.url_processor.validate_url = lambda u: {
+                'valid': True, 'video_info': video_info, 'platform': 'test'
+            }
+            processor._get_stream_url = lambda u: u
+            sessions = CountSessions(processor)
+            result = processor.process_url_video(url, temp_path / "out", 4)
+        
+        stats = result.get('stream_stats') or {}
+        print(f"{result.get('successful_clips')} clips, {sessions.max_active} sessions at once "
+              f"(threads {sessions.threads}), stream stats {stats}")
+        print(f"Updates: {updates}")
+        if not result['success'] or result['successful_clips'] != 6:
+            return False
+        # Three shards, but never more than two connections to the host
+        if stats.get('opens') != 3 or sessions.max_active != 2 or sessions.threads != [2, 2, 2]:
+            return False
+        if URLClipProcessorV8._host_connections:
+            print("❌ Host connections were not released")
+            return False
+        if out_of_order:
+            print(f"❌ Clips appeared out of order: {out_of_order}")
+            return False
+        if [u[0] for u in updates] != list(range(1, 7)) or updates[-1][2] != stats['bytes_read']:
+            return False
+        
+        MediaProbe.clear_cache()
+        durations = [round(MediaProbe.get_video_info(path)['duration'], 2) for path in result['output_files']]
+        print(f"Clip durations: {durations}")
+        return [Path(p).name for p in result['output_files']] == names and \
+            all(abs(d - 4.0) < 0.1 for d in durations)
+
+
+def test_cancel_mid_job():
+    """Test that cancelling while shards run lets them stop before the job cleans up"""
+    print("Testing cancel during a multi-shard job...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 60):
+            return False
+        
+        with RangeServer(temp_path) as server:
+            url = server.url("sample.mp4")
+            video_info = {'title': 'Cancel Test', 'duration': 60.0, 'filesize': source.stat().st_size}
+            settings = {'clip_cache_mb': 0, 'disk_reserve_mb': 0, 'url_workers': 3,
+                        'url_host_connections': 2, 'url_encode_threads': 6}
+            cancelled = []
+            scratch_seen = []
+            processor = URLClipProcessorV8(settings=settings)
+            processor.url_processor.validate_url = lambda u: {
+                'valid': True, 'video_info': video_info, 'platform': 'test'
+            }
+            processor._get_stream_url = lambda u: u
+            original = processor.backend.encode_run
+            started = []
+            cancel_done = threading.Event()
+            
+            def cancelling(*args, **kwargs):
+                started.append(True)
+                first = len(started) == 1
+                if not first:
+                    # Still in its session when the first one cancels the job
+                    cancel_done.wait(30)
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    if first:
+                        processor.cancel_processing()
+                        cancelled.append(processor.scratch_job.path)
+                        cancel_done.set()
+                    else:
+                        scratch_seen.append(cancelled[0].exists())
+            
+            processor.backend.encode_run = cancelling
+            result = processor.process_url_video(url, temp_path / "out", 4)
+        
+        print(f"{result.get('successful_clips')} clips before the cancel took effect, "
+              f"error: {result.get('error')}, scratch seen after cancel: {scratch_seen}")
+        if 'error' in result or not 0 < result['successful_clips'] < 15:
+            return False
+        if not scratch_seen or not all(scratch_seen):
+            print("❌ Scratch was removed while a session was running")
+            return False
+        if processor.disk_reservation or DiskGuard._reservations or URLClipProcessorV8._host_connections:
+            print("❌ Reservation or host connections were not released")
+            return False
+        return not cancelled[0].exists()
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Concurrent URL Extraction Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Budget", test_budget),
+        ("Concurrent Extraction", test_concurrent_extraction),
+        ("Cancel Mid Job", test_cancel_mid_job),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Disk Guard
+Verifies output size estimates, disk space admission control and pausing on low disk space
+"""
+
+import sys
+import json
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from processor.video_splitter import VideoSplitter
+from processor.size_estimator import SizeEstimator
+from utils.disk_guard import DiskGuard
+from utils.file_utils import FileUtils
+from utils.media_probe import MediaProbe
+from test_helpers import create_sample_video
+
+
+class FakeFreeSpace:
+    """Replace FileUtils.get_available_space while active
+    
+    Reports `free` bytes, except for `low_seconds` after the `low_after`-th
+    check, when it reports no free space at all.
+    """
+    
+    def __init__(self, free: int, low_after: int = None, low_seconds: float = 0.0):
+        self.free = free
+        self.low_after = low_after
+        self.low_seconds = low_seconds
+        self.calls = 0
+        self.low_since = None
+        self.low_reported = 0
+        self.original = None
+    
+    def __call__(self, directory_path: Path) -> int:
+        self.calls += 1
+        if self.low_after is not None and self.calls >= self.low_after:
+            if self.low_since is None:
+                self.low_since = time.monotonic()
+            if time.monotonic() - self.low_since < self.low_seconds:
+                self.low_reported += 1
+                return 0
+        return self.free
+    
+    def __enter__(self):
+        self.original = FileUtils.get_available_space
+        FileUtils.get_available_space = staticmethod(self)
+        return self
+    
+    def __exit__(self, *exc):
+        FileUtils.get_available_space = staticmethod(self.original)
+
+
+def clip_durations(output_files) -> list:
+    """Get the duration of every clip without the shared probe cache"""
+    MediaProbe.clear_cache()
+    return [round(MediaProbe.get_video_info(path)['duration'], 2) for path in output_files]
+
+
+def test_size_estimate():
+    """Test the bitrate prior and that a finished job calibrates the estimate"""
+    print("Testing output size estimates...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 12):
+            return False
+        
+        estimator = SizeEstimator(model_file=temp_path / "size_model.json")
+        video_info = MediaProbe.get_video_info(str(source))
+        
+        # Stream copy writes about what it reads
+        copy_estimate = estimator.estimate(video_info, 'copy', None)
+        print(f"Copy estimate: {copy_estimate} bytes (source {video_info['file_size']} bytes)")
+        if not video_info['file_size'] <= copy_estimate <= video_info['file_size'] * 1.3:
+            return False
+        
+        # Presets scale the prior by their pixel count
+        vertical = estimator.estimate(video_info, 'single_pass', 'vertical_720')
+        original = estimator.estimate(video_info, 'single_pass', 'original')
+        print(f"Prior estimates: original {original}, vertical_720 {vertical}")
+        if vertical <= original:
+            return False
+        
+        for mode in ('single_pass', 'copy'):
+            splitter = VideoSplitter(settings={'clip_cache_mb': 0})
+            splitter.size_estimator = estimator
+            result = splitter.process_video(str(source), temp_path / mode, 4, mode=mode)
+            if not result['success']:
+                print(f"❌ {mode}: {result.get('error')}")
+                return False
+            
+            calibrated = estimator.estimate(video_info, mode, None)
+            print(f"{mode}: estimated {result['estimated_size']}, wrote {result['output_size']}, "
+                  f"calibrated estimate {calibrated}")
+            # After one job the same source is predicted from its measured ratio
+            expected = result['output_size'] * SizeEstimator.SAFETY_MARGIN
+            if abs(calibrated - expected) > expected * 0.02:
+                print(f"❌ {mode}: estimate was not calibrated")
+                return False
+        
+        # Measured ratios persist across instances
+        reloaded = SizeEstimator(model_file=temp_path / "size_model.json")
+        return reloaded.estimate(video_info, 'copy', None) == estimator.estimate(video_info, 'copy', None)
+
+
+def test_concurrent_records():
+    """Test that estimators of concurrent jobs do not overwrite each other's ratios"""
+    print("Testing size model updates from concurrent jobs...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        model_file = Path(temp_dir) / "size_model.json"
+        video_info = {'duration': 10.0, 'file_size': 1_000_000, 'size': (320, 180)}
+        # Both jobs load the (empty) model when they start
+        first, second = SizeEstimator(model_file=model_file), SizeEstimator(model_file=model_file)
+        for estimator in (first, second):
+            estimator.estimate(video_info, 'copy', None)
+        
+        first.record(video_info, 'copy', None, 10.0, 1_000_000)
+        second.record(video_info, 'single_pass', None, 10.0, 500_000)
+        second.record(video_info, 'copy', None, 10.0, 1_000_000)
+        
+        with open(model_file, 'r', encoding='utf-8') as f:
+            model = json.load(f)
+        print(f"Model: {model}")
+        return model[SizeEstimator.get_key('copy', None)]['jobs'] == 2 and \
+            SizeEstimator.get_key('single_pass', None) in model
+
+
+def test_admission():
+    """Test that jobs that do not fit are refused, or queued until space is released"""
+    print("Testing disk space admission...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 4):
+            return False
+        
+        # A reserve larger than the free space refuses every job before it writes anything
+        reserve_mb = FileUtils.get_available_space(temp_path) // (1024 * 1024) + 1
+        result = VideoSplitter(settings={'disk_reserve_mb': reserve_mb, 'clip_cache_mb': 0}
+                               ).process_video(str(source), temp_path / "refused", 2, mode='copy')
+        print(f"Refused: {result.get('error')}")
+        if result['success'] or 'Not enough disk space' not in result['error']:
+            return False
+        if any((temp_path / "refused").iterdir()):
+            print("❌ Refused job left an output folder behind")
+            return False
+        
+        # Running jobs' reservations count against new jobs on the same drive
+        mb = 1024 * 1024
+        original_poll = DiskGuard.POLL_INTERVAL
+        DiskGuard.POLL_INTERVAL = 0.05
+        try:
+            with FakeFreeSpace(100 * mb):
+                first = DiskGuard(reserve_mb=10).admit(temp_path, 60 * mb)
+                try:
+                    DiskGuard(reserve_mb=10).admit(temp_path, 60 * mb)
+                    print("❌ Second job was admitted")
+                    return False
+                except OSError as e:
+                    print(f"Second job refused: {e}")
+                
+                # Writing clips shrinks the reservation
+                first.consume(40 * mb)
+                second = DiskGuard(reserve_mb=10).admit(temp_path, 60 * mb)
+                second.release()
+                
+                # With the wait policy the job is queued until the first one finishes
+                threading.Timer(0.3, first.release).start()
+                start = time.time()
+                queued = DiskGuard(reserve_mb=10, policy='wait').admit(temp_path, 80 * mb)
+                waited = time.time() - start
+                queued.release()
+                print(f"Queued job started after {waited:.2f}s")
+                if waited < 0.25:
+                    return False
+                
+                # Cancelling a queued job gives up without a reservation
+                cancelled = DiskGuard(reserve_mb=10, policy='wait').admit(
+                    temp_path, 200 * mb, stop_check=lambda: time.time() - start > 0.5)
+                return cancelled is None and not DiskGuard._reservations
+        finally:
+            DiskGuard.POLL_INTERVAL = original_poll
+
+
+def test_pause_on_low_space():
+    """Test that encodes stop before the disk fills and continue once space is freed"""
+    print("Testing pause on low disk space...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 40):
+            return False
+        
+        original_intervals = DiskGuard.CHECK_INTERVAL, DiskGuard.POLL_INTERVAL
+        DiskGuard.CHECK_INTERVAL = 0.0
+        DiskGuard.POLL_INTERVAL = 0.05
+        try:
+            for mode in ('single_pass', 'reencode'):
+                settings = {'clip_cache_mb': 0, 'disk_reserve_mb': 10}
+                with FakeFreeSpace(10 * 1024 ** 3, low_after=8, low_seconds=0.5) as fake:
+                    result = VideoSplitter(settings=settings).process_video(
+                        str(source), temp_path / mode, 4, mode=mode
+                    )
+                if not result['success']:
+                    print(f"❌ {mode}: {result.get('error')}")
+                    return False
+                
+                durations = clip_durations(result['output_files'])
+                print(f"{mode}: low space reported {fake.low_reported} times, clips {durations}")
+                if not fake.low_reported:
+                    print("❌ Low disk space was never seen")
+                    return False
+                if len(durations) != 10 or any(abs(d - 4.0) > 0.15 for d in durations):
+                    print(f"❌ {mode}: clips missing or cut short after the pause")
+                    return False
+                leftovers = [p.name for p in (temp_path / mode).glob('*.mp4')
+                             if str(p) not in result['output_files']]
+                if leftovers:
+                    print(f"❌ Unfinished clips left behind: {leftovers}")
+                    return False
+            return True
+        finally:
+            DiskGuard.CHECK_INTERVAL, DiskGuard.POLL_INTERVAL = original_intervals
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Disk Guard Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Size Estimate", test_size_estimate),
+        ("Concurrent Records", test_concurrent_records),
+        ("Admission", test_admission),
+        ("Pause On Low Space", test_pause_on_low_space),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
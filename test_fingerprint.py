@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Fingerprint
+Benchmarks sampled vs full hashing and checks collision behaviour on edited sources
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from utils.fingerprint import Fingerprint
+from test_helpers import create_sample_video
+
+BENCHMARK_SIZE_MB = 256
+
+
+def test_benchmark():
+    """Benchmark the cost per GB of sampled and full hashing"""
+    print(f"Benchmarking on a {BENCHMARK_SIZE_MB} MB file...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = Path(temp_dir) / "large.bin"
+        block = os.urandom(1024 * 1024)
+        with open(source, 'wb') as f:
+            for _ in range(BENCHMARK_SIZE_MB):
+                f.write(block)
+        size_gb = BENCHMARK_SIZE_MB / 1024
+        
+        start = time.perf_counter()
+        runs = 20
+        for _ in range(runs):
+            Fingerprint.compute_sampled(str(source))
+        sampled_time = (time.perf_counter() - start) / runs
+        
+        start = time.perf_counter()
+        Fingerprint.compute_full(str(source))
+        full_time = time.perf_counter() - start
+        
+        sampled_bytes = len(Fingerprint.get_sample_offsets(source.stat().st_size)) * Fingerprint.SAMPLE_SIZE
+        print(f"Sampled: {sampled_time * 1000:.2f} ms per file "
+              f"({sampled_bytes // 1024} KB read, independent of size)")
+        print(f"Full:    {full_time / size_gb:.2f} s per GB "
+              f"(~{full_time / size_gb * 20:.0f} s for a 20 GB recording)")
+        
+        if sampled_bytes > 2 * 1024 * 1024:
+            print("❌ Sampled fingerprint reads too much")
+            return False
+        # Sampling must beat the full hash by a wide margin even on a cached file
+        return sampled_time * 20 < full_time
+
+
+def test_collisions():
+    """Test that re-encoded, truncated and edited sources get new fingerprints"""
+    print("Testing collision behaviour...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "source.mp4"
+        if not create_sample_video(source, 60):
+            return False
+        original = Fingerprint.compute_sampled(str(source))
+        print(f"Source size: {source.stat().st_size // 1024} KB, "
+              f"{len(Fingerprint.get_sample_offsets(source.stat().st_size))} samples")
+        
+        cases = {}
+        
+        reencoded = temp_path / "reencoded.mp4"
+        if not create_sample_video(reencoded, 60, crf=24):
+            return False
+        cases['re-encoded (crf 24)'] = reencoded
+        
+        truncated = temp_path / "truncated.mp4"
+        shutil.copy(source, truncated)
+        with open(truncated, 'r+b') as f:
+            f.truncate(source.stat().st_size - 1)
+        cases['truncated by 1 byte'] = truncated
+        
+        # Same size, one byte flipped in the middle of a sampled block
+        edited = temp_path / "edited.mp4"
+        shutil.copy(source, edited)
+        offset = Fingerprint.get_sample_offsets(source.stat().st_size)[5] + 100
+        with open(edited, 'r+b') as f:
+            f.seek(offset)
+            value = f.read(1)[0]
+            f.seek(offset)
+            f.write(bytes([value ^ 0xFF]))
+        cases['byte flipped in a sample'] = edited
+        
+        # Same size, one byte flipped between samples: only the full hash sees it
+        unsampled = temp_path / "unsampled.mp4"
+        shutil.copy(source, unsampled)
+        offsets = Fingerprint.get_sample_offsets(source.stat().st_size)
+        gap_offset = offsets[5] + Fingerprint.SAMPLE_SIZE + 10
+        with open(unsampled, 'r+b') as f:
+            f.seek(gap_offset)
+            value = f.read(1)[0]
+            f.seek(gap_offset)
+            f.write(bytes([value ^ 0xFF]))
+        
+        failed = False
+        for name, path in cases.items():
+            differs = Fingerprint.compute_sampled(str(path)) != original
+            print(f"{'✅' if differs else '❌'} {name}: {'different' if differs else 'COLLISION'}")
+            failed = failed or not differs
+        
+        sampled_same = Fingerprint.compute_sampled(str(unsampled)) == original
+        full_differs = Fingerprint.compute_full(str(unsampled)) != Fingerprint.compute_full(str(source))
+        print(f"ℹ️ byte flipped between samples: sampled {'collides' if sampled_same else 'differs'}, "
+              f"full hash {'differs' if full_differs else 'collides'}")
+        
+        # Moving a file keeps its identity
+        moved = temp_path / "moved.mp4"
+        shutil.copy2(source, moved)
+        same_after_move = Fingerprint.get_fingerprint(str(moved)) == original
+        print(f"{'✅' if same_after_move else '❌'} copied to another path: "
+              f"{'same' if same_after_move else 'different'}")
+        
+        return not failed and full_differs and same_after_move
+
+
+def test_background_full_hash():
+    """Test the background full hash and its persistent cache"""
+    print("Testing background full hash...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = Path(temp_dir) / "source.bin"
+        source.write_bytes(os.urandom(8 * 1024 * 1024))
+        
+        results = []
+        if not Fingerprint.start_full_hash(str(source), callback=results.append):
+            print("❌ Background hash did not start")
+            return False
+        if Fingerprint.start_full_hash(str(source)):
+            print("❌ Duplicate background hash started")
+            return False
+        
+        full_hash = Fingerprint.get_full_hash(str(source), wait=True)
+        print(f"Full hash: {full_hash}")
+        if full_hash != Fingerprint.compute_full(str(source)) or results != [full_hash]:
+            print("❌ Background hash mismatch")
+            return False
+        
+        # Changing the file invalidates the stored hash
+        with open(source, 'ab') as f:
+            f.write(b"more")
+        return Fingerprint.get_full_hash(str(source)) is None
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Fingerprint Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Benchmark", test_benchmark),
+        ("Collisions", test_collisions),
+        ("Background Full Hash", test_background_full_hash),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Fragment Stream
+Verifies that clips of HLS/DASH formats are cut from only the fragments covering them
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from PIL import Image, ImageChops, ImageStat
+
+from processor.fragment_stream import FragmentStream
+from processor.url_clip_processor_v8 import URLClipProcessorV8
+from processor.thumbnails import Thumbnails
+from utils.ffmpeg_utils import FFmpegUtils
+from utils.media_probe import MediaProbe
+from test_helpers import create_sample_video, RangeServer
+
+
+def create_hls(source: Path, folder: Path, segment_type: str = 'mpegts') -> bool:
+    """Package a video as a VOD HLS playlist of 2s fragments"""
+    folder.mkdir()
+    extension = 'm4s' if segment_type == 'fmp4' else 'ts'
+    returncode, stderr = FFmpegUtils.run_ffmpeg([
+        '-i', str(source), '-c', 'copy', '-f', 'hls', '-hls_time', '2',
+        '-hls_playlist_type', 'vod', '-hls_segment_type', segment_type,
+        '-hls_segment_filename', str(folder / f"seg_%03d.{extension}"),
+        str(folder / "index.m3u8")
+    ])
+    if returncode != 0:
+        print(f"❌ Could not create HLS playlist: {stderr[-300:]}")
+    return returncode == 0
+
+
+def create_processor(settings: dict, fmt: dict, duration: float) -> URLClipProcessorV8:
+    """Create a processor whose stream resolves to the given yt-dlp format"""
+    processor = URLClipProcessorV8(settings=settings)
+    video_info = {'title': 'Fragment Test', 'duration': duration}
+    processor.url_processor.validate_url = lambda u: {
+        'valid': True, 'video_info': video_info, 'platform': 'test'
+    }
+    
+    def get_stream_url(url: str) -> str:
+        processor.fragment_stream = FragmentStream.from_format(fmt)
+        return fmt['url']
+    
+    processor._get_stream_url = get_stream_url
+    return processor
+
+
+def starts_match(source: Path, clips: list, work_dir: Path) -> bool:
+    """Check that every clip starts on the source frame at its planned start"""
+    for clip in clips:
+        expected = work_dir / "expected.jpg"
+        actual = work_dir / "actual.jpg"
+        if not (Thumbnails.extract_frame(str(source), expected, clip['start'])
+                and Thumbnails.extract_frame(clip['path'], actual)):
+            return False
+        with Image.open(expected) as a, Image.open(actual) as b:
+            difference = sum(ImageStat.Stat(ImageChops.difference(a.convert('L'), b.convert('L'))).mean)
+        if difference > 4:
+            print(f"❌ {Path(clip['path']).name} does not start at {clip['start']:.2f}s ({difference:.1f})")
+            return False
+    return True
+
+
+def test_playlist_parsing():
+    """Test fragment lists from playlists and yt-dlp formats, and range selection"""
+    print("Testing fragment lists...")
+    
+    playlist = "\n".join([
+        "#EXTM3U", "#EXT-X-TARGETDURATION:4",
+        '#EXT-X-MAP:URI="init.mp4",BYTERANGE="800@0"',
+        "#EXTINF:4.0,", "#EXT-X-BYTERANGE:1000@800", "media.mp4",
+        "#EXTINF:4.0,", "#EXT-X-BYTERANGE:1200", "media.mp4",
+        "#EXTINF:2.5,", "#EXT-X-BYTERANGE:900", "media.mp4",
+        "#EXT-X-ENDLIST"
+    ])
+    init, fragments, variants = FragmentStream.parse_playlist(playlist, "http://host/vod/index.m3u8")
+    print(f"Init {init}, ranges {[f['range'] for f in fragments]}")
+    if init != {'url': 'http://host/vod/init.mp4', 'range': (0, 799)} or variants:
+        return False
+    if [f['range'] for f in fragments] != [(800, 1799), (1800, 2999), (3000, 3899)]:
+        return False
+    
+    master = "#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=800000\nlow/index.m3u8\n" \
+             "#EXT-X-STREAM-INF:BANDWIDTH=5000000\nhigh/index.m3u8\n"
+    _, _, variants = FragmentStream.parse_playlist(master, "http://host/master.m3u8")
+    if variants != ['http://host/high/index.m3u8', 'http://host/low/index.m3u8']:
+        return False
+    try:
+        FragmentStream.parse_playlist('#EXTM3U\n#EXT-X-KEY:METHOD=AES-128,URI="k"\n', "http://host/")
+        return False
+    except ValueError:
+        pass
+    
+    # yt-dlp DASH fragments: init first, paths relative to the base URL
+    stream = FragmentStream.from_format({
+        'url': 'http://host/manifest.mpd', 'protocol': 'http_dash_segments', 'ext': 'mp4',
+        'fragment_base_url': 'http://host/dash/',
+        'fragments': [{'path': 'init.mp4'}] + [{'path': f'seg{n}.m4s', 'duration': 2.0} for n in range(30)]
+    })
+    selected = stream.select(21.0, 26.0)
+    print(f"21s-26s -> {[f['url'].rsplit('/', 1)[1] for f in selected]}")
+    if stream.init['url'] != 'http://host/dash/init.mp4' or stream.duration != 60.0:
+        return False
+    if [f['start'] for f in selected] != [20.0, 22.0, 24.0]:
+        return False
+    
+    # Progressive formats and DRM are not fragment streams
+    return FragmentStream.from_format({'url': 'http://host/v.mp4', 'protocol': 'https'}) is None and \
+        FragmentStream.from_format({'url': 'http://host/i.m3u8', 'protocol': 'm3u8_native',
+                                    'has_drm': True}) is None
+
+
+def test_hls_clips():
+    """Test exact clips from an HLS playlist and that a resume fetches only the missing range"""
+    print("Testing clips from HLS fragments...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source) or not create_hls(source, temp_path / "hls", 'fmp4'):
+            return False
+        
+        with RangeServer(temp_path) as server:
+            fmt = {'url': server.url("hls/index.m3u8"), 'protocol': 'm3u8_native', 'ext': 'mp4'}
+            settings = {'clip_cache_mb': 0, 'disk_reserve_mb': 0, 'url_workers': 2, 'url_encode_threads': 2}
+            result = create_processor(settings, fmt, 40.0).process_url_video(fmt['url'], temp_path / "out", 5)
+            stats = result.get('stream_stats') or {}
+            fetched = [name for name in server.segments() if name != 'init.mp4']
+            inits = server.segments().count('init.mp4')
+            print(f"{result.get('successful_clips')} clips, {len(fetched)} fragment requests, "
+                  f"{inits} init requests, stats {stats}")
+            if not result['success'] or result['successful_clips'] != 8:
+                return False
+            # Every fragment is fetched once (the init segment once per session), and nothing else
+            if len(fetched) != 20 or len(set(fetched)) != 20 or inits != 2:
+                return False
+            hls_bytes = sum(p.stat().st_size for p in (temp_path / "hls").glob("*.m4s")) + \
+                inits * (temp_path / "hls" / "init.mp4").stat().st_size
+            if stats['bytes_read'] != hls_bytes:
+                return False
+            
+            MediaProbe.clear_cache()
+            durations = [round(MediaProbe.get_video_info(path)['duration'], 2) for path in result['output_files']]
+            print(f"Clip durations: {durations}")
+            if any(abs(d - 5.0) > 0.1 for d in durations):
+                return False
+            clips = [{'path': path, 'start': 5.0 * n} for n, path in enumerate(result['output_files'])]
+            if not starts_match(source, clips[:4], temp_path):
+                return False
+            
+            # The clip at 25s-30s needs the fragments at 24s, 26s and 28s only
+            Path(result['output_files'][5]).unlink()
+            server.paths.clear()
+            resumed = create_processor(settings, fmt, 40.0).process_url_video(
+                fmt['url'], temp_path / "out", 5, resume=True
+            )
+            print(f"Resume fetched {server.segments()}")
+            return resumed['success'] and resumed['resumed_clips'] == 7 and \
+                server.segments() == ['init.mp4', 'seg_012.m4s', 'seg_013.m4s', 'seg_014.m4s'] and \
+                starts_match(source, [{'path': resumed['output_files'][5], 'start': 25.0}], temp_path)
+
+
+def test_fmp4_fragments():
+    """Test fMP4 fragments with an init segment listed by yt-dlp"""
+    print("Testing clips from fMP4 fragments...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 20) or not create_hls(source, temp_path / "dash", 'fmp4'):
+            return False
+        
+        with RangeServer(temp_path) as server:
+            init, fragments, _ = FragmentStream.parse_playlist(
+                (temp_path / "dash" / "index.m3u8").read_text(), server.url("dash/index.m3u8")
+            )
+            fmt = {
+                'url': server.url("dash/manifest.mpd"), 'protocol': 'http_dash_segments', 'ext': 'mp4',
+                'fragment_base_url': server.url("dash/"),
+                'fragments': [{'path': Path(init['url']).name}] +
+                             [{'path': Path(f['url']).name, 'duration': f['duration']} for f in fragments]
+            }
+            settings = {'clip_cache_mb': 0, 'disk_reserve_mb': 0, 'url_workers': 1}
+            processor = create_processor(settings, fmt, 20.0)
+            processor.FRAGMENT_BATCH_SECONDS = 8
+            result = processor.process_url_video(fmt['url'], temp_path / "out", 4)
+            print(f"{result.get('successful_clips')} clips, requests {server.segments()}")
+            if not result['success'] or result['successful_clips'] != 5:
+                return False
+            # Two clips per batch: each batch fetches the init segment and its own fragments
+            if server.segments().count('init.mp4') != 3 or len(server.segments()) != 13:
+                return False
+            
+            MediaProbe.clear_cache()
+            durations = [round(MediaProbe.get_video_info(path)['duration'], 2) for path in result['output_files']]
+            print(f"Clip durations: {durations}")
+            clips = [{'path': path, 'start': 4.0 * n} for n, path in enumerate(result['output_files'])]
+            return all(abs(d - 4.0) < 0.1 for d in durations) and starts_match(source, clips, temp_path)
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Fragment Stream Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Playlist Parsing", test_playlist_parsing),
+        ("HLS Clips", test_hls_clips),
+        ("fMP4 Fragments", test_fmp4_fragments),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Helpers for ClipForge
+Sample media and local servers shared by the test scripts
+"""
+
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from utils.ffmpeg_utils import FFmpegUtils
+
+
+def create_sample_video(path: Path, duration: float = 40, size: str = '320x180', gop: int = 50,
+                        crf: Optional[int] = None, audio_codec: Optional[str] = 'aac') -> bool:
+    """Create a small 25 fps test video with a keyframe every gop frames
+    
+    The audio track is a 440 Hz sine encoded with audio_codec (None leaves it out).
+    """
+    args = ['-f', 'lavfi', '-i', f"testsrc2=size={size}:rate=25"]
+    if audio_codec:
+        args += ['-f', 'lavfi', '-i', 'sine=frequency=440:sample_rate=44100']
+    args += ['-t', str(duration), '-c:v', 'libx264', '-g', str(gop)]
+    if crf is not None:
+        args += ['-crf', str(crf)]
+    args += ['-pix_fmt', 'yuv420p']
+    args += ['-c:a', audio_codec, '-shortest'] if audio_codec else ['-an']
+    returncode, stderr = FFmpegUtils.run_ffmpeg(args + [str(path)])
+    if returncode != 0:
+        print(f"❌ Could not create sample video: {stderr[-300:]}")
+    return returncode == 0
+
+
+class RangeServer:
+    """Serve a folder over HTTP with byte-range support
+    
+    Counts requests and bytes sent, and logs the requested paths.
+    """
+    
+    def __init__(self, directory: Path):
+        self.requests = 0
+        self.bytes_sent = 0
+        self.paths = []
+        self.lock = threading.Lock()
+        server = self
+        
+        class Handler(SimpleHTTPRequestHandler):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, directory=str(directory), **kwargs)
+            
+            def log_message(self, *args):
+                pass
+            
+            def do_GET(self):
+                with server.lock:
+                    server.requests += 1
+                    server.paths.append(self.path)
+                path = Path(self.translate_path(self.path))
+                data = path.read_bytes()
+                start, end = 0, len(data) - 1
+                match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get('Range', ''))
+                if match:
+                    start = int(match.group(1))
+                    end = int(match.group(2)) if match.group(2) else end
+                    self.send_response(206)
+                    self.send_header('Content-Range', f"bytes {start}-{end}/{len(data)}")
+                else:
+                    self.send_response(200)
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('Content-Type', self.guess_type(str(path)))
+                self.send_header('Content-Length', str(end - start + 1))
+                self.end_headers()
+                try:
+                    for offset in range(start, end + 1, 65536):
+                        chunk = data[offset:min(offset + 65536, end + 1)]
+                        self.wfile.write(chunk)
+                        with server.lock:
+                            server.bytes_sent += len(chunk)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+        
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+    
+    def url(self, name: str) -> str:
+        """Get the URL of a served file"""
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/{name}"
+    
+    def segments(self) -> list:
+        """Get the fragment files requested so far"""
+        return sorted(Path(path).name for path in self.paths if not path.endswith('.m3u8'))
+    
+    def __enter__(self):
+        self.thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
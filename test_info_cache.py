@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Info Cache
+Verifies that one URL job extracts the video info once, with canonical keys, expiry and the disk layer
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+import yt_dlp
+
+from processor.clip_cache import ClipCache
+from processor.url_processor import URLProcessor, InfoCache
+from processor.url_clip_processor_v8 import URLClipProcessorV8
+from test_helpers import create_sample_video, RangeServer
+
+
+class FakeExtractor:
+    """Stand in for yt_dlp.YoutubeDL while active, answering every URL with one info and counting calls"""
+    
+    def __init__(self, info: dict):
+        self.info = info
+        self.calls = 0
+        self.original = None
+    
+    def __enter__(self):
+        self.original = yt_dlp.YoutubeDL
+        extractor = self
+        
+        class YoutubeDL:
+            sanitize_info = staticmethod(extractor.original.sanitize_info)
+            
+            def __init__(self, opts=None):
+                pass
+            
+            def __enter__(self):
+                return self
+            
+            def __exit__(self, *exc):
+                pass
+            
+            def extract_info(self, url, download=False):
+                extractor.calls += 1
+                return dict(extractor.info)
+        
+        yt_dlp.YoutubeDL = YoutubeDL
+        return self
+    
+    def __exit__(self, *exc):
+        yt_dlp.YoutubeDL = self.original
+
+
+def create_info(url: str, expires_in: float) -> dict:
+    """Create a yt-dlp style info whose only format is a signed URL expiring after expires_in seconds"""
+    return {
+        'title': 'Info Cache Test', 'duration': 12, 'uploader': 'ClipForge', 'extractor': 'youtube',
+        'formats': [{
+            'format_id': '18', 'url': f"{url}?expire={int(time.time() + expires_in)}&sig=abc",
+            'ext': 'mp4', 'protocol': 'http', 'height': 180,
+            'vcodec': 'avc1.4d400d', 'acodec': 'mp4a.40.2'
+        }]
+    }
+
+
+def test_keys():
+    """Test canonical keys of the URLs of one video"""
+    print("Testing canonical keys...")
+    
+    youtube = [
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://youtube.com/watch?feature=share&v=dQw4w9WgXcQ&t=42",
+        "https://m.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://youtu.be/dQw4w9WgXcQ?si=xyz",
+        "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+        "https://www.youtube.com/embed/dQw4w9WgXcQ",
+    ]
+    keys = {InfoCache.get_key(url) for url in youtube}
+    print(f"YouTube: {keys}")
+    if keys != {'youtube:dQw4w9WgXcQ'}:
+        return False
+    
+    twitch = {InfoCache.get_key(url) for url in ("https://www.twitch.tv/videos/123456789",
+                                                  "https://twitch.tv/videos/123456789/")}
+    print(f"Twitch: {twitch}")
+    return twitch == {'twitch:123456789'} and \
+        InfoCache.get_key("https://www.youtube.com/watch?v=aaaaaaaaaaa") != 'youtube:dQw4w9WgXcQ' and \
+        InfoCache.get_key("https://www.twitch.tv/somechannel") == 'url:twitch.tv/somechannel'
+
+
+def test_expiry():
+    """Test that entries follow the stream URL's expiry and live streams are not cached"""
+    print("Testing expiry...")
+    InfoCache.clear()
+    url = "https://youtu.be/dQw4w9WgXcQ"
+    
+    # Expiring within the margin: never cached
+    InfoCache.put(url, create_info("http://host/v.mp4", InfoCache.EXPIRY_MARGIN - 60))
+    if InfoCache.get(url) is not None:
+        return False
+    
+    # Cached until the margin before the URL's expiry
+    info = create_info("http://host/v.mp4", InfoCache.EXPIRY_MARGIN + 1)
+    expiry = InfoCache.get_expiry(info)
+    InfoCache.put(url, info)
+    if InfoCache.get(url) is not info or abs(expiry - (time.time() + 1)) > 1:
+        return False
+    time.sleep(1.5)
+    if InfoCache.get(url) is not None:
+        print("❌ Expired entry was returned")
+        return False
+    
+    # No expiry in the URLs: default lifetime
+    unsigned = {'title': 'x', 'formats': [{'url': 'http://host/v.mp4'}]}
+    if abs(InfoCache.get_expiry(unsigned) - time.time() - InfoCache.DEFAULT_TTL) > 1:
+        return False
+    
+    InfoCache.put("https://www.twitch.tv/somechannel", dict(unsigned, is_live=True))
+    stats = InfoCache.get_stats()
+    print(f"Stats: {stats}")
+    return InfoCache.get("https://www.twitch.tv/somechannel") is None and \
+        stats['hits'] == 1 and stats['misses'] == 2
+
+
+def test_single_extraction():
+    """Test that preview, validation and stream lookup of one job extract the info once"""
+    print("Testing one extraction per URL job...")
+    InfoCache.clear()
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 12):
+            return False
+        
+        with RangeServer(temp_path) as server, \
+                FakeExtractor(create_info(server.url("sample.mp4"), 6 * 3600)) as extractor:
+            settings = {'clip_cache_mb': 0, 'disk_reserve_mb': 0, 'url_workers': 1}
+            preview = URLClipProcessorV8(settings=settings).get_video_preview(
+                "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+            )
+            # The job uses a different link to the same video
+            result = URLClipProcessorV8(settings=settings).process_url_video(
+                "https://youtu.be/dQw4w9WgXcQ", temp_path / "out", 4
+            )
+            
+            # With the cache off every step extracts again
+            InfoCache.clear()
+            uncached = URLClipProcessorV8(settings=dict(settings, url_info_cache='off')).process_url_video(
+                "https://youtu.be/dQw4w9WgXcQ", temp_path / "out", 4
+            )
+        
+        print(f"Preview valid: {preview['valid']}, clips: {result.get('successful_clips')}, "
+              f"extractions: {extractor.calls}, cache: {result.get('info_cache')}")
+        if not preview['valid'] or not result['success'] or result['successful_clips'] != 3:
+            return False
+        if not uncached['success'] or extractor.calls != 3:
+            print(f"❌ Expected 1 extraction with the cache and 2 without, got {extractor.calls}")
+            return False
+        return result['info_cache']['hits'] == 2 and result['info_cache']['misses'] == 1
+
+
+def test_links_share_clips():
+    """Test that resume and the clip cache find the clips of a job started from another link"""
+    print("Testing resume and clip cache across links to one video...")
+    InfoCache.clear()
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 12):
+            return False
+        
+        def create_processor():
+            processor = URLClipProcessorV8(settings={'disk_reserve_mb': 0, 'url_workers': 1})
+            processor.clip_cache = ClipCache(100, cache_dir=temp_path / "cache")
+            return processor
+        
+        with RangeServer(temp_path) as server, \
+                FakeExtractor(create_info(server.url("sample.mp4"), 6 * 3600)):
+            first = create_processor().process_url_video(
+                "https://youtu.be/dQw4w9WgXcQ", temp_path / "out", 4
+            )
+            resumed = create_processor().process_url_video(
+                "https://www.youtube.com/watch?v=dQw4w9WgXcQ&si=share", temp_path / "out", 4, resume=True
+            )
+            cached = create_processor().process_url_video(
+                "https://m.youtube.com/watch?v=dQw4w9WgXcQ", temp_path / "other", 4
+            )
+        
+        print(f"Resumed: {resumed.get('resumed_clips')}, cache hits: {cached.get('cache_hits')}")
+        return first['success'] and resumed['output_folder'] == first['output_folder'] and \
+            resumed['resumed_clips'] == 3 and cached['cache_hits'] == 3
+
+
+def test_disk_layer():
+    """Test that disk mode keeps infos across processes"""
+    print("Testing on-disk cache...")
+    InfoCache.clear()
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    
+    try:
+        with FakeExtractor(create_info("http://host/v.mp4", 6 * 3600)) as extractor:
+            processor = URLProcessor({'url_info_cache': 'disk'})
+            first = processor.extract_info(url, {})
+            # A new process starts with an empty memory cache
+            InfoCache._entries.clear()
+            second = processor.extract_info("https://youtu.be/dQw4w9WgXcQ", {})
+            memory_only = URLProcessor({'url_info_cache': 'memory'})
+            InfoCache._entries.clear()
+            third = memory_only.extract_info(url, {})
+        
+        print(f"Extractions: {extractor.calls}, stats {InfoCache.get_stats()}")
+        # JSON on disk keeps the fields (sanitize_info adds yt-dlp's own bookkeeping keys)
+        return extractor.calls == 2 and third == first and \
+            {k: second[k] for k in first} == first
+    finally:
+        InfoCache.clear()
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Info Cache Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Keys", test_keys),
+        ("Expiry", test_expiry),
+        ("Single Extraction", test_single_extraction),
+        ("Links Share Clips", test_links_share_clips),
+        ("Disk Layer", test_disk_layer),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Keyframe-Aware Clip Planner
+Verifies keyframe snapping and the cached keyframe index
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from processor.clip_planner import ClipPlanner
+from processor.keyframe_index import KeyframeIndex
+from processor.video_splitter import VideoSplitter
+from utils.ffmpeg_utils import FFmpegUtils
+from test_helpers import create_sample_video
+
+
+def test_snap_to_keyframes():
+    """Test boundary snapping within tolerance"""
+    print("Testing keyframe snapping...")
+    
+    keyframes = [0.0, 9.0, 21.5, 33.0]
+    clips = ClipPlanner.plan_clips(40, 10, keyframes, 1.5)
+    boundaries = [clip['start'] for clip in clips] + [clips[-1]['end']]
+    print(f"Boundaries: {boundaries}")
+    
+    # 10 -> 9 (within 1.5s), 20 -> 21.5 (within 1.5s), 30 stays (no keyframe in range)
+    if boundaries != [0.0, 9.0, 21.5, 30.0, 40.0]:
+        print("❌ Unexpected boundaries")
+        return False
+    
+    if ClipPlanner.plan_clips(40, 10, keyframes, 0) != ClipPlanner.fixed_clips(40, 10):
+        print("❌ Zero tolerance should keep fixed offsets")
+        return False
+    
+    return True
+
+
+def test_keyframe_index_cache():
+    """Test that the keyframe index is built once and then served from cache"""
+    print("Testing keyframe index cache...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = Path(temp_dir) / "sample.mp4"
+        if not create_sample_video(source, gop=75):
+            return False
+        
+        index = KeyframeIndex()
+        keyframes = index.get_keyframes(str(source))
+        print(f"✅ Keyframes: {keyframes}")
+        if keyframes[:3] != [0.0, 3.0, 6.0]:
+            print("❌ Unexpected keyframes")
+            return False
+        
+        # Disk cache survives a fresh instance with an empty memory cache
+        index.clear_memory_cache()
+        start = time.time()
+        cached = KeyframeIndex().get_keyframes(str(source))
+        print(f"✅ Cached lookup took {time.time() - start:.4f}s")
+        
+        return cached == keyframes
+
+
+def test_keyframes_after_container_start():
+    """Test that keyframe times count from the container start when video starts later"""
+    print("Testing keyframes of a late-starting video stream...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = Path(temp_dir) / "sample.mp4"
+        late = Path(temp_dir) / "late.mkv"
+        if not create_sample_video(source, 12, gop=75):
+            return False
+        # Video 1s after the audio, and the whole file 5s after zero
+        returncode, stderr = FFmpegUtils.run_ffmpeg([
+            '-itsoffset', '1', '-i', str(source), '-i', str(source), '-map', '0:v', '-map', '1:a',
+            '-c', 'copy', '-output_ts_offset', '5', str(late)
+        ])
+        if returncode != 0:
+            print(f"❌ Could not remux sample: {stderr[-300:]}")
+            return False
+        
+        keyframes = FFmpegUtils.get_keyframe_times(str(late))
+        print(f"Keyframes: {keyframes}")
+        steps = [round(b - a, 3) for a, b in zip(keyframes, keyframes[1:])]
+        return len(keyframes) == 4 and 1.0 <= keyframes[0] < 1.1 and steps == [3.0] * 3
+
+
+def test_copy_mode_with_snapping():
+    """Test that snapped copy-mode clips start on the planned keyframes"""
+    print("Testing copy mode with keyframe snapping...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, gop=75):
+            return False
+        
+        splitter = VideoSplitter(settings={'keyframe_tolerance': 2, 'clip_cache_mb': 0})
+        result = splitter.process_video(str(source), temp_path / "clips", 10, mode='copy')
+        if not result['success']:
+            print(f"❌ Processing failed: {result['error']}")
+            return False
+        
+        starts = [round(clip['start'], 2) for clip in result['clips']]
+        print(f"Clip starts: {starts}")
+        
+        # 10 -> 9, 20 -> 21, 30 -> 30 on a 3s GOP
+        return starts == [0.0, 9.0, 21.0, 30.0]
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Keyframe Planner Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Snap To Keyframes", test_snap_to_keyframes),
+        ("Keyframe Index Cache", test_keyframe_index_cache),
+        ("Late Video Start", test_keyframes_after_container_start),
+        ("Copy Mode With Snapping", test_copy_mode_with_snapping),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
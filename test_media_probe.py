@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Media Probe
+Verifies the lightweight metadata probe and its persistent cache
+"""
+
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from utils.media_probe import MediaProbe
+from utils.file_utils import FileUtils
+from test_helpers import create_sample_video
+
+
+def test_probe_fields():
+    """Test that the probe reads the same fields moviepy used to"""
+    print("Testing probe fields...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = Path(temp_dir) / "sample.mp4"
+        if not create_sample_video(source, 6):
+            return False
+        
+        info = FileUtils.get_video_info(str(source))
+        print(f"Video info: {info}")
+        if not info:
+            print("❌ No video info")
+            return False
+        
+        if abs(info['duration'] - 6) > 0.1 or info['fps'] != 25 or info['size'] != (320, 180):
+            print("❌ Unexpected duration, fps or size")
+            return False
+        
+        if info['video_codec'] != 'h264' or not info['has_audio']:
+            print("❌ Unexpected stream info")
+            return False
+        
+        return info['filename'] == "sample.mp4" and info['file_size'] == source.stat().st_size
+
+
+def test_probe_cache():
+    """Test that a file is probed once and re-probed only after it changes"""
+    print("Testing probe cache...")
+    
+    probe_calls = []
+    original_probe = MediaProbe._probe
+    
+    def counting_probe(video_path):
+        probe_calls.append(video_path)
+        return original_probe(video_path)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = Path(temp_dir) / "sample.mp4"
+        if not create_sample_video(source, 6):
+            return False
+        
+        MediaProbe._probe = staticmethod(counting_probe)
+        try:
+            first = MediaProbe.get_video_info(str(source))
+            MediaProbe.get_video_info(str(source))
+            
+            # Drop the in-memory copy so the next lookup comes from disk
+            MediaProbe._cache = None
+            start = time.time()
+            cached = MediaProbe.get_video_info(str(source))
+            print(f"✅ Cached lookup took {time.time() - start:.4f}s")
+            
+            if len(probe_calls) != 1 or cached != first:
+                print(f"❌ Expected one probe, got {len(probe_calls)}")
+                return False
+            
+            # A modified file gets a new signature and is probed again
+            stat = source.stat()
+            os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            MediaProbe.get_video_info(str(source))
+            if len(probe_calls) != 2:
+                print("❌ Modified file was not re-probed")
+                return False
+        finally:
+            MediaProbe._probe = original_probe
+        
+        return True
+
+
+def test_missing_file():
+    """Test that an unreadable file returns None"""
+    print("Testing missing file...")
+    return MediaProbe.get_video_info("/nonexistent/video.mp4") is None
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Media Probe Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Probe Fields", test_probe_fields),
+        ("Probe Cache", test_probe_cache),
+        ("Missing File", test_missing_file),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Output Presets
+Verifies that output presets resize clips inside the ffmpeg encode in every mode,
+and benchmarks them against resizing frames in Python with moviepy
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from moviepy.editor import VideoFileClip
+from processor.video_splitter import VideoSplitter
+from processor.output_presets import OutputPresets
+from utils.ffmpeg_utils import FFmpegUtils
+from utils.media_probe import MediaProbe
+from test_helpers import create_sample_video
+
+
+def get_size(video_path: str) -> tuple:
+    """Get the (width, height) of a video"""
+    MediaProbe.clear_cache()
+    info = MediaProbe.get_video_info(video_path)
+    return info['size'] if info else (0, 0)
+
+
+def test_preset_sizes():
+    """Test the frame size each preset produces"""
+    print("Testing preset sizes...")
+    
+    expected = {
+        'original': (320, 180),
+        'vertical_720': (720, 1280),
+        'square_1080': (1080, 1080),
+        # Never upscaled
+        'downscale_720': (320, 180),
+    }
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 4):
+            return False
+        
+        for preset, size in expected.items():
+            settings = {'output_preset': preset, 'clip_cache_mb': 0}
+            result = VideoSplitter(settings=settings).process_video(str(source), temp_path / preset,
+                                                                    4, mode='single_pass')
+            if not result['success']:
+                print(f"❌ {preset}: {result.get('error')}")
+                return False
+            actual = get_size(result['output_files'][0])
+            print(f"{preset}: {actual}")
+            if actual != size:
+                print(f"❌ {preset}: expected {size}")
+                return False
+        
+        large = temp_path / "large.mp4"
+        if not create_sample_video(large, 2, size='1920x1080'):
+            return False
+        result = VideoSplitter(settings={'output_preset': 'downscale_720', 'clip_cache_mb': 0}
+                               ).process_video(str(large), temp_path / "large", 4, mode='single_pass')
+        actual = get_size(result['output_files'][0])
+        print(f"downscale_720 (1080p source): {actual}")
+        if actual != (1280, 720):
+            return False
+        
+        try:
+            OutputPresets.get_filter('imax')
+            print("❌ Unknown preset was accepted")
+            return False
+        except ValueError:
+            return True
+
+
+def test_preset_modes():
+    """Test that every re-encoding mode applies the preset and stream copy keeps the source size"""
+    print("Testing presets in every mode...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 8):
+            return False
+        
+        settings = {'output_preset': 'vertical_720', 'clip_cache_mb': 0,
+                    'parallel_workers': 2, 'ffmpeg_threads': 1}
+        for mode in ('single_pass', 'parallel', 'smart', 'reencode', 'copy'):
+            result = VideoSplitter(settings=settings).process_video(str(source), temp_path / mode,
+                                                                    4, mode=mode)
+            if not result['success'] or result['clips_count'] != 2:
+                print(f"❌ {mode}: {result.get('error')}")
+                return False
+            sizes = {get_size(path) for path in result['output_files']}
+            print(f"{mode}: {sizes}")
+            expected = (320, 180) if mode == 'copy' else (720, 1280)
+            if sizes != {expected}:
+                print(f"❌ {mode}: expected {expected}")
+                return False
+        return True
+
+
+def resize_frame_in_python(frame: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Scale to cover width x height and crop the center, one frame at a time
+    
+    This is what moviepy's resize and crop effects do: each frame is converted
+    to a PIL image, resampled, and sliced back out as a NumPy array.
+    """
+    source_height, source_width = frame.shape[:2]
+    scale = max(width / source_width, height / source_height)
+    scaled_size = (round(source_width * scale), round(source_height * scale))
+    scaled = np.array(Image.fromarray(frame).resize(scaled_size, Image.LANCZOS))
+    left = (scaled_size[0] - width) // 2
+    top = (scaled_size[1] - height) // 2
+    return scaled[top:top + height, left:left + width]
+
+
+def test_benchmark_vs_moviepy():
+    """Benchmark a 9:16 crop in the ffmpeg encode against the moviepy per-frame resize path"""
+    print("Benchmarking ffmpeg filter vs moviepy resize...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 4, size='1280x720'):
+            return False
+        
+        # moviepy 1.0.3's resize effect calls PIL's removed ANTIALIAS filter, so the
+        # same per-frame PIL resize is applied through fl_image
+        start = time.time()
+        video = VideoFileClip(str(source))
+        resized = video.fl_image(lambda frame: resize_frame_in_python(frame, 720, 1280))
+        moviepy_path = temp_path / "moviepy.mp4"
+        resized.write_videofile(str(moviepy_path), codec=VideoSplitter.VIDEO_CODEC, audio=False,
+                                verbose=False, logger=None,
+                                ffmpeg_params=['-preset', VideoSplitter.PRESET,
+                                               '-crf', str(VideoSplitter.CRF)])
+        video.close()
+        moviepy_time = time.time() - start
+        
+        start = time.time()
+        ffmpeg_path = temp_path / "ffmpeg.mp4"
+        returncode, stderr = FFmpegUtils.run_ffmpeg([
+            '-i', str(source), '-an',
+            '-vf', OutputPresets.get_filter('vertical_720'),
+            '-c:v', VideoSplitter.VIDEO_CODEC, '-preset', VideoSplitter.PRESET,
+            '-crf', str(VideoSplitter.CRF), '-pix_fmt', 'yuv420p', str(ffmpeg_path)
+        ])
+        ffmpeg_time = time.time() - start
+        if returncode != 0:
+            print(f"❌ ffmpeg encode failed: {stderr[-300:]}")
+            return False
+        
+        print(f"moviepy resize: {moviepy_time:.2f}s, ffmpeg filter: {ffmpeg_time:.2f}s "
+              f"({moviepy_time / ffmpeg_time:.1f}x faster)")
+        if {get_size(str(moviepy_path)), get_size(str(ffmpeg_path))} != {(720, 1280)}:
+            print("❌ Outputs differ in size")
+            return False
+        return ffmpeg_time < moviepy_time
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Output Presets Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Preset Sizes", test_preset_sizes),
+        ("Preset Modes", test_preset_modes),
+        ("Benchmark vs MoviePy", test_benchmark_vs_moviepy),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Parallel Split Mode
+Verifies that clips encoded by several ffmpeg workers come out in order and frame-accurate
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from processor.video_splitter import VideoSplitter
+from test_helpers import create_sample_video
+
+
+def test_parallel_budget():
+    """Test worker and thread budget calculation"""
+    print("Testing parallel budget...")
+
+    splitter = VideoSplitter(settings={'parallel_workers': 3, 'ffmpeg_threads': 4})
+    if splitter.get_parallel_budget() != (3, 4):
+        print(f"❌ Unexpected budget: {splitter.get_parallel_budget()}")
+        return False
+
+    workers, threads = VideoSplitter(settings={'ffmpeg_threads': 1}).get_parallel_budget()
+    print(f"✅ Auto budget: {workers} workers x {threads} threads")
+
+    clips = splitter.calculate_clips(100, 10)
+    shards = splitter._shard_clips(clips, 3)
+    if [len(shard) for shard in shards] != [4, 4, 2]:
+        print(f"❌ Unexpected shards: {[len(shard) for shard in shards]}")
+        return False
+
+    return workers >= 1 and threads == 1
+
+
+def test_parallel_mode():
+    """Test parallel split mode"""
+    print("Testing parallel split mode...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source):
+            return False
+
+        progress_values = []
+        splitter = VideoSplitter(progress_values.append,
+                                 settings={'parallel_workers': 2, 'ffmpeg_threads': 1, 'clip_cache_mb': 0})
+        result = splitter.process_video(str(source), temp_path / "clips", 10, mode='parallel')
+
+        if not result['success']:
+            print(f"❌ Processing failed: {result['error']}")
+            return False
+
+        for clip in result['clips']:
+            print(f"   {Path(clip['path']).name}: {clip['start']:.2f}s - {clip['end']:.2f}s")
+
+        names = [Path(f).name for f in result['output_files']]
+        if names != [f"sample_clip_{i:03d}_10s.mp4" for i in range(1, 5)]:
+            print(f"❌ Unexpected clip names: {names}")
+            return False
+
+        starts = [clip['start'] for clip in result['clips']]
+        if any(abs(actual - expected) > 0.05 for actual, expected in zip(starts, [0, 10, 20, 30])):
+            print(f"❌ Clips out of order or not frame accurate: {starts}")
+            return False
+
+        if not progress_values or progress_values != sorted(progress_values):
+            print("❌ Aggregated progress is not monotonic")
+            return False
+
+        return True
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Parallel Split Test")
+    print("=" * 60)
+
+    tests = [
+        ("Parallel Budget", test_parallel_budget),
+        ("Parallel Mode", test_parallel_mode),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Resumable Jobs
+Verifies that a resumed job reuses its output folder and only encodes missing or corrupt clips
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from processor.video_splitter import VideoSplitter
+from processor.clip_manifest import ClipManifest
+from utils.ffmpeg_utils import FFmpegUtils
+from utils.media_probe import MediaProbe
+from test_helpers import create_sample_video
+
+
+def count_encoded_seconds(calls: list) -> float:
+    """Sum the -t durations of recorded ffmpeg video encodes"""
+    total = 0.0
+    for args in calls:
+        if '-c:v' in args and '-t' in args:
+            total += float(args[args.index('-t') + 1])
+    return total
+
+
+def test_resume_modes():
+    """Test that each mode re-encodes only the deleted and corrupted clips"""
+    print("Testing resume in every mode...")
+    
+    calls = []
+    original_run_ffmpeg = FFmpegUtils.run_ffmpeg
+    
+    def recording_run_ffmpeg(args, *extra, **kwargs):
+        calls.append(list(args))
+        return original_run_ffmpeg(args, *extra, **kwargs)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 16):
+            return False
+        
+        FFmpegUtils.run_ffmpeg = staticmethod(recording_run_ffmpeg)
+        try:
+            for mode in ('copy', 'single_pass', 'parallel', 'smart', 'reencode'):
+                output_base = temp_path / mode
+                settings = {'parallel_workers': 2, 'ffmpeg_threads': 1, 'clip_cache_mb': 0}
+                first = VideoSplitter(settings=settings).process_video(str(source), output_base, 4, mode=mode)
+                if not first['success'] or first['clips_count'] != 4:
+                    print(f"❌ {mode}: first run failed: {first.get('error')}")
+                    return False
+                
+                # Recording clips must not fill the probe cache with them
+                if any(str(first['output_folder']) in key for key in MediaProbe._load_cache()):
+                    print(f"❌ {mode}: clips were added to the probe cache")
+                    return False
+                
+                # Simulate an interrupted job: one clip missing, one truncated
+                clips = [Path(p) for p in first['output_files']]
+                clips[1].unlink()
+                with open(clips[3], 'r+b') as f:
+                    f.truncate(1000)
+                
+                calls.clear()
+                second = VideoSplitter(settings=settings).process_video(
+                    str(source), output_base, 4, mode=mode, resume=True
+                )
+                if not second['success'] or second['clips_count'] != 4:
+                    print(f"❌ {mode}: resumed run failed: {second.get('error')}")
+                    return False
+                
+                print(f"✅ {mode}: resumed {second['resumed_clips']} clips, "
+                      f"encoded {count_encoded_seconds(calls):.1f}s")
+                if second['output_folder'] != first['output_folder']:
+                    print(f"❌ {mode}: resume used a new folder")
+                    return False
+                if second['resumed_clips'] != 2:
+                    print(f"❌ {mode}: expected 2 resumed clips")
+                    return False
+                if [Path(p).name for p in second['output_files']] != [c.name for c in clips]:
+                    print(f"❌ {mode}: clip names changed")
+                    return False
+                if mode != 'copy' and count_encoded_seconds(calls) > 8.5:
+                    print(f"❌ {mode}: more than the two missing clips were encoded")
+                    return False
+                
+                # Nothing left to do on a third run
+                third = VideoSplitter(settings=settings).process_video(
+                    str(source), output_base, 4, mode=mode, resume=True
+                )
+                if third['resumed_clips'] != 4:
+                    print(f"❌ {mode}: completed job was not fully reused")
+                    return False
+                
+                leftovers = [p.name for p in Path(first['output_folder']).iterdir()
+                             if p.name not in {c.name for c in clips} | {ClipManifest.FILENAME}]
+                if leftovers:
+                    print(f"❌ {mode}: unexpected files in output: {leftovers}")
+                    return False
+        finally:
+            FFmpegUtils.run_ffmpeg = original_run_ffmpeg
+        
+        return True
+
+
+def test_manifest_mismatch():
+    """Test that a different clip duration or changed source starts a new folder"""
+    print("Testing manifest mismatch...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 8):
+            return False
+        
+        output_base = temp_path / "clips"
+        settings = {'clip_cache_mb': 0}
+        first = VideoSplitter(settings=settings).process_video(str(source), output_base, 4, mode='copy')
+        other_duration = VideoSplitter(settings=settings).process_video(str(source), output_base, 2,
+                                                                        mode='copy', resume=True)
+        if other_duration['output_folder'] == first['output_folder']:
+            print("❌ A different clip duration reused the folder")
+            return False
+        
+        # Rewriting the source with different content changes its fingerprint
+        if not create_sample_video(source, 9):
+            return False
+        changed = VideoSplitter(settings=settings).process_video(str(source), output_base, 4,
+                                                                 mode='copy', resume=True)
+        print(f"Folders: {Path(first['output_folder']).name}, "
+              f"{Path(other_duration['output_folder']).name}, {Path(changed['output_folder']).name}")
+        folders = {first['output_folder'], other_duration['output_folder'], changed['output_folder']}
+        return len(folders) == 3 and changed['resumed_clips'] == 0
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Resume Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Resume Modes", test_resume_modes),
+        ("Manifest Mismatch", test_manifest_mismatch),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
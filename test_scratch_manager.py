@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Scratch Manager
+Verifies per-job scratch directories, RAM/disk placement and stale cleanup
+"""
+
+import os
+import sys
+import subprocess
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from utils.scratch_manager import ScratchManager
+from processor.video_splitter import VideoSplitter
+from test_helpers import create_sample_video
+
+
+def test_job_directories():
+    """Test that jobs and clips get separate directories that are removed on cleanup"""
+    print("Testing job directories...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager = ScratchManager(budget_mb=0)
+        first = manager.create_job("same name", output_dir=Path(temp_dir))
+        second = manager.create_job("same name", output_dir=Path(temp_dir))
+        
+        if first.path == second.path or first.in_ram:
+            print("❌ Jobs share a directory or a zero budget used RAM")
+            return False
+        
+        if first.path.parent != Path(temp_dir) / ScratchManager.OUTPUT_SCRATCH_NAME:
+            print(f"❌ Disk scratch is not next to the output: {first.path}")
+            return False
+        
+        if first.clip_dir(0) == first.clip_dir(1):
+            print("❌ Clips share a directory")
+            return False
+        
+        (first.clip_dir(0) / "temp-audio.m4a").write_bytes(b"x" * 100)
+        if first.get_usage() < 100:
+            print("❌ Usage not reported")
+            return False
+        
+        with second:
+            pass
+        first.cleanup()
+        
+        leftovers = list(Path(temp_dir).iterdir())
+        print(f"Leftovers after cleanup: {leftovers}")
+        return not leftovers
+
+
+def test_ram_placement():
+    """Test that small jobs go to RAM when /dev/shm is available"""
+    print("Testing RAM placement...")
+    
+    manager = ScratchManager(budget_mb=64)
+    if manager.get_ram_root(1024) is None:
+        print("⚠️ No RAM-backed scratch available, skipping")
+        return True
+    
+    with manager.create_job("ram", estimated_bytes=1024) as job:
+        if not job.in_ram:
+            print("❌ Small job was not placed in RAM")
+            return False
+    
+    # Jobs larger than the budget go to disk
+    return manager.get_ram_root(128 * 1024 * 1024) is None
+
+
+def test_stale_cleanup():
+    """Test that directories left by a dead process are removed"""
+    print("Testing stale directory cleanup...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager = ScratchManager(budget_mb=0)
+        root = manager.get_disk_root(Path(temp_dir))
+        root.mkdir(parents=True)
+        
+        # A process that has already exited stands in for a crashed run
+        dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+        dead.wait()
+        stale = root / f"{ScratchManager.DIR_PREFIX}crashed_x"
+        stale.mkdir()
+        (stale / ScratchManager.OWNER_FILE).write_text(str(dead.pid), encoding='utf-8')
+        
+        with manager.create_job("new", output_dir=Path(temp_dir)):
+            pass
+        
+        if sys.platform == 'win32':
+            return True
+        return not stale.exists()
+
+
+def test_splitter_leaves_no_temp_files():
+    """Test that a moviepy re-encode leaves nothing in the working directory or output"""
+    print("Testing splitter temp files...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 4):
+            return False
+        
+        work_dir = temp_path / "cwd"
+        work_dir.mkdir()
+        previous_cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            splitter = VideoSplitter(settings={'scratch_prefer_ram': False, 'clip_cache_mb': 0})
+            result = splitter.process_video(str(source), temp_path / "clips", 2, mode='reencode')
+        finally:
+            os.chdir(previous_cwd)
+        
+        if not result['success'] or result['clips_count'] != 2:
+            print(f"❌ Processing failed: {result.get('error')}")
+            return False
+        
+        leftovers = list(work_dir.iterdir()) + list((temp_path / "clips").glob(".*"))
+        print(f"Leftovers: {leftovers}")
+        return not leftovers
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Scratch Manager Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Job Directories", test_job_directories),
+        ("RAM Placement", test_ram_placement),
+        ("Stale Cleanup", test_stale_cleanup),
+        ("Splitter Temp Files", test_splitter_leaves_no_temp_files),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Separate Audio
+Verifies best video + best audio format selection and clips muxed from separate video and audio streams
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from processor.format_selector import FormatSelector
+from processor.fragment_stream import FragmentStream
+from processor.url_clip_processor_v8 import URLClipProcessorV8
+from utils.ffmpeg_utils import FFmpegUtils
+from utils.media_probe import MediaProbe
+from test_helpers import create_sample_video, RangeServer
+
+
+def create_sample_streams(folder: Path, duration: int = 24) -> bool:
+    """Create a video-only MP4 with a 2s GOP and a separate Opus audio track"""
+    if not create_sample_video(folder / "video.mp4", duration, size='640x360', audio_codec=None):
+        return False
+    returncode, stderr = FFmpegUtils.run_ffmpeg([
+        '-f', 'lavfi', '-i', f'sine=frequency=440:sample_rate=48000:duration={duration}',
+        '-c:a', 'libopus', '-b:a', '64k', str(folder / "audio.webm")
+    ])
+    if returncode != 0:
+        print(f"❌ Could not create sample audio: {stderr[-300:]}")
+    return returncode == 0
+
+
+def create_hls(source: Path, folder: Path, fragment_seconds: int) -> bool:
+    """Package one track as a VOD HLS playlist of fMP4 fragments"""
+    folder.mkdir()
+    returncode, stderr = FFmpegUtils.run_ffmpeg([
+        '-i', str(source), '-c', 'copy', '-f', 'hls', '-hls_time', str(fragment_seconds),
+        '-hls_playlist_type', 'vod', '-hls_segment_type', 'fmp4',
+        '-hls_segment_filename', str(folder / "seg_%03d.m4s"),
+        str(folder / "index.m3u8")
+    ])
+    if returncode != 0:
+        print(f"❌ Could not create HLS playlist: {stderr[-300:]}")
+    return returncode == 0
+
+
+def create_processor(settings: dict, video_fmt: dict, audio_fmt: dict) -> URLClipProcessorV8:
+    """Create a processor whose stream resolves to the given video and audio formats"""
+    processor = URLClipProcessorV8(settings=settings)
+    video_info = {'title': 'Separate Audio Test', 'duration': 24.0}
+    processor.url_processor.validate_url = lambda u: {
+        'valid': True, 'video_info': video_info, 'platform': 'test'
+    }
+    
+    def get_stream_url(url: str) -> str:
+        processor.fragment_stream = FragmentStream.from_format(video_fmt)
+        processor.audio_url = audio_fmt['url']
+        processor.audio_fragment_stream = FragmentStream.from_format(audio_fmt)
+        return video_fmt['url']
+    
+    processor._get_stream_url = get_stream_url
+    return processor
+
+
+def check_clips(result: dict) -> bool:
+    """Check that clips are 4s, keep the video size and carry the copied Opus audio"""
+    MediaProbe.clear_cache()
+    infos = [MediaProbe.get_video_info(path) for path in result['output_files']]
+    print(f"Clips: {[(round(i['duration'], 2), i['size'], i['audio_codec']) for i in infos]}")
+    return len(infos) == 6 and all(
+        abs(info['duration'] - 4.0) < 0.1 and tuple(info['size']) == (640, 360)
+        and info['audio_codec'] == 'opus'
+        for info in infos
+    )
+
+
+def test_format_selection():
+    """Test picking video-only + audio-only formats over combined ones"""
+    print("Testing format selection...")
+    
+    formats = [
+        {'format_id': '18', 'url': 'u18', 'vcodec': 'avc1.42001E', 'acodec': 'mp4a.40.2', 'height': 360},
+        {'format_id': '137', 'url': 'u137', 'vcodec': 'avc1.640028', 'acodec': 'none', 'height': 1080, 'tbr': 4000},
+        {'format_id': '248', 'url': 'u248', 'vcodec': 'vp09.00.40.08', 'acodec': 'none', 'height': 1080, 'tbr': 3500},
+        {'format_id': '271', 'url': 'u271', 'vcodec': 'vp9', 'acodec': 'none', 'height': 1440, 'tbr': 9000},
+        {'format_id': '136', 'url': 'u136', 'vcodec': 'avc1.4d401f', 'acodec': 'none', 'height': 720, 'tbr': 2000},
+        {'format_id': '140', 'url': 'u140', 'vcodec': 'none', 'acodec': 'mp4a.40.2', 'abr': 129},
+        {'format_id': '251', 'url': 'u251', 'vcodec': 'none', 'acodec': 'opus', 'abr': 160},
+        {'format_id': 'x', 'url': 'ux', 'vcodec': 'none', 'acodec': 'vorbis', 'abr': 320},
+    ]
+    
+    def ids(selection):
+        return tuple(fmt['format_id'] if fmt else None for fmt in selection)
+    
+    cases = [
+        (FormatSelector(video_codec='avc1'), '137', '140'),
+        (FormatSelector(), '137', '140'),
+        (FormatSelector(video_codec='vp9'), '248', '140'),
+        (FormatSelector(max_height=0, video_codec='avc1'), '271', '140'),
+        (FormatSelector(max_height=720), '136', '140'),
+    ]
+    for selector, video, audio in cases:
+        selection = ids(selector.select(formats))
+        print(f"{selector.max_height or 'any'}p {selector.video_codec}: {selection}")
+        if selection != (video, audio):
+            return False
+    
+    # Only copyable audio: without it the combined format is kept
+    no_audio = [fmt for fmt in formats if fmt['format_id'] not in ('140', '251')]
+    if ids(FormatSelector().select(no_audio)) != ('18', None):
+        return False
+    # Unusable formats are skipped
+    if ids(FormatSelector().select(formats, lambda fmt: fmt['format_id'] not in ('137', '140'))) != ('248', '251'):
+        return False
+    
+    settings = FormatSelector.from_settings({'url_max_height': 480, 'url_video_codec': 'av01'})
+    defaults = FormatSelector.from_settings({})
+    return (settings.max_height, settings.video_codec) == (480, 'av01') and \
+        (defaults.max_height, defaults.video_codec) == (1080, 'any')
+
+
+def test_separate_streams():
+    """Test clips streamed from a video-only and an audio-only file in one session"""
+    print("Testing clips from separate video and audio streams...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        if not create_sample_streams(temp_path):
+            return False
+        
+        with RangeServer(temp_path) as server:
+            video_fmt = {'url': server.url("video.mp4"), 'protocol': 'http'}
+            audio_fmt = {'url': server.url("audio.webm"), 'protocol': 'http'}
+            settings = {'clip_cache_mb': 0, 'disk_reserve_mb': 0, 'url_workers': 1}
+            result = create_processor(settings, video_fmt, audio_fmt).process_url_video(
+                video_fmt['url'], temp_path / "out", 4
+            )
+        
+        stats = result.get('stream_stats') or {}
+        print(f"{result.get('successful_clips')} clips, stream stats {stats}")
+        if not result['success'] or result['successful_clips'] != 6 or stats.get('opens') != 1:
+            return False
+        if URLClipProcessorV8._host_connections:
+            print("❌ Host connections were not released")
+            return False
+        return check_clips(result)
+
+
+def test_separate_fragments():
+    """Test clips from separately fragmented video and audio with different fragment lengths"""
+    print("Testing clips from separate video and audio fragments...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        if not (create_sample_streams(temp_path)
+                and create_hls(temp_path / "video.mp4", temp_path / "video", 2)
+                and create_hls(temp_path / "audio.webm", temp_path / "audio", 3)):
+            return False
+        
+        with RangeServer(temp_path) as server:
+            video_fmt = {'url': server.url("video/index.m3u8"), 'protocol': 'm3u8_native'}
+            audio_fmt = {'url': server.url("audio/index.m3u8"), 'protocol': 'm3u8_native'}
+            settings = {'clip_cache_mb': 0, 'disk_reserve_mb': 0, 'url_workers': 2,
+                        'url_encode_threads': 2}
+            result = create_processor(settings, video_fmt, audio_fmt).process_url_video(
+                video_fmt['url'], temp_path / "out", 4
+            )
+        
+        stats = result.get('stream_stats') or {}
+        print(f"{result.get('successful_clips')} clips, stream stats {stats}")
+        if not result['success'] or result['successful_clips'] != 6:
+            return False
+        # Every video and audio fragment is fetched once, plus both init segments per session
+        expected = len(list((temp_path / "video").glob("*.m4s"))) + \
+            len(list((temp_path / "audio").glob("*.m4s"))) + 2 * 2
+        if stats.get('fragments') != expected:
+            print(f"❌ Fetched {stats.get('fragments')} fragments, expected {expected}")
+            return False
+        return check_clips(result)
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Separate Audio Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Format Selection", test_format_selection),
+        ("Separate Streams", test_separate_streams),
+        ("Separate Fragments", test_separate_fragments),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Single-Pass Split Mode
+Verifies that one ffmpeg run produces frame-accurate clips at the requested boundaries
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from processor.video_splitter import VideoSplitter
+from test_helpers import create_sample_video
+
+
+def test_single_pass_mode():
+    """Test single-pass re-encode split mode"""
+    print("Testing single-pass split mode...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source):
+            return False
+
+        splitter = VideoSplitter(settings={'clip_cache_mb': 0})
+        result = splitter.process_video(str(source), temp_path / "clips", 15, mode='single_pass')
+
+        if not result['success']:
+            print(f"❌ Processing failed: {result['error']}")
+            return False
+
+        for clip in result['clips']:
+            print(f"   {Path(clip['path']).name}: {clip['start']:.2f}s - {clip['end']:.2f}s")
+
+        if result['clips_count'] != 3:
+            print(f"❌ Expected 3 clips, got {result['clips_count']}")
+            return False
+
+        # Forced keyframes put the cuts on the requested (non-keyframe) boundaries
+        starts = [clip['start'] for clip in result['clips']]
+        if any(abs(actual - expected) > 0.05 for actual, expected in zip(starts, [0, 15, 30])):
+            print(f"❌ Cuts are not frame accurate: {starts}")
+            return False
+
+        return True
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Single-Pass Split Test")
+    print("=" * 60)
+
+    success = test_single_pass_mode()
+    print("✅ Single-pass test passed" if success else "❌ Single-pass test failed")
+    return success
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
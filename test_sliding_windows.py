@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Sliding Windows
+Verifies overlapping window planning and that all windows come from a single decode
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from PIL import Image, ImageChops, ImageStat
+
+from processor.video_splitter import VideoSplitter
+from processor.clip_planner import ClipPlanner
+from processor.thumbnails import Thumbnails
+from utils.ffmpeg_utils import FFmpegUtils
+from utils.media_probe import MediaProbe
+from test_helpers import create_sample_video
+
+
+class CountEncodes:
+    """Count ffmpeg runs that decode the given source to encode clips while active"""
+    
+    def __init__(self, source: Path):
+        self.source = str(source)
+        self.calls = 0
+        self.original = None
+    
+    def __enter__(self):
+        self.original = FFmpegUtils.run_ffmpeg
+        
+        def counting(args, *rest, **kwargs):
+            if self.source in args and '-c:v' in args:
+                self.calls += 1
+            return self.original(args, *rest, **kwargs)
+        
+        FFmpegUtils.run_ffmpeg = staticmethod(counting)
+        return self
+    
+    def __exit__(self, *exc):
+        FFmpegUtils.run_ffmpeg = staticmethod(self.original)
+
+
+def test_window_planning():
+    """Test overlapping window ranges and their grouping into lanes"""
+    print("Testing sliding window planning...")
+    
+    windows = ClipPlanner.sliding_windows(40, 12, 4)
+    print(f"Windows: {[(w['start'], w['end']) for w in windows]}")
+    if [w['start'] for w in windows] != [0, 4, 8, 12, 16, 20, 24, 28] or windows[-1]['end'] != 40:
+        return False
+    
+    # 12s windows every 4s overlap three deep
+    lanes = ClipPlanner.assign_lanes(windows, list(range(len(windows))))
+    print(f"Lanes: {lanes}")
+    if lanes != [[0, 3, 6], [1, 4, 7], [2, 5]]:
+        return False
+    for lane in lanes:
+        for first, second in zip(lane, lane[1:]):
+            if windows[first]['end'] > windows[second]['start']:
+                return False
+    
+    # A step of the clip length gives back-to-back clips in a single lane
+    plain = ClipPlanner.sliding_windows(40, 12, 12)
+    return plain == ClipPlanner.fixed_clips(40, 12) and \
+        len(ClipPlanner.assign_lanes(plain, list(range(len(plain))))) == 1
+
+
+def test_single_decode():
+    """Test that overlapping windows are exact, match the source and share one decode"""
+    print("Testing sliding windows from a single decode...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source):
+            return False
+        
+        settings = {'clip_cache_mb': 0, 'window_step': 4}
+        with CountEncodes(source) as encodes:
+            result = VideoSplitter(settings=settings).process_video(
+                str(source), temp_path / "windows", 12, mode='sliding'
+            )
+        if not result['success']:
+            print(f"❌ {result.get('error')}")
+            return False
+        
+        MediaProbe.clear_cache()
+        durations = [round(MediaProbe.get_video_info(path)['duration'], 2)
+                     for path in result['output_files']]
+        print(f"{result['clips_count']} windows, {encodes.calls} encoding runs, durations {durations}")
+        if encodes.calls != 1 or result['clips_count'] != 8:
+            return False
+        if any(abs(d - 12.0) > 0.1 for d in durations):
+            return False
+        
+        # Every window starts on the source frame at its planned start
+        for clip in result['clips']:
+            expected = temp_path / "expected.jpg"
+            actual = temp_path / "actual.jpg"
+            if not (Thumbnails.extract_frame(str(source), expected, clip['start'])
+                    and Thumbnails.extract_frame(clip['path'], actual)):
+                return False
+            with Image.open(expected) as a, Image.open(actual) as b:
+                difference = sum(ImageStat.Stat(ImageChops.difference(a.convert('L'), b.convert('L'))).mean)
+            if difference > 4:
+                print(f"❌ {Path(clip['path']).name} does not start at {clip['start']:.2f}s ({difference:.1f})")
+                return False
+        return True
+
+
+def test_resume_windows():
+    """Test that a resumed sliding job only encodes the missing windows"""
+    print("Testing resumed sliding windows...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 20):
+            return False
+        
+        settings = {'clip_cache_mb': 0, 'window_step': 5}
+        first = VideoSplitter(settings=settings).process_video(str(source), temp_path, 10, mode='sliding')
+        if not first['success']:
+            return False
+        Path(first['output_files'][1]).unlink()
+        
+        resumed = VideoSplitter(settings=settings).process_video(
+            str(source), temp_path, 10, mode='sliding', resume=True
+        )
+        print(f"Resumed {resumed.get('resumed_clips')} of {resumed.get('clips_count')} windows")
+        return (resumed['success'] and resumed['output_folder'] == first['output_folder']
+                and resumed['clips_count'] == first['clips_count'] == 3
+                and resumed['resumed_clips'] == 2
+                and all(Path(path).exists() for path in resumed['output_files']))
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Sliding Windows Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Window Planning", test_window_planning),
+        ("Single Decode", test_single_decode),
+        ("Resume Windows", test_resume_windows),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
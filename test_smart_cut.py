@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Smart Cut Split Mode
+Verifies that only the partial GOPs are re-encoded and clips stay frame-accurate
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from processor.video_splitter import VideoSplitter
+from utils.ffmpeg_utils import FFmpegUtils
+from test_helpers import create_sample_video
+
+
+def count_frames(video_path: str) -> int:
+    """Count video packets in a file without decoding"""
+    result = FFmpegUtils._run_capture(['-i', video_path, '-map', '0:v:0', '-c', 'copy',
+                                       '-f', 'framecrc', '-'])
+    return len([line for line in result.stdout.splitlines() if not line.startswith('#')])
+
+
+def test_smart_cut_plan():
+    """Test head/middle/tail planning against a keyframe list"""
+    print("Testing smart cut planning...")
+    
+    splitter = VideoSplitter()
+    keyframes = [0.0, 2.0, 4.0, 6.0, 8.0, 10.0]
+    
+    pieces = splitter._plan_smart_cut(1.0, 9.0, keyframes, 0.04)
+    expected = [(1.0, 2.0, False), (2.0, 8.0, True), (8.0, 9.0, False)]
+    if [(p['start'], p['end'], p['copy']) for p in pieces] != expected:
+        print(f"❌ Unexpected pieces: {pieces}")
+        return False
+    
+    # Keyframe-aligned clips are copied whole
+    pieces = splitter._plan_smart_cut(2.0, 6.0, keyframes, 0.04)
+    if [(p['start'], p['end'], p['copy']) for p in pieces] != [(2.0, 6.0, True)]:
+        print(f"❌ Unexpected pieces: {pieces}")
+        return False
+    
+    # Clips shorter than a GOP are re-encoded whole
+    pieces = splitter._plan_smart_cut(2.5, 3.5, keyframes, 0.04)
+    if [(p['start'], p['end'], p['copy']) for p in pieces] != [(2.5, 3.5, False)]:
+        print(f"❌ Unexpected pieces: {pieces}")
+        return False
+    
+    print("✅ Smart cut plans are correct")
+    return True
+
+
+def test_smart_cut_mode():
+    """Test smart cut split mode end to end"""
+    print("Testing smart cut split mode...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source):
+            return False
+        
+        splitter = VideoSplitter(settings={'clip_cache_mb': 0})
+        result = splitter.process_video(str(source), temp_path / "clips", 15, mode='smart')
+        
+        if not result['success'] or result['clips_count'] != 3:
+            print(f"❌ Processing failed: {result.get('error')}")
+            return False
+        
+        report = result['smart_cut_report']
+        print(f"✅ Copied {report['copied_seconds']:.1f}s, re-encoded {report['reencoded_seconds']:.1f}s")
+        if abs(report['copied_seconds'] - 36.0) > 0.1 or abs(report['reencoded_seconds'] - 4.0) > 0.1:
+            print("❌ Unexpected cost report")
+            return False
+        
+        frames = [count_frames(path) for path in result['output_files']]
+        if frames != [375, 375, 250]:
+            print(f"❌ Clips are not frame accurate: {frames}")
+            return False
+        
+        return True
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Smart Cut Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Smart Cut Plan", test_smart_cut_plan),
+        ("Smart Cut Mode", test_smart_cut_mode),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
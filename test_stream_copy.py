@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Stream Copy Split Mode
+Verifies that the copy mode cuts clips without re-encoding and reports real boundaries
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from processor.video_splitter import VideoSplitter
+from test_helpers import create_sample_video
+
+
+def test_copy_mode():
+    """Test stream copy split mode"""
+    print("Testing stream copy split mode...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source):
+            return False
+
+        progress_values = []
+        splitter = VideoSplitter(progress_values.append, settings={'clip_cache_mb': 0})
+        result = splitter.process_video(str(source), temp_path / "clips", 15, mode='copy')
+
+        if not result['success']:
+            print(f"❌ Processing failed: {result['error']}")
+            return False
+
+        print(f"✅ Clips created: {result['clips_count']}")
+        for clip in result['clips']:
+            print(f"   {Path(clip['path']).name}: {clip['start']:.2f}s - {clip['end']:.2f}s")
+
+        if result['mode'] != 'copy' or result['clips_count'] != 3:
+            print("❌ Expected 3 clips in copy mode")
+            return False
+
+        names = [Path(f).name for f in result['output_files']]
+        if names != [f"sample_clip_{i:03d}_15s.mp4" for i in range(1, 4)]:
+            print(f"❌ Unexpected clip names: {names}")
+            return False
+
+        # Cuts snap to the 2s keyframe grid, so boundaries land on the next keyframe
+        starts = [round(clip['start']) for clip in result['clips']]
+        if starts[0] != 0 or any(start % 2 for start in starts):
+            print(f"❌ Clip starts are not keyframe aligned: {starts}")
+            return False
+
+        if not all(0 <= value <= 100 for value in progress_values):
+            print("❌ Invalid progress values")
+            return False
+
+        return True
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Stream Copy Test")
+    print("=" * 60)
+
+    success = test_copy_mode()
+    print("✅ Stream copy test passed" if success else "❌ Stream copy test failed")
+    return success
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
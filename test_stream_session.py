@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Stream Session
+Verifies that URL clips are cut from a single open of the stream and that opens and bytes are reported
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from processor.clip_backend import FFmpegBackend
+from processor.clip_planner import ClipPlanner
+from processor.url_clip_processor_v8 import URLClipProcessorV8
+from utils.media_probe import MediaProbe
+from test_helpers import create_sample_video, RangeServer
+
+
+def test_single_open():
+    """Test that a run of clips opens the stream once and reads it about once"""
+    print("Testing one stream open per run of clips...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 24):
+            return False
+        clips = ClipPlanner.fixed_clips(24, 4)
+        
+        with RangeServer(temp_path) as server:
+            url = server.url("sample.mp4")
+            
+            # Clip by clip: one open, probe and seek per clip
+            backend = FFmpegBackend()
+            for index, clip in enumerate(clips):
+                backend.encode(url, clip['start'], clip['end'], temp_path / f"single_{index}.mp4",
+                               'libx264', 'ultrafast', 28, audio_codec='aac')
+            per_clip = dict(backend.stats, requests=server.requests, sent=server.bytes_sent)
+            
+            # One session for the whole run
+            server.requests = server.bytes_sent = 0
+            backend.reset_stats()
+            work_dir = temp_path / "work"
+            work_dir.mkdir()
+            written = backend.encode_run(url, clips, [temp_path / f"run_{i}.mp4" for i in range(len(clips))],
+                                         'libx264', 'ultrafast', 28, audio_codec='aac', work_dir=work_dir)
+            session = dict(backend.stats, requests=server.requests, sent=server.bytes_sent)
+        
+        print(f"Per clip: {per_clip}")
+        print(f"Session:  {session}")
+        if len(written) != len(clips) or session['opens'] != 1 or per_clip['opens'] != len(clips):
+            return False
+        if session['requests'] >= per_clip['requests'] or session['bytes_read'] >= per_clip['bytes_read']:
+            print("❌ Session did not fetch less than clip by clip")
+            return False
+        # The source is read about once
+        if not 0 < session['bytes_read'] <= source.stat().st_size * 1.1:
+            return False
+        
+        MediaProbe.clear_cache()
+        durations = [round(MediaProbe.get_video_info(str(clip['path']))['duration'], 2) for clip in written]
+        print(f"Clip durations: {durations}")
+        return all(abs(d - 4.0) < 0.1 for d in durations) and \
+            [round(c['start'], 2) for c in written] == [c['start'] for c in clips]
+
+
+def test_v8_session():
+    """Test that the URL processor cuts every clip from one session and reports it"""
+    print("Testing URL processor stream session...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 24):
+            return False
+        
+        with RangeServer(temp_path) as server:
+            url = server.url("sample.mp4")
+            video_info = {'title': 'Session Test', 'duration': 24.0, 'filesize': source.stat().st_size}
+            settings = {'clip_cache_mb': 0, 'disk_reserve_mb': 0, 'url_workers': 1}
+            
+            def create_processor():
+                processor = URLClipProcessorV8(settings=settings)
+                processor.url_processor.validate_url = lambda u: {
+                    'valid': True, 'video_info': video_info, 'platform': 'test'
+                }
+                processor._get_stream_url = lambda u: u
+                return processor
+            
+            result = create_processor().process_url_video(url, temp_path / "out", 4)
+            stats = result.get('stream_stats') or {}
+            print(f"Created {result.get('successful_clips')} clips, stream stats {stats}")
+            if not result['success'] or result['successful_clips'] != 6:
+                return False
+            if stats.get('opens') != 1 or stats.get('clips') != 6 or not stats.get('bytes_read'):
+                return False
+            
+            # Resuming with two clips missing opens the stream once per missing stretch
+            for path in (result['output_files'][1], result['output_files'][4]):
+                Path(path).unlink()
+            resumed = create_processor().process_url_video(url, temp_path / "out", 4, resume=True)
+            stats = resumed.get('stream_stats') or {}
+            print(f"Resumed {resumed.get('resumed_clips')} clips, stream stats {stats}")
+            return (resumed['success'] and resumed['resumed_clips'] == 4
+                    and stats.get('opens') == 2 and stats.get('clips') == 2
+                    and all(Path(path).exists() for path in resumed['output_files']))
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Stream Session Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Single Open", test_single_open),
+        ("V8 Session", test_v8_session),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
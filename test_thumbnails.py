@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Thumbnails
+Verifies per-clip poster frames and contact sheets written alongside the split
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to the path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from PIL import Image, ImageChops, ImageStat
+
+from processor.video_splitter import VideoSplitter
+from processor.thumbnails import Thumbnails
+from test_helpers import create_sample_video
+
+
+def image_difference(first: Path, second: Path) -> float:
+    """Get the mean absolute pixel difference of two images (0-255)"""
+    with Image.open(first) as a, Image.open(second) as b:
+        return sum(ImageStat.Stat(ImageChops.difference(a.convert('L'), b.convert('L'))).mean)
+
+
+class CountExtracts:
+    """Count Thumbnails.extract_frame calls (posters not taken from the encode) while active"""
+    
+    def __init__(self):
+        self.calls = 0
+        self.original = None
+    
+    def __enter__(self):
+        self.original = Thumbnails.extract_frame
+        
+        def counting(*args, **kwargs):
+            self.calls += 1
+            return self.original(*args, **kwargs)
+        
+        Thumbnails.extract_frame = staticmethod(counting)
+        return self
+    
+    def __exit__(self, *exc):
+        Thumbnails.extract_frame = staticmethod(self.original)
+
+
+def test_thumbnails_per_mode():
+    """Test that every split mode writes the first frame of each clip from its own encode"""
+    print("Testing thumbnails in every split mode...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 13):
+            return False
+        
+        for mode in VideoSplitter.SPLIT_MODES:
+            settings = {'clip_cache_mb': 0, 'thumbnails': 'jpg'}
+            with CountExtracts() as extracts:
+                result = VideoSplitter(settings=settings).process_video(
+                    str(source), temp_path / mode, 4, mode=mode
+                )
+            if not result['success']:
+                print(f"❌ {mode}: {result.get('error')}")
+                return False
+            
+            thumbnails = result['thumbnails']
+            print(f"{mode}: {len(thumbnails)} thumbnails, {extracts.calls} extracted afterwards")
+            if len(thumbnails) != result['clips_count'] or extracts.calls:
+                print(f"❌ {mode}: thumbnails missing or not taken from the encode")
+                return False
+            
+            for clip, thumbnail in zip(result['clips'], thumbnails):
+                if clip.get('thumbnail') != thumbnail or \
+                        Path(thumbnail) != Thumbnails.get_thumbnail_path(clip['path'], 'jpg'):
+                    print(f"❌ {mode}: wrong thumbnail path {thumbnail}")
+                    return False
+                
+                # The poster must be the clip's first frame
+                reference = temp_path / f"{mode}_reference.jpg"
+                if not Thumbnails.extract_frame(clip['path'], reference):
+                    return False
+                difference = image_difference(thumbnail, reference)
+                if difference > 4:
+                    print(f"❌ {mode}: {Path(thumbnail).name} differs from the clip start ({difference:.1f})")
+                    return False
+        return True
+
+
+def test_contact_sheet():
+    """Test the WebP format, output presets and the tiled contact sheet"""
+    print("Testing contact sheets...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 13):
+            return False
+        
+        settings = {'clip_cache_mb': 0, 'thumbnails': 'webp', 'output_preset': 'vertical_720'}
+        result = VideoSplitter(settings=settings).process_video(
+            str(source), temp_path / "sheet", 2, mode='single_pass'
+        )
+        if not result['success'] or not result['contact_sheet']:
+            print(f"❌ No contact sheet: {result.get('error')}")
+            return False
+        
+        # Posters show the preset's framing at thumbnail width
+        with Image.open(result['thumbnails'][0]) as image:
+            thumbnail_size = image.size
+            thumbnail_format = image.format
+        with Image.open(result['contact_sheet']) as sheet:
+            sheet_size = sheet.size
+        print(f"Thumbnail {thumbnail_size} {thumbnail_format}, sheet {sheet_size} "
+              f"for {result['clips_count']} clips")
+        if thumbnail_format != 'WEBP' or thumbnail_size != (Thumbnails.WIDTH, 568):
+            return False
+        
+        # 7 clips tile into 5 columns and 2 rows
+        columns = Thumbnails.SHEET_COLUMNS
+        return result['clips_count'] == 7 and sheet_size == (columns * 320, 2 * 568)
+
+
+def test_resumed_clips():
+    """Test that clips kept from an earlier run still get thumbnails"""
+    print("Testing thumbnails of resumed clips...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "sample.mp4"
+        if not create_sample_video(source, 13):
+            return False
+        
+        first = VideoSplitter(settings={'clip_cache_mb': 0}).process_video(
+            str(source), temp_path, 4, mode='copy'
+        )
+        if not first['success'] or first['thumbnails'] or first['contact_sheet']:
+            print("❌ Thumbnails written while off")
+            return False
+        
+        settings = {'clip_cache_mb': 0, 'thumbnails': 'jpg'}
+        with CountExtracts() as extracts:
+            resumed = VideoSplitter(settings=settings).process_video(
+                str(source), temp_path, 4, mode='copy', resume=True
+            )
+        print(f"Resumed {resumed.get('resumed_clips')} clips, {extracts.calls} thumbnails extracted")
+        return (resumed['success'] and resumed['output_folder'] == first['output_folder']
+                and resumed['resumed_clips'] == first['clips_count']
+                and len(resumed['thumbnails']) == first['clips_count']
+                and extracts.calls == first['clips_count']
+                and Path(resumed['contact_sheet']).exists())
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("ClipForge - Thumbnails Test")
+    print("=" * 60)
+    
+    tests = [
+        ("Thumbnails Per Mode", test_thumbnails_per_mode),
+        ("Contact Sheet", test_contact_sheet),
+        ("Resumed Clips", test_resumed_clips),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
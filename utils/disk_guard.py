@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Disk Guard for ClipForge
+Admits jobs only when their estimated output fits on disk and pauses them before it fills
+"""
+
+import os
+import time
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Callable
+from .file_utils import FileUtils
+
+
+class DiskReservation:
+    """Disk space held by one running job
+    
+    The reservation shrinks as the job writes clips (consume()), so the space
+    it already used is not counted twice against other jobs.
+    """
+    
+    def __init__(self, guard: 'DiskGuard', path: Path, device: int, reserved_bytes: int):
+        """Initialize disk reservation"""
+        self.guard = guard
+        self.path = path
+        self.device = device
+        self.remaining_bytes = reserved_bytes
+        self.low_space = False
+        self._checked_at = 0.0
+    
+    def consume(self, written_bytes: int):
+        """Count bytes the job has written"""
+        with DiskGuard._lock:
+            self.remaining_bytes = max(0, self.remaining_bytes - written_bytes)
+    
+    def is_low(self) -> bool:
+        """Check whether free space dropped below the reserve (polled at most once per interval)
+        
+        Cheap enough to use inside an ffmpeg stop_check.
+        """
+        now = time.monotonic()
+        if now - self._checked_at >= DiskGuard.CHECK_INTERVAL:
+            self._checked_at = now
+            self.low_space = self.guard.get_free_space(self.path) < self.guard.reserve_bytes
+        return self.low_space
+    
+    def wait_for_space(self, needed_bytes: int, stop_check: Optional[Callable] = None) -> bool:
+        """Pause until needed_bytes fit above the reserve (False if stopped while waiting)"""
+        paused = False
+        while True:
+            if stop_check and stop_check():
+                return False
+            free = self.guard.get_free_space(self.path)
+            if free - self.guard.reserve_bytes >= needed_bytes:
+                break
+            if not paused:
+                paused = True
+                print(f"⏸️ Low disk space: {FileUtils.format_file_size(free)} free, next clip needs "
+                      f"~{FileUtils.format_file_size(needed_bytes)} plus "
+                      f"{FileUtils.format_file_size(self.guard.reserve_bytes)} kept free. "
+                      f"Paused until space is freed...")
+            time.sleep(DiskGuard.POLL_INTERVAL)
+        
+        if paused:
+            print("▶️ Disk space available, resuming")
+        self.low_space = False
+        self._checked_at = time.monotonic()
+        return True
+    
+    def release(self):
+        """Give the space back to other jobs"""
+        self.guard.release(self)
+
+
+class DiskGuard:
+    """Admission control and low-space pausing for jobs writing clips
+    
+    A job is admitted when its estimated output fits in the free space minus
+    the configured reserve and minus what other running jobs on the same drive
+    still expect to write. Otherwise it is refused with an error, or queued
+    until other jobs finish or space is freed (disk_space_policy). While running,
+    jobs re-check free space and pause before the reserve is used up.
+    """
+    
+    POLICIES = {
+        'refuse': 'Refuse to start',
+        'wait': 'Queue until space is free'
+    }
+    DEFAULT_POLICY = 'refuse'
+    DEFAULT_RESERVE_MB = 1024
+    # Seconds between free space checks while running, and while paused or queued
+    CHECK_INTERVAL = 1.0
+    POLL_INTERVAL = 5.0
+    
+    # Shared by all instances: reservations are process-wide
+    _reservations = []
+    _lock = threading.Lock()
+    
+    def __init__(self, reserve_mb: Optional[int] = None, policy: Optional[str] = None):
+        """Initialize disk guard
+        
+        reserve_mb is the free space jobs never use (0 disables the guard's
+        reserve but still checks that estimates fit).
+        """
+        if reserve_mb is None:
+            reserve_mb = self.DEFAULT_RESERVE_MB
+        self.reserve_bytes = max(0, int(reserve_mb)) * 1024 * 1024
+        self.policy = policy or self.DEFAULT_POLICY
+        if self.policy not in self.POLICIES:
+            raise ValueError(f"Unknown disk space policy: {self.policy}")
+    
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> 'DiskGuard':
+        """Create a guard from processing settings"""
+        settings = settings or {}
+        return cls(settings.get('disk_reserve_mb', cls.DEFAULT_RESERVE_MB),
+                   settings.get('disk_space_policy', cls.DEFAULT_POLICY))
+    
+    @staticmethod
+    def _get_existing_path(path: Path) -> Path:
+        """Get the path itself or its closest existing parent"""
+        path = Path(path).absolute()
+        while not path.exists() and path.parent != path:
+            path = path.parent
+        return path
+    
+    def get_free_space(self, path: Path) -> int:
+        """Get free bytes on the drive holding path"""
+        return FileUtils.get_available_space(self._get_existing_path(path))
+    
+    def admit(self, path: Path, estimated_bytes: int,
+              stop_check: Optional[Callable] = None) -> Optional[DiskReservation]:
+        """Reserve estimated_bytes on the drive holding path for a new job
+        
+        Raises OSError when the estimate does not fit and the policy is
+        'refuse'; with 'wait' the job is queued until it fits. Returns None if
+        stopped while queued.
+        """
+        existing = self._get_existing_path(path)
+        device = os.stat(existing).st_dev
+        queued = False
+        while True:
+            if stop_check and stop_check():
+                return None
+            free = self.get_free_space(existing)
+            with self._lock:
+                reserved = sum(r.remaining_bytes for r in DiskGuard._reservations
+                               if r.device == device)
+                available = free - self.reserve_bytes - reserved
+                if estimated_bytes <= available:
+                    reservation = DiskReservation(self, Path(path), device, estimated_bytes)
+                    DiskGuard._reservations.append(reservation)
+                    break
+            
+            message = (f"~{FileUtils.format_file_size(estimated_bytes)} needed, "
+                       f"{FileUtils.format_file_size(max(0, available))} available "
+                       f"({FileUtils.format_file_size(free)} free, "
+                       f"{FileUtils.format_file_size(self.reserve_bytes)} kept free, "
+                       f"{FileUtils.format_file_size(reserved)} reserved by running jobs)")
+            if self.policy == 'refuse':
+                raise OSError(f"Not enough disk space: {message}")
+            if not queued:
+                queued = True
+                print(f"⏸️ Not enough disk space yet: {message}. Job queued...")
+            time.sleep(self.POLL_INTERVAL)
+        
+        if queued:
+            print("▶️ Disk space available, starting queued job")
+        return reservation
+    
+    def admit_job(self, output_folder: Path, estimated_bytes: int,
+                  stop_check: Optional[Callable] = None) -> Optional[DiskReservation]:
+        """Admit a job writing clips into output_folder
+        
+        Clips already in the folder (a resumed job) count as written. A folder
+        the refused job leaves empty is removed.
+        """
+        existing = sum(FileUtils.get_file_size(str(p)) for p in Path(output_folder).glob('*.mp4'))
+        estimated_bytes = max(0, estimated_bytes - existing)
+        print(f"Estimated output size: {FileUtils.format_file_size(estimated_bytes)}")
+        try:
+            return self.admit(output_folder, estimated_bytes, stop_check)
+        except OSError:
+            try:
+                Path(output_folder).rmdir()
+            except OSError:
+                pass
+            raise
+    
+    def release(self, reservation: DiskReservation):
+        """Forget a reservation"""
+        with self._lock:
+            if reservation in DiskGuard._reservations:
+                DiskGuard._reservations.remove(reservation)
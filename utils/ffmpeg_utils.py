@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FFmpeg Utilities for ClipForge
+Locates the ffmpeg binary and runs ffmpeg commands with progress reporting
+"""
+
+import math
+import re
+import subprocess
+import threading
+from typing import List, Optional, Callable, Tuple
+
+
+class FFmpegUtils:
+    """Utility class for running ffmpeg directly"""
+    
+    _ffmpeg_exe = None
+    
+    @staticmethod
+    def get_ffmpeg_exe() -> str:
+        """Get path to the ffmpeg binary (same one moviepy uses)"""
+        if FFmpegUtils._ffmpeg_exe:
+            return FFmpegUtils._ffmpeg_exe
+        
+        exe = None
+        try:
+            from moviepy.config import get_setting
+            exe = get_setting("FFMPEG_BINARY")
+        except Exception:
+            try:
+                import imageio_ffmpeg
+                exe = imageio_ffmpeg.get_ffmpeg_exe()
+            except Exception:
+                exe = None
+        
+        FFmpegUtils._ffmpeg_exe = exe or "ffmpeg"
+        return FFmpegUtils._ffmpeg_exe
+    
+    @staticmethod
+    def format_time(seconds: float) -> str:
+        """Format seconds for ffmpeg time options"""
+        return f"{max(0.0, seconds):.3f}"
+    
+    @staticmethod
+    def format_cut_time(seconds: float) -> str:
+        """Format a cut point, rounded down so the frame or keyframe on it is included"""
+        return f"{math.floor(max(0.0, seconds) * 1000) / 1000:.3f}"
+    
+    @staticmethod
+    def format_seek_time(seconds: float) -> str:
+        """Format a keyframe time for input seeking, rounded up so it never lands before it"""
+        return f"{math.ceil(max(0.0, seconds) * 1000) / 1000:.3f}"
+    
+    @staticmethod
+    def _run_capture(args: List[str]) -> subprocess.CompletedProcess:
+        """Run ffmpeg and capture stdout/stderr as text"""
+        cmd = [FFmpegUtils.get_ffmpeg_exe(), '-hide_banner', '-nostdin'] + list(args)
+        return subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL,
+            creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0),
+            encoding='utf-8',
+            errors='replace'
+        )
+    
+    @staticmethod
+    def get_keyframe_times(video_path: str) -> List[float]:
+        """List keyframe timestamps of the first video stream
+        
+        Scans packets with the framecrc muxer and stream copy, so nothing is decoded.
+        Times are relative to the container start time, like ffmpeg's -ss, and
+        the packet dump is parsed as it is read instead of being buffered.
+        """
+        cmd = [FFmpegUtils.get_ffmpeg_exe(), '-hide_banner', '-nostdin', '-i', video_path,
+               '-map', '0:v:0', '-c', 'copy', '-copyts', '-f', 'framecrc', '-']
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL,
+            creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0),
+            encoding='utf-8',
+            errors='replace'
+        )
+        
+        # Drain stderr in background so ffmpeg never blocks on a full pipe
+        stderr_lines = []
+        stderr_thread = threading.Thread(target=lambda: stderr_lines.extend(process.stderr), daemon=True)
+        stderr_thread.start()
+        
+        time_base = None
+        keyframes = []
+        for line in process.stdout:
+            if line.startswith('#tb 0:'):
+                num, den = line.split(':', 1)[1].strip().split('/')
+                time_base = int(num) / int(den)
+                continue
+            if line.startswith('#') or time_base is None:
+                continue
+            
+            fields = [field.strip() for field in line.split(',')]
+            if len(fields) < 6:
+                continue
+            # framecrc only prints flags for packets that are not plain keyframes
+            if not any(field.startswith('F=') for field in fields[6:]):
+                keyframes.append(int(fields[2]))
+        
+        process.wait()
+        stderr_thread.join(timeout=5)
+        stderr = ''.join(stderr_lines)
+        if process.returncode != 0:
+            raise RuntimeError(f"Could not scan keyframes: {stderr.strip()[-300:]}")
+        if time_base is None:
+            return []
+        
+        # -copyts keeps the stream timestamps, so take off the container start
+        match = re.search(r'Duration: .*?, start: (-?\d+(?:\.\d+)?)', stderr)
+        start = float(match.group(1)) if match else 0.0
+        return sorted(max(0.0, round(pts * time_base - start, 6)) for pts in keyframes)
+    
+    @staticmethod
+    def open_rawvideo_pipe(video_path: str, width: int, height: int, fps: float,
+                           pix_fmt: str = 'gray') -> subprocess.Popen:
+        """Start ffmpeg decoding the first video stream to small raw frames on stdout
+        
+        Frames are resampled to a constant fps and scaled to width x height, so
+        frame i is at i / fps seconds. The caller reads stdout and waits for the process.
+        """
+        cmd = [
+            FFmpegUtils.get_ffmpeg_exe(), '-hide_banner', '-nostdin', '-loglevel', 'error',
+            '-i', video_path, '-map', '0:v:0', '-an', '-sn',
+            '-vf', f"fps={fps},scale={width}:{height}:flags=area,format={pix_fmt}",
+            '-f', 'rawvideo', '-'
+        ]
+        return subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL,
+            creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+        )
+    
+    @staticmethod
+    def open_pcm_pipe(media_path: str, sample_rate: int) -> subprocess.Popen:
+        """Start ffmpeg decoding the first audio stream to mono signed 16-bit PCM on stdout
+        
+        The caller reads stdout and waits for the process.
+        """
+        cmd = [
+            FFmpegUtils.get_ffmpeg_exe(), '-hide_banner', '-nostdin', '-loglevel', 'error',
+            '-i', media_path, '-map', '0:a:0', '-vn', '-sn',
+            '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', '-'
+        ]
+        return subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL,
+            creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+        )
+    
+    @staticmethod
+    def _parse_out_time(value: str) -> Optional[float]:
+        """Parse ffmpeg -progress out_time value (HH:MM:SS.micro)"""
+        try:
+            hours, minutes, seconds = value.strip().split(':')
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+        except (ValueError, AttributeError):
+            return None
+    
+    @staticmethod
+    def run_ffmpeg(args: List[str], duration: Optional[float] = None,
+                   progress_callback: Optional[Callable] = None,
+                   stop_check: Optional[Callable] = None) -> Tuple[int, str]:
+        """Run ffmpeg with the given arguments and return (returncode, stderr)
+        
+        progress_callback receives 0-100 based on processed time vs duration.
+        stop_check is polled while running; if it returns True ffmpeg is terminated.
+        """
+        cmd = [FFmpegUtils.get_ffmpeg_exe(), '-hide_banner', '-nostdin', '-y',
+               '-progress', 'pipe:1', '-nostats'] + list(args)
+        
+        creationflags = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL,
+            creationflags=creationflags
+        )
+        
+        # Drain stderr in background so ffmpeg never blocks on a full pipe
+        stderr_lines = []
+        stderr_thread = threading.Thread(
+            target=lambda: stderr_lines.extend(
+                line.decode('utf-8', errors='replace') for line in process.stderr
+            ),
+            daemon=True
+        )
+        stderr_thread.start()
+        
+        last_progress = -1
+        for raw_line in process.stdout:
+            if stop_check and stop_check():
+                process.terminate()
+                break
+            
+            line = raw_line.decode('utf-8', errors='replace').strip()
+            if not line.startswith('out_time=') or not duration or not progress_callback:
+                continue
+            
+            current = FFmpegUtils._parse_out_time(line.split('=', 1)[1])
+            if current is None:
+                continue
+            
+            progress = int(current / duration * 100)
+            progress = max(0, min(100, progress))
+            if progress != last_progress:
+                last_progress = progress
+                progress_callback(progress)
+        
+        process.wait()
+        stderr_thread.join(timeout=5)
+        return process.returncode, ''.join(stderr_lines)
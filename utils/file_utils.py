@@ -5,7 +5,7 @@ File Utilities for ClipForge
 Handles file operations, folder creation, and naming conventions
 """
 
-import os
+import shutil
 import re
 from pathlib import Path
 from datetime import datetime
@@ -57,6 +57,12 @@ class FileUtils:
         unique_name = f"{folder_name}_{timestamp}"
         unique_path = base_path / unique_name
         
+        # Jobs started within the same second must not share a folder (or its manifest)
+        counter = 2
+        while unique_path.exists():
+            unique_path = base_path / f"{unique_name}_{counter}"
+            counter += 1
+        
         return unique_path
     
     @staticmethod
@@ -71,20 +77,30 @@ class FileUtils:
     
     @staticmethod
     def get_video_info(video_path: str) -> Optional[dict]:
-        """Get basic video information"""
+        """Get basic video information (see MediaProbe for the cached probe)"""
+        from .media_probe import MediaProbe
+        return MediaProbe.get_video_info(video_path)
+    
+    @staticmethod
+    def get_cache_directory(cache_name: str) -> Path:
+        """Get (and create) a cache directory under Documents/ClipForge/cache"""
+        cache_dir = Path.home() / "Documents" / "ClipForge" / "cache" / cache_name
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        return cache_dir
+    
+    @staticmethod
+    def get_file_signature(file_path: str) -> str:
+        """Get a cache key for a file that changes when the file is modified
+        
+        Local files are keyed by absolute path, size and modification time;
+        anything else (e.g. stream URLs) is keyed by the string itself.
+        """
         try:
-            from moviepy.editor import VideoFileClip
-            
-            with VideoFileClip(video_path) as clip:
-                return {
-                    'duration': clip.duration,
-                    'fps': clip.fps,
-                    'size': (clip.w, clip.h),
-                    'filename': Path(video_path).name
-                }
-        except Exception as e:
-            print(f"Error getting video info for {video_path}: {e}")
-            return None
+            path = Path(file_path)
+            stat = path.stat()
+            return f"{path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+        except (OSError, ValueError):
+            return str(file_path)
     
     @staticmethod
     def format_duration(seconds: float) -> str:
@@ -139,18 +155,6 @@ class FileUtils:
     def get_available_space(directory_path: Path) -> int:
         """Get available disk space in bytes"""
         try:
-            return os.statvfs(directory_path).f_frsize * os.statvfs(directory_path).f_bavail
+            return shutil.disk_usage(directory_path).free
         except OSError:
             return 0
-    
-    @staticmethod
-    def estimate_output_size(input_size: int, input_duration: float, clip_duration: int) -> int:
-        """Estimate output file size for a clip"""
-        # Rough estimation: assume similar bitrate
-        clips_count = int(input_duration / clip_duration)
-        if clips_count == 0:
-            clips_count = 1
-        
-        # Add some overhead for encoding
-        estimated_size = (input_size / clips_count) * 1.1
-        return int(estimated_size) 
\ No newline at end of file
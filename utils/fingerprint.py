@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fingerprint utilities for ClipForge
+Identifies source files by content without reading multi-GB files end to end
+"""
+
+import os
+import json
+import mmap
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Callable
+from .file_utils import FileUtils
+
+
+class Fingerprint:
+    """Content identity of source files for caches and resumable jobs
+    
+    The sampled fingerprint hashes the file size plus fixed-size blocks from
+    the head, the tail and evenly spaced points in between, read through a
+    memory map, so its cost does not depend on the file size. A full SHA-256
+    of the whole file can be computed in a background thread when a stronger
+    identity is wanted; finished full hashes are kept in
+    Documents/ClipForge/cache/fingerprint.
+    
+    Both are keyed by (path, size, mtime), so a file is only hashed again
+    after it changes.
+    """
+    
+    SAMPLE_SIZE = 64 * 1024
+    SAMPLE_COUNT = 16
+    SAMPLED_PREFIX = "s1:"
+    FULL_PREFIX = "sha256:"
+    FULL_CHUNK_SIZE = 4 * 1024 * 1024
+    MAX_CACHE_ENTRIES = 1000
+    
+    _sampled_cache: Dict[str, str] = {}
+    _full_cache: Optional[Dict[str, str]] = None
+    _full_jobs: Dict[str, threading.Thread] = {}
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def get_sample_offsets(size: int) -> list:
+        """Get the start offsets of the sampled blocks for a file size"""
+        sample = Fingerprint.SAMPLE_SIZE
+        if size <= sample * (Fingerprint.SAMPLE_COUNT + 2):
+            # Small files are hashed whole
+            return [0]
+        last = size - sample
+        step = last / (Fingerprint.SAMPLE_COUNT + 1)
+        offsets = [0] + [int(step * i) for i in range(1, Fingerprint.SAMPLE_COUNT + 1)] + [last]
+        # Align interior blocks to the page size so mmap reads touch the fewest pages
+        page = mmap.ALLOCATIONGRANULARITY
+        return sorted({offsets[0], offsets[-1]} | {o - o % page for o in offsets[1:-1]})
+    
+    @staticmethod
+    def compute_sampled(file_path: str) -> str:
+        """Hash the size and sampled blocks of a file"""
+        digest = hashlib.blake2b(digest_size=20)
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            digest.update(size.to_bytes(8, 'little'))
+            offsets = Fingerprint.get_sample_offsets(size)
+            if size == 0:
+                pass
+            elif offsets == [0]:
+                digest.update(f.read())
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for offset in offsets:
+                        digest.update(mapped[offset:offset + Fingerprint.SAMPLE_SIZE])
+        return f"{Fingerprint.SAMPLED_PREFIX}{digest.hexdigest()}"
+    
+    @staticmethod
+    def compute_full(file_path: str, stop_check: Optional[Callable] = None) -> Optional[str]:
+        """Hash a whole file with SHA-256 (None if stopped)"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(Fingerprint.FULL_CHUNK_SIZE), b''):
+                if stop_check and stop_check():
+                    return None
+                digest.update(chunk)
+        return f"{Fingerprint.FULL_PREFIX}{digest.hexdigest()}"
+    
+    @staticmethod
+    def get_fingerprint(source: str) -> str:
+        """Get the sampled fingerprint of a local file
+        
+        Anything that is not a readable local file (e.g. a stream URL) is
+        identified by the string itself.
+        """
+        signature = FileUtils.get_file_signature(source)
+        with Fingerprint._lock:
+            fingerprint = Fingerprint._sampled_cache.get(signature)
+        if fingerprint:
+            return fingerprint
+        
+        if not Path(source).is_file():
+            return str(source)
+        try:
+            fingerprint = Fingerprint.compute_sampled(source)
+        except (OSError, ValueError):
+            return signature
+        
+        with Fingerprint._lock:
+            Fingerprint._sampled_cache[signature] = fingerprint
+        return fingerprint
+    
+    @staticmethod
+    def _get_cache_file() -> Path:
+        """Get the persistent full hash cache file"""
+        return FileUtils.get_cache_directory("fingerprint") / "full_hashes.json"
+    
+    @staticmethod
+    def _load_full_cache() -> Dict[str, str]:
+        """Load the persistent full hash cache once per process (caller holds the lock)"""
+        if Fingerprint._full_cache is None:
+            try:
+                with open(Fingerprint._get_cache_file(), 'r', encoding='utf-8') as f:
+                    Fingerprint._full_cache = json.load(f)
+            except (OSError, ValueError):
+                Fingerprint._full_cache = {}
+        return Fingerprint._full_cache
+    
+    @staticmethod
+    def _save_full_cache():
+        """Write the full hash cache atomically (caller holds the lock)"""
+        cache = Fingerprint._full_cache or {}
+        # Entries are added in order, so the oldest are dropped first
+        for key in list(cache)[:max(0, len(cache) - Fingerprint.MAX_CACHE_ENTRIES)]:
+            del cache[key]
+        
+        cache_file = Fingerprint._get_cache_file()
+        temp_file = cache_file.with_suffix('.tmp')
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            print(f"⚠️ Could not save fingerprint cache: {e}")
+    
+    @staticmethod
+    def get_full_hash(source: str, wait: bool = False) -> Optional[str]:
+        """Get the full hash of a file if it is known
+        
+        With wait, a running background hash is waited for and a missing one is
+        computed now; otherwise None is returned until it is available.
+        """
+        signature = FileUtils.get_file_signature(source)
+        with Fingerprint._lock:
+            full_hash = Fingerprint._load_full_cache().get(signature)
+            job = Fingerprint._full_jobs.get(signature)
+        if full_hash or not wait:
+            return full_hash
+        
+        if job:
+            job.join()
+        else:
+            Fingerprint._run_full_hash(source, signature)
+        with Fingerprint._lock:
+            return Fingerprint._load_full_cache().get(signature)
+    
+    @staticmethod
+    def start_full_hash(source: str, callback: Optional[Callable] = None) -> bool:
+        """Compute the full hash of a file in a background thread
+        
+        callback receives the hash when it is ready. Returns False when there is
+        nothing to do (not a local file, already known or already running).
+        """
+        if not Path(source).is_file():
+            return False
+        signature = FileUtils.get_file_signature(source)
+        with Fingerprint._lock:
+            if signature in Fingerprint._load_full_cache() or signature in Fingerprint._full_jobs:
+                return False
+            job = threading.Thread(
+                target=Fingerprint._run_full_hash,
+                args=(source, signature, callback),
+                name=f"fingerprint-{Path(source).name}",
+                daemon=True
+            )
+            Fingerprint._full_jobs[signature] = job
+        job.start()
+        return True
+    
+    @staticmethod
+    def _run_full_hash(source: str, signature: str, callback: Optional[Callable] = None):
+        """Compute and store a full hash (runs in the background thread)"""
+        try:
+            full_hash = Fingerprint.compute_full(
+                source,
+                # The file changed while it was read, so the result would be stale
+                stop_check=lambda: FileUtils.get_file_signature(source) != signature
+            )
+        except OSError as e:
+            print(f"⚠️ Could not hash {source}: {e}")
+            full_hash = None
+        
+        with Fingerprint._lock:
+            Fingerprint._full_jobs.pop(signature, None)
+            if full_hash:
+                Fingerprint._load_full_cache()[signature] = full_hash
+                Fingerprint._save_full_cache()
+        
+        if full_hash and callback:
+            callback(full_hash)
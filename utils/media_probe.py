@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Media Probe for ClipForge
+Reads video metadata with a single lightweight probe and caches it persistently
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import threading
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, Optional
+from .file_utils import FileUtils
+from .ffmpeg_utils import FFmpegUtils
+
+
+class MediaProbe:
+    """Metadata engine shared by every get_video_info in ClipForge
+    
+    Uses ffprobe JSON output when ffprobe is available, otherwise parses the
+    stream header that `ffmpeg -i` prints (no frames are decoded either way).
+    Results are cached in memory and in Documents/ClipForge/cache/probe, keyed
+    by (path, size, mtime), so the same file is never probed twice.
+    """
+    
+    MAX_CACHE_ENTRIES = 1000
+    
+    _cache: Optional[Dict[str, Dict[str, Any]]] = None
+    _lock = threading.Lock()
+    _ffprobe_exe = None
+    
+    @staticmethod
+    def _get_cache_file() -> Path:
+        """Get the persistent probe cache file"""
+        return FileUtils.get_cache_directory("probe") / "probe_cache.json"
+    
+    @staticmethod
+    def _load_cache() -> Dict[str, Dict[str, Any]]:
+        """Load the persistent cache once per process (caller holds the lock)"""
+        if MediaProbe._cache is None:
+            try:
+                with open(MediaProbe._get_cache_file(), 'r', encoding='utf-8') as f:
+                    MediaProbe._cache = json.load(f)
+            except (OSError, ValueError):
+                MediaProbe._cache = {}
+        return MediaProbe._cache
+    
+    @staticmethod
+    def _save_cache():
+        """Write the cache to disk atomically (caller holds the lock)"""
+        cache = MediaProbe._cache or {}
+        # Keep the most recently probed entries
+        if len(cache) > MediaProbe.MAX_CACHE_ENTRIES:
+            keys = sorted(cache, key=lambda k: cache[k].get('probed_at', 0))
+            for key in keys[:len(cache) - MediaProbe.MAX_CACHE_ENTRIES]:
+                del cache[key]
+        
+        cache_file = MediaProbe._get_cache_file()
+        temp_file = cache_file.with_suffix('.tmp')
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            print(f"⚠️ Could not save probe cache: {e}")
+    
+    @staticmethod
+    def get_ffprobe_exe() -> Optional[str]:
+        """Find ffprobe next to ffmpeg or on PATH"""
+        if MediaProbe._ffprobe_exe is None:
+            ffmpeg_exe = Path(FFmpegUtils.get_ffmpeg_exe())
+            candidates = [
+                ffmpeg_exe.with_name(ffmpeg_exe.name.replace('ffmpeg', 'ffprobe')),
+                shutil.which('ffprobe')
+            ]
+            MediaProbe._ffprobe_exe = next(
+                (str(c) for c in candidates if c and Path(c).is_file()), ''
+            )
+        return MediaProbe._ffprobe_exe or None
+    
+    @staticmethod
+    def get_video_info(video_path: str) -> Optional[Dict[str, Any]]:
+        """Get video metadata, probing the file only if it is not cached"""
+        signature = FileUtils.get_file_signature(video_path)
+        is_local_file = Path(video_path).is_file()
+        
+        if is_local_file:
+            with MediaProbe._lock:
+                cached = MediaProbe._load_cache().get(signature)
+            if cached:
+                return MediaProbe._copy_info(cached['info'])
+        
+        try:
+            print(f"Getting video info for: {video_path}")
+            info = MediaProbe._probe(video_path)
+        except Exception as e:
+            print(f"Error getting video info for {video_path}: {e}")
+            return None
+        
+        if info is None:
+            print(f"Error getting video info for {video_path}: no video stream found")
+            return None
+        
+        info['filename'] = Path(video_path).name
+        info['file_size'] = FileUtils.get_file_size(video_path)
+        
+        if is_local_file:
+            with MediaProbe._lock:
+                MediaProbe._load_cache()[signature] = {
+                    'info': info,
+                    'probed_at': time.time()
+                }
+                MediaProbe._save_cache()
+        
+        return MediaProbe._copy_info(info)
+    
+    @staticmethod
+    def _copy_info(info: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a copy callers can modify (JSON turns the size tuple into a list)"""
+        info = dict(info)
+        info['size'] = tuple(info.get('size') or (0, 0))
+        return info
+    
+    @staticmethod
+    def _probe(video_path: str) -> Optional[Dict[str, Any]]:
+        """Probe with ffprobe if available, else with the ffmpeg header"""
+        if MediaProbe.get_ffprobe_exe():
+            return MediaProbe._probe_ffprobe(video_path)
+        return MediaProbe._probe_ffmpeg_header(video_path)
+    
+    @staticmethod
+    def _parse_rate(rate: str) -> float:
+        """Parse an ffprobe frame rate such as '30000/1001'"""
+        try:
+            num, _, den = rate.partition('/')
+            return float(num) / float(den or 1)
+        except (ValueError, ZeroDivisionError, AttributeError):
+            return 0.0
+    
+    @staticmethod
+    def _probe_ffprobe(video_path: str) -> Optional[Dict[str, Any]]:
+        """Probe with ffprobe JSON output"""
+        result = subprocess.run(
+            [MediaProbe.get_ffprobe_exe(), '-v', 'error', '-print_format', 'json',
+             '-show_format', '-show_streams', video_path],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL,
+            creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0),
+            encoding='utf-8',
+            errors='replace'
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip()[-300:])
+        
+        data = json.loads(result.stdout or '{}')
+        streams = data.get('streams', [])
+        video = next((s for s in streams if s.get('codec_type') == 'video'), None)
+        audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+        if not video:
+            return None
+        
+        fmt = data.get('format', {})
+        fps = MediaProbe._parse_rate(video.get('avg_frame_rate')) or \
+            MediaProbe._parse_rate(video.get('r_frame_rate'))
+        
+        return {
+            'duration': float(fmt.get('duration') or video.get('duration') or 0),
+            'fps': fps,
+            'size': (int(video.get('width', 0)), int(video.get('height', 0))),
+            'bitrate': int(fmt.get('bit_rate') or 0),
+            'video_codec': video.get('codec_name', ''),
+            'profile': video.get('profile', ''),
+            'pix_fmt': video.get('pix_fmt', ''),
+            'audio_codec': audio.get('codec_name', '') if audio else '',
+            'has_audio': audio is not None
+        }
+    
+    @staticmethod
+    def _probe_ffmpeg_header(video_path: str) -> Optional[Dict[str, Any]]:
+        """Probe by parsing the input header ffmpeg prints for `ffmpeg -i`"""
+        result = FFmpegUtils._run_capture(['-i', video_path])
+        header = result.stderr
+        
+        if 'Input #0' not in header:
+            raise RuntimeError(header.strip().splitlines()[-1] if header.strip() else "ffmpeg failed")
+        
+        video = re.search(r'Stream #\S+.*?: Video: (\w+)(?: \(([^)]*)\))?[^,]*, (\w+)(.*)', header)
+        if not video:
+            return None
+        
+        duration = 0.0
+        match = re.search(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', header)
+        if match:
+            duration = int(match.group(1)) * 3600 + int(match.group(2)) * 60 + float(match.group(3))
+        
+        bitrate = 0
+        match = re.search(r'Duration: .*?bitrate: (\d+) kb/s', header)
+        if match:
+            bitrate = int(match.group(1)) * 1000
+        
+        stream_details = video.group(4)
+        size = re.search(r'(\d{2,5})x(\d{2,5})', stream_details)
+        fps = re.search(r'(\d+(?:\.\d+)?) fps', stream_details) or \
+            re.search(r'(\d+(?:\.\d+)?)k? tbr', stream_details)
+        audio = re.search(r'Stream #\S+.*?: Audio: (\w+)', header)
+        
+        return {
+            'duration': duration,
+            'fps': float(fps.group(1)) if fps else 0.0,
+            'size': (int(size.group(1)), int(size.group(2))) if size else (0, 0),
+            'bitrate': bitrate,
+            'video_codec': video.group(1),
+            'profile': video.group(2) or '',
+            'pix_fmt': video.group(3),
+            'audio_codec': audio.group(1) if audio else '',
+            'has_audio': audio is not None
+        }
+    
+    @staticmethod
+    def clear_cache():
+        """Clear the in-memory and persistent probe cache"""
+        with MediaProbe._lock:
+            MediaProbe._cache = {}
+            MediaProbe._save_cache()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scratch Manager for ClipForge
+Hands out per-job temporary directories and cleans them up on cancel, exit and crash
+"""
+
+import os
+import sys
+import time
+import atexit
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+
+class ScratchJob:
+    """Temporary directory owned by one processing job
+    
+    Each clip gets its own subdirectory so concurrent writers never share a
+    temp file name. Use as a context manager or call cleanup() when done.
+    """
+    
+    def __init__(self, manager: 'ScratchManager', path: Path, in_ram: bool, reserved_bytes: int):
+        """Initialize scratch job"""
+        self.manager = manager
+        self.path = path
+        self.in_ram = in_ram
+        self.reserved_bytes = reserved_bytes
+    
+    def clip_dir(self, clip_index: int) -> Path:
+        """Get (and create) the scratch directory for one clip"""
+        clip_path = self.path / f"clip_{clip_index + 1:03d}"
+        clip_path.mkdir(parents=True, exist_ok=True)
+        return clip_path
+    
+    def get_usage(self) -> int:
+        """Get bytes currently used by this job"""
+        total = 0
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return total
+    
+    def cleanup(self):
+        """Delete the job directory and release its RAM reservation"""
+        self.manager.release(self)
+    
+    def __enter__(self) -> 'ScratchJob':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cleanup()
+
+
+class ScratchManager:
+    """Chooses where temporary files go and tracks every live scratch directory
+    
+    RAM-backed storage (/dev/shm) is used when the job's estimated scratch size
+    fits both the free tmpfs space and the configured budget. Otherwise scratch
+    goes to a hidden folder next to the output, so temp I/O stays on the same
+    (usually fast) drive instead of the install drive.
+    """
+    
+    DIR_PREFIX = "clipforge_"
+    OWNER_FILE = ".owner"
+    OUTPUT_SCRATCH_NAME = ".clipforge_scratch"
+    RAM_ROOTS = ["/dev/shm"]
+    # Never fill tmpfs past this fraction, it is shared with the rest of the system
+    RAM_MAX_FILL = 0.5
+    # Directories from other processes are removed after this age when the owner can't be checked
+    STALE_AGE = 24 * 3600
+    DEFAULT_BUDGET_MB = 2048
+    
+    # Shared by all instances: live jobs and RAM reservations are process-wide
+    _active_jobs: Dict[Path, ScratchJob] = {}
+    _ram_reserved = 0
+    _lock = threading.Lock()
+    _cleanup_registered = False
+    _swept_roots = set()
+    
+    def __init__(self, budget_mb: Optional[int] = None, prefer_ram: bool = True):
+        """Initialize scratch manager
+        
+        budget_mb caps the RAM-backed scratch all jobs may reserve together
+        (0 keeps all scratch on disk).
+        """
+        if budget_mb is None:
+            budget_mb = self.DEFAULT_BUDGET_MB
+        self.budget_bytes = max(0, int(budget_mb)) * 1024 * 1024
+        self.prefer_ram = prefer_ram
+        self._register_cleanup()
+    
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> 'ScratchManager':
+        """Create a manager from processing settings"""
+        settings = settings or {}
+        return cls(settings.get('scratch_budget_mb', cls.DEFAULT_BUDGET_MB),
+                   settings.get('scratch_prefer_ram', True))
+    
+    @classmethod
+    def _register_cleanup(cls):
+        """Remove live job directories when the interpreter exits"""
+        with cls._lock:
+            if not cls._cleanup_registered:
+                atexit.register(cls.cleanup_all)
+                cls._cleanup_registered = True
+    
+    def get_ram_root(self, required_bytes: int) -> Optional[Path]:
+        """Get a RAM-backed root with room for required_bytes, if any"""
+        if not self.prefer_ram or self.budget_bytes <= 0:
+            return None
+        for root in self.RAM_ROOTS:
+            root_path = Path(root)
+            if not root_path.is_dir() or not os.access(root_path, os.W_OK):
+                continue
+            try:
+                usage = shutil.disk_usage(root_path)
+            except OSError:
+                continue
+            with self._lock:
+                reserved = ScratchManager._ram_reserved
+            fits_tmpfs = usage.used + reserved + required_bytes <= usage.total * self.RAM_MAX_FILL
+            fits_budget = reserved + required_bytes <= self.budget_bytes
+            if fits_tmpfs and fits_budget:
+                return root_path
+        return None
+    
+    def get_disk_root(self, output_dir: Optional[Path] = None) -> Path:
+        """Get the on-disk scratch root (next to the output when known)"""
+        if output_dir:
+            return Path(output_dir) / self.OUTPUT_SCRATCH_NAME
+        return Path(tempfile.gettempdir())
+    
+    def create_job(self, job_name: str, output_dir: Optional[Path] = None,
+                   estimated_bytes: int = 0) -> ScratchJob:
+        """Create a scratch directory for a job"""
+        ram_root = self.get_ram_root(estimated_bytes)
+        root = ram_root or self.get_disk_root(output_dir)
+        root.mkdir(parents=True, exist_ok=True)
+        self.sweep_stale(root)
+        
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in job_name)[:40]
+        path = Path(tempfile.mkdtemp(prefix=f"{self.DIR_PREFIX}{safe_name}_", dir=root))
+        (path / self.OWNER_FILE).write_text(str(os.getpid()), encoding='utf-8')
+        
+        if ram_root is None and output_dir:
+            free = shutil.disk_usage(root).free
+            if estimated_bytes > free:
+                print(f"⚠️ Scratch space may run out: need ~{estimated_bytes // (1024 * 1024)} MB, "
+                      f"{free // (1024 * 1024)} MB free")
+        
+        reserved = estimated_bytes if ram_root else 0
+        job = ScratchJob(self, path, ram_root is not None, reserved)
+        with self._lock:
+            ScratchManager._active_jobs[path] = job
+            ScratchManager._ram_reserved += reserved
+        print(f"Scratch directory: {path}{' (RAM)' if job.in_ram else ''}")
+        return job
+    
+    def release(self, job: ScratchJob):
+        """Delete a job directory and forget it"""
+        with self._lock:
+            if ScratchManager._active_jobs.pop(job.path, None) is not None:
+                ScratchManager._ram_reserved -= job.reserved_bytes
+        shutil.rmtree(job.path, ignore_errors=True)
+        
+        # Drop the hidden output scratch folder once it is empty
+        parent = job.path.parent
+        if parent.name == self.OUTPUT_SCRATCH_NAME:
+            try:
+                parent.rmdir()
+            except OSError:
+                pass
+    
+    @staticmethod
+    def _is_owner_alive(pid: int) -> bool:
+        """Check whether the process that created a scratch directory still runs"""
+        if pid == os.getpid():
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        except OSError:
+            return False
+        return True
+    
+    def sweep_stale(self, root: Path):
+        """Remove scratch directories left behind by crashed runs (once per root)"""
+        with self._lock:
+            if root in ScratchManager._swept_roots:
+                return
+            ScratchManager._swept_roots.add(root)
+        
+        try:
+            candidates = [p for p in root.iterdir()
+                          if p.is_dir() and p.name.startswith(self.DIR_PREFIX)]
+        except OSError:
+            return
+        
+        for path in candidates:
+            try:
+                pid = int((path / self.OWNER_FILE).read_text(encoding='utf-8').strip())
+            except (OSError, ValueError):
+                pid = None
+            try:
+                age = time.time() - path.stat().st_mtime
+            except OSError:
+                continue
+            if pid is None or sys.platform == 'win32':
+                # os.kill would terminate the process on Windows, so rely on age there
+                stale = age > self.STALE_AGE
+            else:
+                stale = not self._is_owner_alive(pid)
+            if stale:
+                shutil.rmtree(path, ignore_errors=True)
+                print(f"✅ Removed stale scratch directory: {path}")
+    
+    @classmethod
+    def cleanup_all(cls):
+        """Delete every live job directory (used on exit)"""
+        with cls._lock:
+            jobs = list(cls._active_jobs.values())
+        for job in jobs:
+            job.manager.release(job)